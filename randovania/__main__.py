@@ -9,6 +9,11 @@ logging.basicConfig(level=logging.WARNING)
 def main():
     multiprocessing.freeze_support()
 
+    from randovania.lib import import_profiler
+    import_report = import_profiler.report_path_from_argv(sys.argv)
+    if import_report is not None:
+        import_profiler.profile_until_exit(import_report)
+
     import randovania
     randovania.setup_logging('INFO', None)
 
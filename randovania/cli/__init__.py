@@ -29,6 +29,8 @@ def _create_parser():
                         const=_print_version, dest="func")
     parser.add_argument("--configuration", type=Path,
                         help="Use the given configuration path instead of the included one.")
+    parser.add_argument("--profile-imports", type=Path, metavar="REPORT",
+                        help="Write to the given JSON file how long each module took to import.")
 
     return parser
 
@@ -0,0 +1,406 @@
+import contextlib
+import dataclasses
+import json
+import os
+import sqlite3
+import time
+import urllib.parse
+from abc import abstractmethod
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+MANIFEST_SCHEMA_VERSION = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class BatchJob:
+    """A seed to generate. All jobs of a queue are expected to use the same base permalink."""
+    seed_number: int
+    permalink: str
+    timeout: int
+    validate: bool
+
+    @property
+    def job_id(self) -> str:
+        return str(self.seed_number)
+
+    @property
+    def as_json(self) -> dict:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_json(cls, value: dict) -> "BatchJob":
+        return cls(
+            seed_number=value["seed_number"],
+            permalink=value["permalink"],
+            timeout=value["timeout"],
+            validate=value["validate"],
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class BatchJobResult:
+    seed_number: int
+    success: bool
+    worker: str
+    finished_at: float
+    duration: Optional[float]
+    output: Optional[str]
+    error: Optional[str]
+
+    @property
+    def job_id(self) -> str:
+        return str(self.seed_number)
+
+    @property
+    def as_json(self) -> dict:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_json(cls, value: dict) -> "BatchJobResult":
+        return cls(
+            seed_number=value["seed_number"],
+            success=value["success"],
+            worker=value["worker"],
+            finished_at=value["finished_at"],
+            duration=value["duration"],
+            output=value["output"],
+            error=value["error"],
+        )
+
+
+class JobQueue:
+    """
+    Where batch-distribute workers get their jobs from and report their results to.
+    Any number of workers, in any number of processes or machines, may use the same queue, so implementations
+    must make sure each job is claimed by only one worker.
+    """
+
+    @abstractmethod
+    def add_jobs(self, jobs: Iterable[BatchJob]) -> int:
+        """
+        Adds the given jobs, skipping the ones that are already in the queue in any state.
+        :return: How many jobs were added.
+        """
+
+    @abstractmethod
+    def claim(self, worker: str) -> Optional[BatchJob]:
+        """
+        Claims a pending job for the given worker.
+        :return: The claimed job, or None if there are no pending jobs.
+        """
+
+    @abstractmethod
+    def finish(self, job: BatchJob, result: BatchJobResult):
+        """
+        Records the result of a claimed job. The job won't be claimed again.
+        The claim might have been released and the job claimed by another worker in the meantime, in which case
+        the first result to be recorded is kept.
+        """
+
+    @abstractmethod
+    def release_claims(self, worker_prefix: str) -> int:
+        """
+        Returns to pending all jobs claimed by a worker whose name starts with the given prefix.
+        Meant for recovering the jobs of a worker that crashed.
+        :return: How many jobs were released.
+        """
+
+    @abstractmethod
+    def release_stale(self, older_than: float) -> int:
+        """
+        Returns to pending all jobs claimed more than `older_than` seconds ago, by any worker.
+        :return: How many jobs were released.
+        """
+
+    @abstractmethod
+    def heartbeat(self, worker_name: str):
+        """
+        Records that a command using the given worker name is still running.
+        """
+
+    @abstractmethod
+    def last_heartbeat(self, worker_name: str) -> Optional[float]:
+        """
+        When `heartbeat` was last called for the given worker name, or None if never or since `clear_heartbeat`.
+        """
+
+    @abstractmethod
+    def clear_heartbeat(self, worker_name: str):
+        """
+        Records that the command using the given worker name stopped.
+        """
+
+    @abstractmethod
+    def pending_count(self) -> int:
+        """
+        How many jobs are waiting to be claimed.
+        """
+
+    @abstractmethod
+    def results(self) -> List[BatchJobResult]:
+        """
+        The results of all finished jobs, sorted by seed number.
+        """
+
+    def close(self):
+        pass
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    job TEXT NOT NULL,
+    worker TEXT,
+    claimed_at REAL,
+    result TEXT
+);
+CREATE TABLE IF NOT EXISTS workers (
+    name TEXT PRIMARY KEY,
+    heartbeat_at REAL NOT NULL
+);
+"""
+
+
+class SqliteJobQueue(JobQueue):
+    """
+    A queue stored in a single SQLite database. Claims use a write transaction, so this is safe for any number of
+    workers on the same machine. Databases on network file systems often don't support the needed locking,
+    so prefer DirectoryJobQueue for sharing a queue between machines.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._connection = sqlite3.connect(str(path), timeout=60, isolation_level=None)
+        self._connection.executescript(_SQLITE_SCHEMA)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock right away, so two workers can't select the same job
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._connection
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def add_jobs(self, jobs: Iterable[BatchJob]) -> int:
+        with self._transaction() as connection:
+            return connection.executemany(
+                "INSERT OR IGNORE INTO jobs (job_id, job) VALUES (?, ?)",
+                [(job.job_id, json.dumps(job.as_json)) for job in jobs],
+            ).rowcount
+
+    def claim(self, worker: str) -> Optional[BatchJob]:
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT job_id, job FROM jobs WHERE worker IS NULL AND result IS NULL "
+                "ORDER BY CAST(job_id AS INTEGER) LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                connection.execute("UPDATE jobs SET worker = ?, claimed_at = ? WHERE job_id = ?",
+                                   (worker, time.time(), row[0]))
+
+        if row is None:
+            return None
+        return BatchJob.from_json(json.loads(row[1]))
+
+    def finish(self, job: BatchJob, result: BatchJobResult):
+        self._connection.execute("UPDATE jobs SET result = ? WHERE job_id = ? AND result IS NULL",
+                                 (json.dumps(result.as_json), result.job_id))
+
+    def release_claims(self, worker_prefix: str) -> int:
+        return self._connection.execute(
+            "UPDATE jobs SET worker = NULL, claimed_at = NULL "
+            "WHERE result IS NULL AND worker IS NOT NULL AND substr(worker, 1, ?) = ?",
+            (len(worker_prefix), worker_prefix),
+        ).rowcount
+
+    def release_stale(self, older_than: float) -> int:
+        return self._connection.execute(
+            "UPDATE jobs SET worker = NULL, claimed_at = NULL "
+            "WHERE result IS NULL AND worker IS NOT NULL AND claimed_at < ?",
+            (time.time() - older_than,),
+        ).rowcount
+
+    def heartbeat(self, worker_name: str):
+        self._connection.execute("INSERT OR REPLACE INTO workers (name, heartbeat_at) VALUES (?, ?)",
+                                 (worker_name, time.time()))
+
+    def last_heartbeat(self, worker_name: str) -> Optional[float]:
+        row = self._connection.execute("SELECT heartbeat_at FROM workers WHERE name = ?",
+                                       (worker_name,)).fetchone()
+        return row[0] if row is not None else None
+
+    def clear_heartbeat(self, worker_name: str):
+        self._connection.execute("DELETE FROM workers WHERE name = ?", (worker_name,))
+
+    def pending_count(self) -> int:
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM jobs WHERE worker IS NULL AND result IS NULL"
+        ).fetchone()[0]
+
+    def results(self) -> List[BatchJobResult]:
+        rows = self._connection.execute("SELECT result FROM jobs WHERE result IS NOT NULL").fetchall()
+        return sorted((BatchJobResult.from_json(json.loads(row[0])) for row in rows),
+                      key=lambda result: result.seed_number)
+
+    def close(self):
+        self._connection.close()
+
+
+def _write_json_atomically(path: Path, data: dict):
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(data))
+    os.replace(temporary, path)
+
+
+def _claimed_file_time(path: Path) -> float:
+    """
+    When a claimed file without `claimed_at` was claimed, for workers that crashed before recording it.
+    Renaming updates the change time on POSIX, and `claim` updates the modification time right after.
+    """
+    stat = path.stat()
+    if os.name == "nt":
+        # st_ctime is the creation time on Windows
+        return stat.st_mtime
+    return max(stat.st_mtime, stat.st_ctime)
+
+
+class DirectoryJobQueue(JobQueue):
+    """
+    A queue stored as one JSON file per job, moved between the `pending`, `claimed` and `done` sub-directories.
+    The heartbeats of the commands working on it are files in `workers`.
+    A job is claimed by renaming its file, which is atomic even on most network file systems,
+    so this can be shared between machines with a shared folder.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.pending = path.joinpath("pending")
+        self.claimed = path.joinpath("claimed")
+        self.done = path.joinpath("done")
+        self.workers = path.joinpath("workers")
+        for directory in (self.pending, self.claimed, self.done, self.workers):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def _file_name(self, job_id: str) -> str:
+        return f"{job_id}.json"
+
+    def add_jobs(self, jobs: Iterable[BatchJob]) -> int:
+        added = 0
+        for job in jobs:
+            name = self._file_name(job.job_id)
+            if any(directory.joinpath(name).exists() for directory in (self.pending, self.claimed, self.done)):
+                continue
+            _write_json_atomically(self.pending.joinpath(name), {"job": job.as_json})
+            added += 1
+        return added
+
+    def claim(self, worker: str) -> Optional[BatchJob]:
+        for pending in sorted(self.pending.glob("*.json"), key=lambda p: int(p.stem)):
+            claimed = self.claimed.joinpath(pending.name)
+            try:
+                os.rename(pending, claimed)
+                # The rename keeps the time the job was added, which would make the claim look stale
+                os.utime(claimed)
+                data = json.loads(claimed.read_text())
+            except FileNotFoundError:
+                # Another worker claimed it first, or it was released and finished meanwhile
+                continue
+
+            data["worker"] = worker
+            data["claimed_at"] = time.time()
+            _write_json_atomically(claimed, data)
+            return BatchJob.from_json(data["job"])
+
+        return None
+
+    def finish(self, job: BatchJob, result: BatchJobResult):
+        name = self._file_name(job.job_id)
+        done = self.done.joinpath(name)
+        if done.exists():
+            return
+
+        # The claimed file might be gone or belong to another worker already, so only the job we hold is used
+        _write_json_atomically(done, {"job": job.as_json, "worker": result.worker, "result": result.as_json})
+        for directory in (self.claimed, self.pending):
+            try:
+                directory.joinpath(name).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _release(self, should_release) -> int:
+        released = 0
+        for claimed in self.claimed.glob("*.json"):
+            try:
+                data = json.loads(claimed.read_text())
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+
+            if should_release(data, claimed) and not self.done.joinpath(claimed.name).exists():
+                _write_json_atomically(claimed, {"job": data["job"]})
+                try:
+                    os.rename(claimed, self.pending.joinpath(claimed.name))
+                except FileNotFoundError:
+                    continue
+                released += 1
+        return released
+
+    def release_claims(self, worker_prefix: str) -> int:
+        return self._release(lambda data, _: data.get("worker", "").startswith(worker_prefix))
+
+    def release_stale(self, older_than: float) -> int:
+        limit = time.time() - older_than
+        return self._release(lambda data, path: data.get("claimed_at", _claimed_file_time(path)) < limit)
+
+    def _worker_file(self, worker_name: str) -> Path:
+        return self.workers.joinpath(f"{urllib.parse.quote(worker_name, safe='')}.json")
+
+    def heartbeat(self, worker_name: str):
+        _write_json_atomically(self._worker_file(worker_name), {"heartbeat_at": time.time()})
+
+    def last_heartbeat(self, worker_name: str) -> Optional[float]:
+        try:
+            return json.loads(self._worker_file(worker_name).read_text())["heartbeat_at"]
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def clear_heartbeat(self, worker_name: str):
+        try:
+            self._worker_file(worker_name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def pending_count(self) -> int:
+        return sum(1 for _ in self.pending.glob("*.json"))
+
+    def results(self) -> List[BatchJobResult]:
+        return sorted((BatchJobResult.from_json(json.loads(done.read_text())["result"])
+                       for done in self.done.glob("*.json")),
+                      key=lambda result: result.seed_number)
+
+
+def open_job_queue(path: Path) -> JobQueue:
+    """
+    Opens the queue at the given path, creating it if needed.
+    Paths ending in `.db`, `.sqlite` or `.sqlite3` are SqliteJobQueue, anything else is a DirectoryJobQueue.
+    """
+    if path.suffix in {".db", ".sqlite", ".sqlite3"}:
+        return SqliteJobQueue(path)
+    return DirectoryJobQueue(path)
+
+
+def write_manifest(queue: JobQueue, output_path: Path):
+    """
+    Writes a JSON file with the result of every finished job of the queue.
+    """
+    results = queue.results()
+    _write_json_atomically(output_path, {
+        "schema_version": MANIFEST_SCHEMA_VERSION,
+        "finished": sum(1 for result in results if result.success),
+        "failed": sum(1 for result in results if not result.success),
+        "pending": queue.pending_count(),
+        "seeds": [result.as_json for result in results],
+    })
@@ -1,21 +1,27 @@
-import asyncio
 import math
 import multiprocessing
+import queue as queue_module
+import socket
+import threading
 import time
 import typing
 from argparse import ArgumentParser
 from pathlib import Path
+from typing import Optional
 
 from randovania.cli import echoes_lib
 from randovania.interface_common import sleep_inhibitor
 
 
-def batch_distribute_helper(base_permalink,
-                            seed_number: int,
-                            timeout: int,
-                            validate: bool,
-                            output_dir: Path,
-                            ) -> float:
+# The queue the generators of the pipelined mode send their descriptions to, set by the pool initializer
+_pipeline_queue: Optional[multiprocessing.Queue] = None
+
+
+def _generate_description(base_permalink, seed_number: int, timeout: int, validate: bool):
+    """
+    :return: The LayoutDescription and how many seconds it took.
+    """
+    import asyncio
     from randovania.generator import generator
     from randovania.layout.permalink import Permalink
 
@@ -31,13 +37,206 @@ def batch_distribute_helper(base_permalink,
         validate_after_generation=validate, timeout=timeout,
         attempts=0,
     ))
-    delta_time = time.perf_counter() - start_time
+    return description, time.perf_counter() - start_time
+
 
+def _save_description(description, seed_number: int, output_dir: Path):
     description.save_to_file(output_dir.joinpath("{}.{}".format(seed_number, description.file_extension())))
+
+
+def batch_distribute_helper(base_permalink,
+                            seed_number: int,
+                            timeout: int,
+                            validate: bool,
+                            output_dir: Path,
+                            ) -> float:
+    description, delta_time = _generate_description(base_permalink, seed_number, timeout, validate)
+    _save_description(description, seed_number, output_dir)
     return delta_time
 
 
+def _set_pipeline_queue(queue: multiprocessing.Queue):
+    global _pipeline_queue
+    _pipeline_queue = queue
+
+
+def pipeline_generate_helper(base_permalink, seed_number: int, timeout: int) -> float:
+    """
+    Generates a seed without validating it, then sends it to the validators.
+    :return: How many seconds the generation took.
+    """
+    description, delta_time = _generate_description(base_permalink, seed_number, timeout, False)
+    _pipeline_queue.put((seed_number, description.as_json, delta_time))
+    return delta_time
+
+
+def pipeline_validate_worker(descriptions: multiprocessing.Queue, messages: multiprocessing.Queue,
+                             timeout: int, output_dir: Path):
+    """
+    Validates the descriptions sent by `pipeline_generate_helper` until receiving None, saving the valid ones.
+    Sends a message about each description to `messages`.
+    """
+    import asyncio
+    from randovania.generator import generator
+    from randovania.layout.layout_description import LayoutDescription
+
+    for seed_number, description_json, generation_time in iter(descriptions.get, None):
+        try:
+            description = LayoutDescription.from_json_dict(description_json)
+            start_time = time.perf_counter()
+            asyncio.run(generator.validate_description(description, id, timeout))
+            validation_time = time.perf_counter() - start_time
+            _save_description(description, seed_number, output_dir)
+            messages.put(f"Finished seed in {generation_time} seconds, validated in {validation_time} seconds.")
+
+        except Exception as e:
+            messages.put(f"Failed to validate seed: {e}")
+
+
+def _next_pipeline_message(messages: multiprocessing.Queue, validators: typing.List[multiprocessing.Process]) -> str:
+    """
+    Waits for the next message of the pipelined mode. Validators only stop once all messages were received,
+    so if one stopped before, the seed it held will never have a message.
+    """
+    while True:
+        try:
+            return messages.get(timeout=1)
+        except queue_module.Empty:
+            for validator in validators:
+                if not validator.is_alive():
+                    raise RuntimeError(f"A validator stopped unexpectedly, with exit code {validator.exitcode}")
+
+
+def run_job(job, output_dir: Path, worker: str):
+    """
+    Generates the seed of the given BatchJob, unless its output already exists from a previous run.
+    :return: The BatchJobResult
+    """
+    from randovania.cli.batch_queue import BatchJobResult
+    from randovania.layout.layout_description import LayoutDescription
+    from randovania.layout.permalink import Permalink
+
+    output = "{}.{}".format(job.seed_number, LayoutDescription.file_extension())
+    duration = None
+    error = None
+
+    if not output_dir.joinpath(output).is_file():
+        try:
+            duration = batch_distribute_helper(Permalink.from_str(job.permalink), job.seed_number,
+                                               job.timeout, job.validate, output_dir)
+        except Exception as e:
+            error = str(e)
+            output = None
+
+    return BatchJobResult(
+        seed_number=job.seed_number,
+        success=error is None,
+        worker=worker,
+        finished_at=time.time(),
+        duration=duration,
+        output=output,
+        error=error,
+    )
+
+
+def batch_worker_helper(queue_path: Path, output_dir: Path, worker: str) -> int:
+    """
+    Generates the jobs of the queue at the given path until there are none left.
+    :return: How many jobs were processed.
+    """
+    from randovania.cli import batch_queue
+
+    queue = batch_queue.open_job_queue(queue_path)
+    processed = 0
+    try:
+        job = queue.claim(worker)
+        while job is not None:
+            result = run_job(job, output_dir, worker)
+            queue.finish(job, result)
+            processed += 1
+            if result.success:
+                print(f"[{worker}] Finished seed {job.seed_number} in {result.duration} seconds.")
+            else:
+                print(f"[{worker}] Failed to generate seed {job.seed_number}: {result.error}")
+            job = queue.claim(worker)
+    finally:
+        queue.close()
+
+    return processed
+
+
+# How often a command working on a queue records that it's still running.
+# A worker name whose heartbeat is older than three intervals is considered free.
+_HEARTBEAT_INTERVAL = 30.0
+
+
+def _send_heartbeats(queue_path: Path, worker_name: str, stop: threading.Event):
+    from randovania.cli import batch_queue
+
+    # A connection of its own, since sqlite connections can't be shared between threads
+    queue = batch_queue.open_job_queue(queue_path)
+    try:
+        while not stop.wait(_HEARTBEAT_INTERVAL):
+            queue.heartbeat(worker_name)
+    finally:
+        queue.close()
+
+
+def work_on_queue(queue_path: Path, output_dir: Path, process_count: Optional[int], worker_name: str,
+                  reclaim_after: Optional[float]):
+    """
+    Runs `process_count` workers on the given queue until it's empty, then writes the manifest to `output_dir`.
+    Jobs claimed by an earlier run with the same worker name are assumed to have crashed and are done again.
+    Refuses to start while another command with the same worker name is running.
+    """
+    from randovania.cli import batch_queue
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if process_count is None:
+        process_count = multiprocessing.cpu_count()
+
+    print(f"Working on the queue as {worker_name}.")
+    queue = batch_queue.open_job_queue(queue_path)
+    try:
+        last_heartbeat = queue.last_heartbeat(worker_name)
+        if last_heartbeat is not None and time.time() - last_heartbeat < 3 * _HEARTBEAT_INTERVAL:
+            print(f"Another command is working on the queue as {worker_name}. Use a different --worker-name, "
+                  f"or if that command crashed, try again in {3 * _HEARTBEAT_INTERVAL:.0f} seconds.")
+            raise SystemExit(1)
+
+        queue.heartbeat(worker_name)
+        released = queue.release_claims(f"{worker_name}/")
+        if reclaim_after is not None:
+            released += queue.release_stale(reclaim_after)
+        if released:
+            print(f"Released {released} jobs claimed by workers that didn't finish.")
+
+        stop_heartbeats = threading.Event()
+        heartbeats = threading.Thread(target=_send_heartbeats, args=(queue_path, worker_name, stop_heartbeats),
+                                      daemon=True)
+        try:
+            with multiprocessing.Pool(processes=process_count) as pool, sleep_inhibitor.get_inhibitor():
+                # Started after the pool forked its processes
+                heartbeats.start()
+                pool.starmap(batch_worker_helper, [
+                    (queue_path, output_dir, f"{worker_name}/{i}")
+                    for i in range(process_count)
+                ])
+        finally:
+            stop_heartbeats.set()
+            if heartbeats.is_alive():
+                heartbeats.join()
+            queue.clear_heartbeat(worker_name)
+
+        batch_queue.write_manifest(queue, output_dir.joinpath("manifest.json"))
+    finally:
+        queue.close()
+
+
 def batch_distribute_command_logic(args):
+    if args.queue is not None:
+        return batch_distribute_with_queue(args)
+
     from randovania.layout.permalink import Permalink
 
     finished_count = 0
@@ -58,6 +257,9 @@ def batch_distribute_command_logic(args):
         finished_count += 1
         print(number_format.format(finished_count, seed_count) + msg)
 
+    if validate and args.validator_count is not None:
+        return batch_distribute_pipelined(args, base_permalink, report_update)
+
     def callback(result):
         report_update(f"Finished seed in {result} seconds.")
 
@@ -76,6 +278,89 @@ def batch_distribute_command_logic(args):
         pool.join()
 
 
+def batch_distribute_pipelined(args, base_permalink, report_update: typing.Callable[[str], None]):
+    """
+    Generates with `args.process_count` processes and validates with `args.validator_count` other processes,
+    so the generation of the next seeds continues while earlier ones are being validated.
+    Generators wait once a few descriptions per validator are waiting to be validated.
+    """
+    descriptions = multiprocessing.Queue(maxsize=2 * args.validator_count)
+    messages = multiprocessing.Queue()
+
+    validators = [
+        multiprocessing.Process(target=pipeline_validate_worker,
+                                args=(descriptions, messages, args.timeout, args.output_dir))
+        for _ in range(args.validator_count)
+    ]
+    for validator in validators:
+        validator.start()
+
+    def error_callback(e):
+        messages.put(f"Failed to generate seed: {e}")
+
+    try:
+        with multiprocessing.Pool(processes=args.process_count, initializer=_set_pipeline_queue,
+                                  initargs=(descriptions,)) as pool, sleep_inhibitor.get_inhibitor():
+            for seed_number in range(base_permalink.seed_number, base_permalink.seed_number + args.seed_count):
+                pool.apply_async(
+                    func=pipeline_generate_helper,
+                    args=(base_permalink, seed_number, args.timeout),
+                    error_callback=error_callback,
+                )
+            pool.close()
+
+            # Each seed results in exactly one message, from either its generator or its validator
+            for _ in range(args.seed_count):
+                report_update(_next_pipeline_message(messages, validators))
+            pool.join()
+
+        for _ in validators:
+            descriptions.put(None)
+        for validator in validators:
+            validator.join()
+
+    finally:
+        for validator in validators:
+            if validator.is_alive():
+                validator.terminate()
+
+
+def batch_distribute_with_queue(args):
+    from randovania.cli.batch_queue import BatchJob, open_job_queue
+    from randovania.layout.permalink import Permalink
+
+    base_permalink = Permalink.from_str(args.permalink)
+    queue = open_job_queue(args.queue)
+    try:
+        added = queue.add_jobs(
+            BatchJob(seed_number=seed_number, permalink=args.permalink, timeout=args.timeout, validate=args.validate)
+            for seed_number in range(base_permalink.seed_number, base_permalink.seed_number + args.seed_count)
+        )
+    finally:
+        queue.close()
+
+    print(f"Added {added} jobs to the queue.")
+    work_on_queue(args.queue, args.output_dir, args.process_count, args.worker_name, args.reclaim_after)
+
+
+def batch_worker_command_logic(args):
+    work_on_queue(args.queue, args.output_dir, args.process_count, args.worker_name, args.reclaim_after)
+
+
+def _add_queue_worker_arguments(parser: ArgumentParser):
+    parser.add_argument(
+        "--worker-name",
+        type=str,
+        default=socket.gethostname(),
+        help="Identifies the workers of this command in the queue. Jobs left claimed by an earlier command with "
+             "the same name are done again, so a crashed command can be restarted as is. Only one command with a "
+             "given name can run at a time. Defaults to the host name.")
+    parser.add_argument(
+        "--reclaim-after",
+        type=float,
+        help="Also take over jobs that any worker claimed more than this many seconds ago.")
+
+
 def add_batch_distribute_command(sub_parsers):
     parser: ArgumentParser = sub_parsers.add_parser(
         "batch-distribute",
@@ -84,6 +369,12 @@ def add_batch_distribute_command(sub_parsers):
 
     parser.add_argument("permalink", type=str, help="The permalink to use")
     parser.add_argument("--process-count", type=int, help="How many processes to use. Defaults to CPU count.")
+    parser.add_argument(
+        "--validator-count",
+        type=int,
+        help="Validate with this many processes, separate from the --process-count ones that generate. "
+             "The generation of the next seeds then continues while earlier ones are validated. "
+             "Not used with --queue or --no-validate.")
     parser.add_argument(
         "--timeout",
         type=int,
@@ -98,4 +389,31 @@ def add_batch_distribute_command(sub_parsers):
         "output_dir",
         type=Path,
         help="Where to place the seed logs.")
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        help="Adds the seeds to the given job queue and works on it, so other machines can help with "
+             "batch-worker. Seeds that are already in the queue aren't added again. "
+             "Paths ending in .db, .sqlite or .sqlite3 are SQLite databases, anything else is a directory.")
+    _add_queue_worker_arguments(parser)
     parser.set_defaults(func=batch_distribute_command_logic)
+
+
+def add_batch_worker_command(sub_parsers):
+    parser: ArgumentParser = sub_parsers.add_parser(
+        "batch-worker",
+        help="Generate the seeds of a job queue created with batch-distribute --queue"
+    )
+
+    parser.add_argument("--process-count", type=int, help="How many processes to use. Defaults to CPU count.")
+    parser.add_argument(
+        "queue",
+        type=Path,
+        help="The job queue. Paths ending in .db, .sqlite or .sqlite3 are SQLite databases, "
+             "anything else is a directory.")
+    parser.add_argument(
+        "output_dir",
+        type=Path,
+        help="Where to place the seed logs and the manifest.")
+    _add_queue_worker_arguments(parser)
+    parser.set_defaults(func=batch_worker_command_logic)
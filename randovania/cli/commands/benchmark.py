@@ -0,0 +1,284 @@
+import dataclasses
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from randovania.cli import echoes_lib
+from randovania.games.game import RandovaniaGame
+
+BENCHMARK_SCHEMA_VERSION = 1
+COMPARED_METRICS = (
+    "mean_wall_time",
+    "mean_filler_actions",
+    "mean_reach_count",
+    "mean_resolver_nodes_expanded",
+    "max_peak_rss",
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class BenchmarkCase:
+    game: RandovaniaGame
+    preset_name: str
+    player_count: int
+
+    @property
+    def name(self) -> str:
+        players = "solo" if self.player_count == 1 else f"{self.player_count} players"
+        return f"{self.game.value}/{self.preset_name}/{players}"
+
+
+def create_benchmark_matrix(preset_manager, games: List[RandovaniaGame], all_presets: bool,
+                            multiworld_players: int) -> List[BenchmarkCase]:
+    """
+    The cases to benchmark: the first included preset of each game, or all of them, in solo and in a multiworld
+    session where every player uses the same preset.
+    :param preset_manager: A PresetManager, of which only the included presets are used.
+    """
+    cases = []
+    for game in games:
+        presets = [preset for preset in preset_manager.included_presets.values() if preset.game == game]
+        if not all_presets:
+            presets = presets[:1]
+
+        for preset in presets:
+            cases.append(BenchmarkCase(game, preset.name, 1))
+            if multiworld_players > 1:
+                cases.append(BenchmarkCase(game, preset.name, multiworld_players))
+
+    return cases
+
+
+def _peak_rss() -> Optional[int]:
+    """The peak resident set size of this process, in bytes. None when unsupported, such as on Windows."""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports it in kilobytes, macOS in bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_benchmark_seed(permalink_str: str, seed_number: int, timeout: int, validate: bool) -> dict:
+    """
+    Generates one seed, returning the measurements. Meant to run in a fresh process, so the peak RSS and the
+    counters only include that seed. Loading the game data happens before measuring.
+    """
+    import asyncio
+    from randovania.game_description import default_database
+    from randovania.generator import generator
+    from randovania.layout.permalink import Permalink
+    from randovania.lib import metrics
+
+    base_permalink = Permalink.from_str(permalink_str)
+    permalink = Permalink(
+        seed_number=seed_number,
+        spoiler=True,
+        presets=base_permalink.presets,
+    )
+    for preset in permalink.presets.values():
+        default_database.game_description_for(preset.game)
+
+    filler_actions = None
+    error = None
+
+    with metrics.collecting() as collected:
+        start_time = time.perf_counter()
+        try:
+            description = asyncio.run(generator.generate_and_validate_description(
+                permalink=permalink, status_update=None,
+                validate_after_generation=validate, timeout=timeout,
+                attempts=0,
+            ))
+            filler_actions = len(description.item_order)
+        except Exception as e:
+            error = str(e)
+        wall_time = time.perf_counter() - start_time
+
+    reach_count = sum(collected.timers[name].count
+                      for name in ("resolver_reach.calculate_reach", "generator_reach.expand_graph")
+                      if name in collected.timers)
+
+    return {
+        "seed_number": seed_number,
+        "success": error is None,
+        "error": error,
+        "wall_time": wall_time,
+        "filler_actions": filler_actions,
+        "reach_count": reach_count,
+        "resolver_nodes_expanded": collected.counters.get("resolver.nodes_expanded", 0),
+        "peak_rss": _peak_rss(),
+        "metrics": collected.as_json,
+    }
+
+
+def _mean(values: List[Optional[float]]) -> Optional[float]:
+    values = [value for value in values if value is not None]
+    if values:
+        return statistics.mean(values)
+    return None
+
+
+def summarize_seeds(seeds: List[dict]) -> dict:
+    """Aggregates the results of `run_benchmark_seed` for one case."""
+    failures = sum(1 for seed in seeds if not seed["success"])
+    peak_rss = [seed["peak_rss"] for seed in seeds if seed["peak_rss"] is not None]
+    return {
+        "seed_count": len(seeds),
+        "failures": failures,
+        "failure_rate": failures / len(seeds) if seeds else 0.0,
+        "mean_wall_time": _mean([seed["wall_time"] for seed in seeds]),
+        "median_wall_time": statistics.median(seed["wall_time"] for seed in seeds) if seeds else None,
+        "mean_filler_actions": _mean([seed["filler_actions"] for seed in seeds]),
+        "mean_reach_count": _mean([seed["reach_count"] for seed in seeds]),
+        "mean_resolver_nodes_expanded": _mean([seed["resolver_nodes_expanded"] for seed in seeds]),
+        "max_peak_rss": max(peak_rss) if peak_rss else None,
+    }
+
+
+def compare_reports(report: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Compares the summary of each case present in both reports.
+    A metric regressed if it grew by more than `threshold` times its baseline value,
+    and the failure rate regressed if it grew by more than `threshold`.
+    :return: A description of each regression.
+    """
+    baseline_cases = {case["name"]: case["summary"] for case in baseline["cases"]}
+    regressions = []
+
+    for case in report["cases"]:
+        old = baseline_cases.get(case["name"])
+        if old is None:
+            continue
+        new = case["summary"]
+
+        for metric in COMPARED_METRICS:
+            old_value, new_value = old.get(metric), new.get(metric)
+            if old_value is None or new_value is None or old_value <= 0:
+                continue
+            if new_value > old_value * (1 + threshold):
+                regressions.append(f"{case['name']}: {metric} went from {old_value:.2f} to {new_value:.2f} "
+                                   f"(+{(new_value / old_value - 1) * 100:.1f}%)")
+
+        if new["failure_rate"] - old["failure_rate"] > threshold:
+            regressions.append(f"{case['name']}: failure_rate went from {old['failure_rate']:.2f} "
+                               f"to {new['failure_rate']:.2f}")
+
+    return regressions
+
+
+def run_benchmark(preset_manager, cases: List[BenchmarkCase], seed_numbers: List[int], timeout: int,
+                  validate: bool, process_count: int) -> dict:
+    from randovania import VERSION
+    from randovania.layout.permalink import Permalink
+
+    seeds_per_case: Dict[str, List] = {}
+
+    # Each seed gets a new process, so the peak RSS and counters are for that seed alone
+    with multiprocessing.Pool(processes=process_count, maxtasksperchild=1) as pool:
+        for case in cases:
+            preset = preset_manager.included_preset_with(case.game, case.preset_name).get_preset()
+            permalink = Permalink(
+                seed_number=0,
+                spoiler=True,
+                presets={i: preset for i in range(case.player_count)},
+            )
+            seeds_per_case[case.name] = [
+                pool.apply_async(run_benchmark_seed, (permalink.as_base64_str, seed_number, timeout, validate))
+                for seed_number in seed_numbers
+            ]
+
+        report_cases = []
+        for case in cases:
+            seeds = [result.get() for result in seeds_per_case[case.name]]
+            summary = summarize_seeds(seeds)
+            print(f"{case.name}: {summary['mean_wall_time']:.2f}s mean, "
+                  f"{summary['failures']}/{summary['seed_count']} failed")
+            report_cases.append({
+                "name": case.name,
+                "game": case.game.value,
+                "preset": case.preset_name,
+                "player_count": case.player_count,
+                "seeds": seeds,
+                "summary": summary,
+            })
+
+    return {
+        "schema_version": BENCHMARK_SCHEMA_VERSION,
+        "randovania_version": VERSION,
+        "seed_numbers": seed_numbers,
+        "validate": validate,
+        "cases": report_cases,
+    }
+
+
+def benchmark_command_logic(args):
+    from randovania.interface_common import sleep_inhibitor
+    from randovania.interface_common.preset_manager import PresetManager
+
+    if args.game:
+        games = [RandovaniaGame(game) for game in args.game]
+    else:
+        games = [game for game in RandovaniaGame if args.include_experimental or not game.data.experimental]
+
+    preset_manager = PresetManager(None)
+    cases = create_benchmark_matrix(preset_manager, games, args.all_presets, args.multiworld_players)
+    seed_numbers = list(range(args.first_seed, args.first_seed + args.seed_count))
+
+    with sleep_inhibitor.get_inhibitor():
+        report = run_benchmark(preset_manager, cases, seed_numbers, args.timeout, args.validate, args.process_count)
+
+    args.output_file.write_text(json.dumps(report, indent=4))
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_reports(report, baseline, args.threshold)
+        if regressions:
+            print("Regressions compared to {}:\n{}".format(args.baseline, "\n".join(regressions)))
+            raise SystemExit(1)
+        print(f"No regressions compared to {args.baseline}.")
+
+
+def add_benchmark_command(sub_parsers):
+    parser: ArgumentParser = sub_parsers.add_parser(
+        "benchmark",
+        help="Generate a fixed set of seeds with the included presets, reporting how long they took"
+    )
+
+    parser.add_argument("--game", choices=[game.value for game in RandovaniaGame], action="append",
+                        help="Benchmark only the given game. Can be used multiple times. "
+                             "Defaults to all non-experimental games.")
+    parser.add_argument("--include-experimental", action="store_true", default=False,
+                        help="When --game isn't used, also benchmark experimental games.")
+    parser.add_argument("--all-presets", action="store_true", default=False,
+                        help="Benchmark all included presets of each game, instead of only the first.")
+    parser.add_argument("--multiworld-players", type=int, default=2,
+                        help="How many players to use for the multiworld cases. 1 disables them. Defaults to 2.")
+    parser.add_argument("--first-seed", type=int, default=0, help="The first seed number. Defaults to 0.")
+    parser.add_argument("--seed-count", type=int, default=5,
+                        help="How many seeds to generate for each case. Defaults to 5.")
+    parser.add_argument("--process-count", type=int, default=1,
+                        help="How many processes to use. More than one makes the times less reliable. Defaults to 1.")
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=600,
+        help="How many seconds to wait before timing out a validation.")
+    echoes_lib.add_validate_argument(parser)
+    parser.add_argument("--baseline", type=Path,
+                        help="A report from an earlier run. Exits with an error if any case regressed.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="How much a metric may grow over the baseline before it's a regression, as a fraction. "
+                             "For the failure rate, it's the absolute difference. Defaults to 0.1.")
+    parser.add_argument(
+        "output_file",
+        type=Path,
+        help="Where to write the JSON report.")
+    parser.set_defaults(func=benchmark_command_logic)
@@ -1,16 +1,17 @@
-import asyncio
 import time
 from argparse import ArgumentParser
 from pathlib import Path
 
 from randovania.cli import echoes_lib
 from randovania.games.game import RandovaniaGame
-from randovania.resolver import debug
 
 
 def distribute_command_logic(args):
+    import asyncio
     from randovania.layout.permalink import Permalink
     from randovania.generator import generator
+    from randovania.lib import metrics
+    from randovania.resolver import debug
 
     async def _create_permalink(args_) -> Permalink:
         from randovania.interface_common.preset_manager import PresetManager
@@ -37,6 +38,9 @@ def distribute_command_logic(args):
     if permalink.spoiler:
         debug.set_level(args.debug)
 
+    if args.metrics is not None:
+        metrics.set_backend(metrics.CollectingMetrics(export_path=args.metrics))
+
     extra_args = {}
     if args.no_retry:
         extra_args["attempts"] = 0
@@ -61,6 +65,8 @@ def add_distribute_command(sub_parsers):
     echoes_lib.add_validate_argument(parser)
     parser.add_argument("--no-retry", default=False, action="store_true", help="Disable retries in the generation.")
     parser.add_argument("--status-update", default=False, action="store_true", help="Print the status updates.")
+    parser.add_argument("--metrics", type=Path,
+                        help="Write to the given JSON file counters and timers of the generator and resolver.")
 
     group = parser.add_mutually_exclusive_group()
     group.add_argument("--permalink", type=str, help="The permalink to use")
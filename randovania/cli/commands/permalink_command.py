@@ -1,13 +1,12 @@
-import asyncio
 import random
 from argparse import ArgumentParser
 
 from randovania.games.game import RandovaniaGame
-from randovania.layout.permalink import Permalink
 
 
 async def permalink_command_body(args):
     from randovania.interface_common.preset_manager import PresetManager
+    from randovania.layout.permalink import Permalink
 
     preset_manager = PresetManager(None)
     versioned_preset = preset_manager.included_preset_with(RandovaniaGame(args.game), args.preset)
@@ -30,6 +29,7 @@ async def permalink_command_body(args):
 
 
 def permalink_command(args):
+    import asyncio
     asyncio.run(permalink_command_body(args))
 
 
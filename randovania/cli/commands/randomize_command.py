@@ -1,9 +1,9 @@
-import asyncio
 from argparse import ArgumentParser
 from pathlib import Path
 
 
 def randomize_command_logic(args):
+    import asyncio
     return asyncio.run(randomize_command_logic_async(args))
 
 
@@ -2,10 +2,11 @@ from argparse import ArgumentParser
 import logging
 
 from randovania.games.game import RandovaniaGame
-from randovania.layout.versioned_preset import VersionedPreset
 
 
 def refresh_presets_command_logic(args):
+    from randovania.layout.versioned_preset import VersionedPreset
+
     for game in RandovaniaGame:
         logging.info(f"Refreshing presets for {game.long_name}")
         base_path = game.data_path.joinpath("presets")
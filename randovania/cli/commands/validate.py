@@ -1,14 +1,15 @@
-import asyncio
 import time
 from argparse import ArgumentParser
 from pathlib import Path
 
 from randovania.cli.echoes_lib import add_debug_argument
-from randovania.layout.layout_description import LayoutDescription
-from randovania.resolver import debug, resolver
 
 
 def validate_command_logic(args):
+    import asyncio
+    from randovania.layout.layout_description import LayoutDescription
+    from randovania.resolver import debug, resolver
+
     debug.set_level(args.debug)
 
     description = LayoutDescription.from_file(args.layout_file)
@@ -22,7 +23,8 @@ def validate_command_logic(args):
     before = time.perf_counter()
     final_state_by_resolve = asyncio.run(resolver.resolve(
         configuration=configuration,
-        patches=patches
+        patches=patches,
+        process_count=args.process_count,
     ))
     after = time.perf_counter()
     print("Took {} seconds. Game is {}.".format(
@@ -38,6 +40,11 @@ def add_validate_command(sub_parsers):
     )
 
     add_debug_argument(parser)
+    parser.add_argument(
+        "--process-count",
+        type=int,
+        default=1,
+        help="How many processes to use for exploring alternative actions in parallel. Defaults to 1.")
     parser.add_argument(
         "layout_file",
         type=Path,
@@ -8,13 +8,12 @@ from argparse import ArgumentParser
 from pathlib import Path
 from typing import Dict, BinaryIO, Optional, TextIO, List, Any
 
-from randovania.game_description import default_database
-from randovania.game_description.resources.resource_info import ResourceInfo
-from randovania.game_description.resources.search import MissingResource, find_resource_info_with_long_name
-from randovania.games import default_data, binary_data
 from randovania.games.game import RandovaniaGame
 from randovania.lib.enum_lib import iterate_enum
 
+if typing.TYPE_CHECKING:
+    from randovania.game_description.resources.resource_info import ResourceInfo
+
 
 def _get_sorted_list_of_names(input_list: List[Any], prefix: str = "") -> List[str]:
     for item in sorted(input_list, key=lambda x: x.name):
@@ -22,6 +21,7 @@ def _get_sorted_list_of_names(input_list: List[Any], prefix: str = "") -> List[s
 
 
 def decode_data_file(args) -> Dict:
+    from randovania.games import default_data
     json_database: Optional[Path] = args.json_database
     if json_database is not None:
         with json_database.open() as data_file:
@@ -31,6 +31,7 @@ def decode_data_file(args) -> Dict:
 
 
 def export_as_binary(data: dict, output_binary: Path):
+    from randovania.games import binary_data
     with output_binary.open("wb") as x:  # type: BinaryIO
         binary_data.encode(data, x)
 
@@ -109,6 +110,13 @@ def view_area_command_logic(args):
 
 def load_game_description(args):
     from randovania.game_description import data_reader
+    from randovania.games import default_data
+
+    if args.json_database is None:
+        # Split files can be read lazily, so commands that look at a single world don't have to read all of them
+        path = default_data.json_then_binary_path(RandovaniaGame(args.game))
+        if path.is_dir():
+            return data_reader.decode_split_file_lazily(path)
 
     data = decode_data_file(args)
     gd = data_reader.decode_data(data)
@@ -143,6 +151,7 @@ def view_area_command(sub_parsers):
 def update_human_readable_logic(args):
     from randovania.game_description import pretty_print
     from randovania.game_description import data_reader
+    from randovania.games import default_data
     game = RandovaniaGame(args.game)
 
     path, data = default_data.read_json_then_binary(game)
@@ -165,6 +174,8 @@ def refresh_all_logic(args):
     from randovania.game_description import pretty_print
     from randovania.game_description import data_reader, data_writer
     from randovania.game_description import integrity_check
+    from randovania.game_description import default_database
+    from randovania.games import default_data
 
     gd_per_game = {}
     path_per_game = {}
@@ -220,37 +231,39 @@ def refresh_all_command(sub_parsers):
 
 def _list_paths_with_resource(game,
                               print_only_area: bool,
-                              resource: ResourceInfo,
+                              resource: "ResourceInfo",
                               needed_quantity: Optional[int]):
     from randovania.game_description.game_description import GameDescription
 
     count = 0
     game = typing.cast(GameDescription, game)
+    areas_with_resource = {}
 
-    for area in game.world_list.all_areas:
-        area_had_resource = False
-
-        for source, connection in area.connections.items():
-            for target, requirement in connection.items():
-                for alternative in requirement.as_set(game.resource_database).alternatives:
-                    individual = alternative.get(resource)
-                    if individual is None:
-                        continue
-
-                    if needed_quantity is None or needed_quantity == individual.amount:
-                        area_had_resource = True
-                        if not print_only_area:
-                            print("At {0}, from {1} to {2}:\n{3}\n".format(
-                                game.world_list.area_name(area),
-                                source.name,
-                                target.name,
-                                sorted(individual for individual in alternative.values()
-                                       if individual.resource != resource)
-                            ))
-                        count += 1
+    for usage in game.world_list.requirements_using_resource(resource, game.resource_database):
+        if usage.target is None:
+            continue
 
-        if area_had_resource and print_only_area:
-            print(game.world_list.area_name(area))
+        area_name = game.world_list.area_name(game.world_list.nodes_to_area(usage.source))
+        for alternative in usage.requirement.as_set(game.resource_database).alternatives:
+            individual = alternative.get(resource)
+            if individual is None:
+                continue
+
+            if needed_quantity is None or needed_quantity == individual.amount:
+                areas_with_resource[area_name] = None
+                if not print_only_area:
+                    print("At {0}, from {1} to {2}:\n{3}\n".format(
+                        area_name,
+                        usage.source.name,
+                        usage.target.name,
+                        sorted(individual for individual in alternative.values()
+                               if individual.resource != resource)
+                    ))
+                count += 1
+
+    if print_only_area:
+        for area_name in areas_with_resource.keys():
+            print(area_name)
 
     print("Total routes: {}".format(count))
 
@@ -296,6 +309,7 @@ def list_paths_with_dangerous_command(sub_parsers):
 
 
 def list_paths_with_resource_logic(args):
+    from randovania.game_description.resources.search import MissingResource, find_resource_info_with_long_name
     gd = load_game_description(args)
 
     resource = None
@@ -511,6 +525,7 @@ def rename_docks_logic(args):
     from randovania.game_description.editor import Editor
     from randovania.game_description.world.node import DockNode
     from randovania.game_description import integrity_check
+    from randovania.games import default_data
 
     game = RandovaniaGame(args.game)
 
@@ -33,6 +33,7 @@ from randovania.game_description.world.node import (
 )
 from randovania.game_description.world.node_identifier import NodeIdentifier
 from randovania.game_description.world.world import World
+from randovania.game_description.world.lazy_world_list import LazyWorldList
 from randovania.game_description.world.world_list import WorldList
 from randovania.games.game import RandovaniaGame
 
@@ -468,6 +469,37 @@ def read_split_file(dir_path: Path):
     return data
 
 
+def decode_split_file_lazily(dir_path: Path) -> GameDescription:
+    """
+    Same as `decode_data(read_split_file(dir_path))`, except each world file is only read and decoded when needed.
+    See LazyWorldList for which lookups avoid reading every world.
+    Data that needs migration is read all at once, since migrations work on the complete data.
+    """
+    with dir_path.joinpath("header.json").open(encoding="utf-8") as meta_file:
+        data = read_json_file(meta_file)
+
+    if data["schema_version"] != game_migration.CURRENT_VERSION:
+        return decode_data(read_split_file(dir_path))
+
+    world_files = data.pop("worlds")
+    data["worlds"] = []
+    world_reader, game = decode_data_with_world_reader(data)
+
+    def world_source(world_file_name: str):
+        def read():
+            with dir_path.joinpath(world_file_name).open(encoding="utf-8") as world_file:
+                return read_json_file(world_file)
+
+        return read
+
+    def decode_world(world_data: Dict, first_node_index: int) -> World:
+        world_reader.generic_index = first_node_index - 1
+        return world_reader.read_world(world_data)
+
+    game.world_list = LazyWorldList([world_source(name) for name in world_files], decode_world)
+    return game
+
+
 def raise_on_duplicate_keys(ordered_pairs: list[tuple[Hashable, Any]]) -> dict:
     """Raise ValueError if a duplicate key exists in provided ordered list of pairs, otherwise return a dict."""
     dict_out = {}
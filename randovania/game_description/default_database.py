@@ -1,7 +1,13 @@
 import functools
+import hashlib
 import json
+import logging
+import os
+import pickle
 from pathlib import Path
+from typing import List, Optional
 
+import randovania
 from randovania import get_data_path
 from randovania.game_description import data_reader
 from randovania.game_description.data_reader import read_resource_database
@@ -16,9 +22,100 @@ def resource_database_for(game: RandovaniaGame) -> ResourceDatabase:
     return game_description_for(game).resource_database
 
 
+# Where decoded GameDescriptions are cached between runs. None disables the cache.
+# When unset, a `game_description_cache` folder in the local data dir is used, if appdirs is installed.
+GAME_DESCRIPTION_CACHE_DIR: Optional[Path] = None
+GAME_DESCRIPTION_CACHE_ENABLED = True
+
+# Increase when the way the cache is written changes
+_CACHE_FORMAT_VERSION = 1
+
+
+def _game_description_cache_dir() -> Optional[Path]:
+    if not GAME_DESCRIPTION_CACHE_ENABLED:
+        return None
+    if GAME_DESCRIPTION_CACHE_DIR is not None:
+        return GAME_DESCRIPTION_CACHE_DIR
+
+    try:
+        from randovania.interface_common import persistence
+    except ImportError:
+        # appdirs is only installed with the gui extra
+        return None
+
+    return persistence.local_data_dir().joinpath("game_description_cache")
+
+
+def _files_to_hash(game: RandovaniaGame) -> List[Path]:
+    data_path = default_data.json_then_binary_path(game)
+    files = sorted(data_path.rglob("*.json")) if data_path.is_dir() else [data_path]
+
+    if not randovania.is_frozen():
+        # The cache has instances of these classes, so it's only valid for the code that wrote it.
+        # Releases have a unique version, but development versions don't.
+        package = Path(__file__).parent
+        files.extend(sorted(package.rglob("*.py")))
+        files.append(package.parent.joinpath("games", "game.py"))
+
+    return files
+
+
+def game_description_cache_key(game: RandovaniaGame) -> str:
+    """
+    A hash of everything a cached GameDescription for the given game depends on:
+    its data files, the Randovania version and, when running from source, the game_description code.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{_CACHE_FORMAT_VERSION}:{randovania.VERSION}:{pickle.HIGHEST_PROTOCOL}".encode())
+    for path in _files_to_hash(game):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _read_cached_game_description(path: Path) -> Optional[GameDescription]:
+    try:
+        with path.open("rb") as cache_file:
+            return pickle.load(cache_file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning("Unable to read cached game description at %s: %s", path, e)
+        return None
+
+
+def _write_cached_game_description(cache_dir: Path, path: Path, game: RandovaniaGame, description: GameDescription):
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for old_cache in cache_dir.glob(f"{game.value}-*.pickle"):
+            old_cache.unlink()
+
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with temporary.open("wb") as cache_file:
+            pickle.dump(description, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+
+    except OSError as e:
+        logging.warning("Unable to write cached game description at %s: %s", path, e)
+
+
+def _decode_game_description(game: RandovaniaGame) -> GameDescription:
+    cache_dir = _game_description_cache_dir()
+    if cache_dir is None:
+        return data_reader.decode_data(default_data.read_json_then_binary(game)[1])
+
+    path = cache_dir.joinpath(f"{game.value}-{game_description_cache_key(game)}.pickle")
+    result = _read_cached_game_description(path)
+    if result is None:
+        result = data_reader.decode_data(default_data.read_json_then_binary(game)[1])
+        _write_cached_game_description(cache_dir, path, game, result)
+
+    return result
+
+
 @functools.lru_cache()
 def game_description_for(game: RandovaniaGame) -> GameDescription:
-    result = data_reader.decode_data(default_data.read_json_then_binary(game)[1])
+    result = _decode_game_description(game)
     if result.game != game:
         raise ValueError(f"Game Description for {game} has game field {result.game}")
     return result
@@ -24,6 +24,7 @@ class Editor:
             for node in area.nodes
             if node in current_connections
         }
+        self.game.world_list.invalidate_node_cache()
 
     def add_node(self, area: Area, node: Node):
         if area.node_with_name(node.name) is not None:
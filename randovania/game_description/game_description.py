@@ -5,6 +5,7 @@ import typing
 from typing import Iterator, FrozenSet, Dict, Optional, List, Tuple
 
 from randovania.game_description.game_patches import GamePatches
+from randovania.game_description.requirement_compiler import RequirementCompiler
 from randovania.game_description.requirements import SatisfiableRequirements, Requirement
 from randovania.game_description.resources.resource_database import ResourceDatabase
 from randovania.game_description.resources.resource_info import ResourceInfo, ResourceGainTuple, CurrentResources
@@ -60,6 +61,7 @@ class GameDescription:
     initial_states: Dict[str, ResourceGainTuple]
     minimal_logic: Optional[MinimalLogicData]
     _dangerous_resources: Optional[FrozenSet[ResourceInfo]] = None
+    _requirement_compiler: Optional[RequirementCompiler] = None
     world_list: WorldList
     mutable: bool = False
 
@@ -104,6 +106,7 @@ class GameDescription:
 
         self.world_list.patch_requirements(resources, damage_multiplier, self.resource_database)
         self._dangerous_resources = None
+        self._requirement_compiler = None
 
     def create_game_patches(self) -> GamePatches:
         elevator_connection: Dict[NodeIdentifier, AreaIdentifier] = {
@@ -123,8 +126,29 @@ class GameDescription:
                 _calculate_dangerous_resources_in_db(self.dock_weakness_database, self.resource_database))
         return self._dangerous_resources
 
+    @property
+    def requirement_compiler(self) -> RequirementCompiler:
+        if self._requirement_compiler is None or self._requirement_compiler.database is not self.resource_database:
+            self._requirement_compiler = RequirementCompiler(self.resource_database)
+        return self._requirement_compiler
+
     def make_mutable_copy(self) -> "GameDescription":
-        result = copy.deepcopy(self)
+        """
+        Creates a copy that can be changed with `patch_requirements`. Only the worlds, areas and their connections
+        are copied, while nodes and requirements are shared with this GameDescription.
+        :return:
+        """
+        result = GameDescription(
+            game=self.game,
+            resource_database=self.resource_database,
+            dock_weakness_database=self.dock_weakness_database,
+            world_list=self.world_list.make_mutable_copy(),
+            victory_condition=self.victory_condition,
+            starting_location=self.starting_location,
+            initial_states=copy.copy(self.initial_states),
+            minimal_logic=self.minimal_logic,
+        )
+        result._dangerous_resources = self._dangerous_resources
         result.mutable = True
         return result
 
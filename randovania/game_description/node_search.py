@@ -1,7 +1,5 @@
 from typing import Dict, Optional
 
-import networkx
-
 from randovania.game_description.game_patches import GamePatches, ElevatorConnection
 from randovania.game_description.resources.pickup_index import PickupIndex
 from randovania.game_description.resources.resource_info import ResourceInfo
@@ -25,6 +23,8 @@ def distances_to_node(world_list: WorldList, starting_node: Node,
     :param patches:
     :return: Dict keyed by area to shortest distance to starting_node.
     """
+    import networkx
+
     g = networkx.DiGraph()
 
     dock_connections = patches.dock_connection if patches is not None else {}
@@ -56,10 +56,10 @@ def distances_to_node(world_list: WorldList, starting_node: Node,
 
 
 def pickup_index_to_node(world_list: WorldList, index: PickupIndex) -> PickupNode:
-    for node in world_list.all_nodes:
-        if isinstance(node, PickupNode) and node.pickup_index == index:
-            return node
-    raise ValueError(f"PickupNode with {index} not found.")
+    try:
+        return world_list.node_from_pickup_index(index)
+    except KeyError:
+        raise ValueError(f"PickupNode with {index} not found.")
 
 
 def node_with_resource(world_list: WorldList, resource: ResourceInfo) -> ResourceNode:
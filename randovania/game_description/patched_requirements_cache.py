@@ -0,0 +1,69 @@
+import collections
+from typing import Dict, Hashable, Tuple
+
+from randovania.game_description.requirements import Requirement
+from randovania.game_description.resources.resource_database import ResourceDatabase
+from randovania.game_description.resources.resource_info import CurrentResources
+
+PatchedRequirements = Dict[Requirement, Requirement]
+
+
+class PatchedRequirementsCache:
+    """
+    Remembers the result of `requirement.patch_requirements(...).simplify()` for each set of arguments, so
+    the generation retries and later seeds with the same configuration don't have to patch everything again.
+
+    The result only depends on the static resources, the damage multiplier and the database's templates, so each
+    combination of these has its own table. Least recently used tables are discarded when there are more than
+    `max_tables`, or more than `max_requirements` requirements among all tables.
+    """
+    max_tables: int
+    max_requirements: int
+    _tables: "collections.OrderedDict[Hashable, PatchedRequirements]"
+
+    def __init__(self, max_tables: int = 8, max_requirements: int = 200_000):
+        self.max_tables = max_tables
+        self.max_requirements = max_requirements
+        self._tables = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def clear(self):
+        self._tables.clear()
+
+    def trim(self):
+        """
+        Discards the least recently used tables until the limits are respected. The most recently used table is
+        always kept, even if it alone is over `max_requirements`.
+        """
+        total = sum(len(table) for table in self._tables.values())
+        while len(self._tables) > 1 and (len(self._tables) > self.max_tables or total > self.max_requirements):
+            _, table = self._tables.popitem(last=False)
+            total -= len(table)
+
+    def table_for(self, static_resources: CurrentResources, damage_multiplier: float,
+                  database: ResourceDatabase) -> PatchedRequirements:
+        """
+        Gets the table of patched requirements for the given arguments, creating an empty one if needed.
+        Callers should add the requirements they patch with these arguments to it, then call `trim`.
+        :param static_resources:
+        :param damage_multiplier:
+        :param database:
+        :return:
+        """
+        key: Tuple = (
+            frozenset(static_resources.items()),
+            damage_multiplier,
+            frozenset(database.requirement_template.items()),
+        )
+        table = self._tables.get(key)
+        if table is None:
+            table = {}
+            self._tables[key] = table
+        else:
+            self._tables.move_to_end(key)
+        return table
+
+
+PATCHED_REQUIREMENTS_CACHE = PatchedRequirementsCache()
@@ -0,0 +1,265 @@
+"""Compiles Requirement trees into closures that evaluate against a dense resource vector, for use in hot loops."""
+import dataclasses
+from math import ceil, inf
+from typing import Callable, Dict, List, NamedTuple, Sequence, Union
+
+from randovania.game_description.requirements import (
+    Requirement, RequirementAnd, RequirementOr, ResourceRequirement, RequirementTemplate,
+    RequirementList, RequirementSet, MAX_DAMAGE,
+)
+from randovania.game_description.resources.resource_database import ResourceDatabase
+from randovania.game_description.resources.resource_info import CurrentResources, ResourceInfo, ResourceCollection
+
+ResourceCounts = Sequence[int]
+DamageMultipliers = List[float]
+SatisfiedFunction = Callable[[ResourceCounts, DamageMultipliers, int], bool]
+DamageFunction = Callable[[ResourceCounts, DamageMultipliers], int]
+MinimumEnergyFunction = Callable[[ResourceCounts, DamageMultipliers], float]
+CompilableRequirement = Union[Requirement, RequirementList, RequirementSet]
+
+
+class ResourceVector(NamedTuple):
+    """The resources of a state, in the layout expected by a CompiledRequirement."""
+    counts: ResourceCounts
+    damage_multipliers: DamageMultipliers
+
+
+@dataclasses.dataclass(frozen=True)
+class CompiledRequirement:
+    """
+    Equivalent to `Requirement.satisfied` and `Requirement.damage`, with the resources given as a ResourceVector.
+    RequirementList and RequirementSet are compiled with the same semantics as RequirementAnd and RequirementOr.
+
+    `minimum_energy` is the smallest energy for which `satisfied` is True, which doesn't depend on the energy:
+    `-inf` when any energy works and `inf` when the resources aren't enough.
+    """
+    satisfied: SatisfiedFunction
+    damage: DamageFunction
+    minimum_energy: MinimumEnergyFunction
+
+
+def _satisfied_always(counts: ResourceCounts, multipliers: DamageMultipliers, energy: int) -> bool:
+    return True
+
+
+def _satisfied_never(counts: ResourceCounts, multipliers: DamageMultipliers, energy: int) -> bool:
+    return False
+
+
+def _no_damage(counts: ResourceCounts, multipliers: DamageMultipliers) -> int:
+    return 0
+
+
+def _max_damage(counts: ResourceCounts, multipliers: DamageMultipliers) -> int:
+    return MAX_DAMAGE
+
+
+def _any_energy(counts: ResourceCounts, multipliers: DamageMultipliers) -> float:
+    return -inf
+
+
+def _no_energy(counts: ResourceCounts, multipliers: DamageMultipliers) -> float:
+    return inf
+
+
+_TRIVIAL = CompiledRequirement(_satisfied_always, _no_damage, _any_energy)
+_IMPOSSIBLE = CompiledRequirement(_satisfied_never, _max_damage, _no_energy)
+
+
+def _compile_all(items: List[CompiledRequirement]) -> CompiledRequirement:
+    if not items:
+        return _TRIVIAL
+
+    satisfied_functions = tuple(item.satisfied for item in items)
+    damage_pairs = tuple((item.satisfied, item.damage) for item in items)
+
+    if len(satisfied_functions) == 1:
+        satisfied = satisfied_functions[0]
+    elif len(satisfied_functions) == 2:
+        first, second = satisfied_functions
+
+        def satisfied(counts: ResourceCounts, multipliers: DamageMultipliers, energy: int) -> bool:
+            return first(counts, multipliers, energy) and second(counts, multipliers, energy)
+    else:
+        def satisfied(counts: ResourceCounts, multipliers: DamageMultipliers, energy: int) -> bool:
+            for item_satisfied in satisfied_functions:
+                if not item_satisfied(counts, multipliers, energy):
+                    return False
+            return True
+
+    def damage(counts: ResourceCounts, multipliers: DamageMultipliers) -> int:
+        result = 0
+        for item_satisfied, item_damage in damage_pairs:
+            if item_satisfied(counts, multipliers, MAX_DAMAGE):
+                result += item_damage(counts, multipliers)
+            else:
+                return MAX_DAMAGE
+        return result
+
+    minimum_energy_functions = tuple(item.minimum_energy for item in items)
+
+    def minimum_energy(counts: ResourceCounts, multipliers: DamageMultipliers) -> float:
+        return max(item_minimum(counts, multipliers) for item_minimum in minimum_energy_functions)
+
+    return CompiledRequirement(satisfied, damage, minimum_energy)
+
+
+def _compile_any(items: List[CompiledRequirement]) -> CompiledRequirement:
+    if not items:
+        return _IMPOSSIBLE
+
+    satisfied_functions = tuple(item.satisfied for item in items)
+    damage_pairs = tuple((item.satisfied, item.damage) for item in items)
+
+    if len(satisfied_functions) == 1:
+        satisfied = satisfied_functions[0]
+    else:
+        def satisfied(counts: ResourceCounts, multipliers: DamageMultipliers, energy: int) -> bool:
+            for item_satisfied in satisfied_functions:
+                if item_satisfied(counts, multipliers, energy):
+                    return True
+            return False
+
+    def damage(counts: ResourceCounts, multipliers: DamageMultipliers) -> int:
+        values = [
+            item_damage(counts, multipliers)
+            for item_satisfied, item_damage in damage_pairs
+            if item_satisfied(counts, multipliers, MAX_DAMAGE)
+        ]
+        if values:
+            return min(values)
+        return MAX_DAMAGE
+
+    minimum_energy_functions = tuple(item.minimum_energy for item in items)
+
+    def minimum_energy(counts: ResourceCounts, multipliers: DamageMultipliers) -> float:
+        return min(item_minimum(counts, multipliers) for item_minimum in minimum_energy_functions)
+
+    return CompiledRequirement(satisfied, damage, minimum_energy)
+
+
+class RequirementCompiler:
+    """
+    Compiles requirements for a given ResourceDatabase, caching the results.
+    Templates are expanded using the database, so a compiler must not be shared between databases.
+    The cache is discarded when the templates are changed with `ResourceDatabase.set_requirement_template`.
+    """
+    database: ResourceDatabase
+    _cache: Dict[CompilableRequirement, CompiledRequirement]
+    _template_version: int
+    _damage_indices: Dict[ResourceInfo, int]
+    _damage_resources: List[ResourceInfo]
+
+    def __init__(self, database: ResourceDatabase):
+        self.database = database
+        self._indexer = database.resource_indexer
+        self._cache = {}
+        self._template_version = database.requirement_template_version
+        self._damage_indices = {}
+        self._damage_resources = []
+        for resource in database.damage:
+            self._damage_index_of(resource)
+
+    def _damage_index_of(self, resource: ResourceInfo) -> int:
+        index = self._damage_indices.get(resource)
+        if index is None:
+            index = len(self._damage_resources)
+            self._damage_indices[resource] = index
+            self._damage_resources.append(resource)
+        return index
+
+    def vector_for(self, current_resources: CurrentResources) -> ResourceVector:
+        """
+        Creates the ResourceVector to be used with requirements compiled by this compiler.
+        :param current_resources:
+        :return:
+        """
+        if isinstance(current_resources, ResourceCollection) and current_resources.indexer is self._indexer:
+            # Already in the expected layout. Missing resources are zero, so the presence flags don't matter.
+            counts = current_resources.counts
+        else:
+            index_of = self._indexer.index_of
+            indexed_quantities = [(index_of(resource), quantity)
+                                  for resource, quantity in current_resources.items()]
+
+            counts = [0] * len(self._indexer)
+            for index, quantity in indexed_quantities:
+                counts[index] = quantity
+
+        multipliers = [
+            self.database.get_damage_reduction(resource, current_resources)
+            for resource in self._damage_resources
+        ]
+        return ResourceVector(counts, multipliers)
+
+    def compile(self, requirement: CompilableRequirement) -> CompiledRequirement:
+        if self._template_version != self.database.requirement_template_version:
+            self._cache = {}
+            self._template_version = self.database.requirement_template_version
+
+        result = self._cache.get(requirement)
+        if result is None:
+            result = self._compile_uncached(requirement)
+            self._cache[requirement] = result
+        return result
+
+    def _compile_uncached(self, requirement: CompilableRequirement) -> CompiledRequirement:
+        if isinstance(requirement, ResourceRequirement):
+            return self._compile_resource_requirement(requirement)
+
+        elif isinstance(requirement, RequirementAnd):
+            return _compile_all([self.compile(item) for item in requirement.items])
+
+        elif isinstance(requirement, RequirementOr):
+            return _compile_any([self.compile(item) for item in requirement.items])
+
+        elif isinstance(requirement, RequirementTemplate):
+            return self.compile(requirement.template_requirement(self.database))
+
+        elif isinstance(requirement, RequirementList):
+            return _compile_all([self.compile(item) for item in requirement.values()])
+
+        elif isinstance(requirement, RequirementSet):
+            return _compile_any([self.compile(alternative) for alternative in requirement.alternatives])
+
+        else:
+            raise TypeError(f"Unable to compile requirement of type {type(requirement)}")
+
+    def _compile_resource_requirement(self, requirement: ResourceRequirement) -> CompiledRequirement:
+        amount = requirement.amount
+
+        if requirement.is_damage:
+            assert not requirement.negate, "Damage requirements shouldn't have the negate flag"
+            damage_index = self._damage_index_of(requirement.resource)
+
+            def damage(counts: ResourceCounts, multipliers: DamageMultipliers) -> int:
+                return ceil(multipliers[damage_index] * amount)
+
+            def satisfied(counts: ResourceCounts, multipliers: DamageMultipliers, energy: int) -> bool:
+                return energy > ceil(multipliers[damage_index] * amount)
+
+            def minimum_energy(counts: ResourceCounts, multipliers: DamageMultipliers) -> float:
+                return ceil(multipliers[damage_index] * amount) + 1
+
+            return CompiledRequirement(satisfied, damage, minimum_energy)
+
+        index = self._indexer.index_of(requirement.resource)
+
+        # Vectors created before this resource got an index are too short for it, but it means they don't have it.
+        if requirement.negate:
+            def satisfied(counts: ResourceCounts, multipliers: DamageMultipliers, energy: int) -> bool:
+                try:
+                    return counts[index] < amount
+                except IndexError:
+                    return 0 < amount
+        else:
+            def satisfied(counts: ResourceCounts, multipliers: DamageMultipliers, energy: int) -> bool:
+                try:
+                    return counts[index] >= amount
+                except IndexError:
+                    return 0 >= amount
+
+        def minimum_energy(counts: ResourceCounts, multipliers: DamageMultipliers) -> float:
+            return -inf if satisfied(counts, multipliers, 0) else inf
+
+        return CompiledRequirement(satisfied, _no_damage, minimum_energy)
@@ -1,5 +1,7 @@
 import dataclasses
+import functools
 import logging
+import weakref
 from functools import lru_cache
 from math import ceil
 from typing import Optional, Iterable, FrozenSet, Iterator, Tuple, List, Type, Union
@@ -11,7 +13,30 @@ from randovania.game_description.resources.resource_type import ResourceType
 MAX_DAMAGE = 9999999
 
 
+def _memoize_as_set(as_set):
+    """
+    Remembers the interned result of `as_set` in the requirement, for as long as it's called with the same database
+    and its templates weren't changed with `ResourceDatabase.set_requirement_template`.
+    """
+
+    @functools.wraps(as_set)
+    def wrapper(self: "Requirement", database: ResourceDatabase) -> "RequirementSet":
+        version = getattr(database, "requirement_template_version", None)
+        cached = self._cached_as_set
+        if cached is not None and cached[0] is database and cached[1] == version:
+            return cached[2]
+
+        result = intern_requirement_set(as_set(self, database))
+        # ResourceRequirement is frozen
+        object.__setattr__(self, "_cached_as_set", (database, version, result))
+        return result
+
+    return wrapper
+
+
 class Requirement:
+    _cached_as_set: Optional[Tuple[ResourceDatabase, Optional[int], "RequirementSet"]] = None
+
     def damage(self, current_resources: CurrentResources, database: ResourceDatabase) -> int:
         raise NotImplementedError()
 
@@ -61,6 +86,12 @@ class Requirement:
     def iterate_resource_requirements(self, database: ResourceDatabase):
         raise NotImplementedError()
 
+    def __getstate__(self):
+        # Copies and pickles shouldn't carry the cached as_set, as it references a ResourceDatabase
+        state = dict(self.__dict__)
+        state.pop("_cached_as_set", None)
+        return state
+
 
 class RequirementArrayBase(Requirement):
     items: Tuple[Requirement, ...]
@@ -150,6 +181,7 @@ class RequirementAnd(RequirementArrayBase):
 
         return RequirementAnd(new_items, comment=self.comment)
 
+    @_memoize_as_set
     def as_set(self, database: ResourceDatabase) -> "RequirementSet":
         result = RequirementSet.trivial()
         for item in self.items:
@@ -228,6 +260,7 @@ class RequirementOr(RequirementArrayBase):
 
         return RequirementOr(final_items, comment=self.comment)
 
+    @_memoize_as_set
     def as_set(self, database: ResourceDatabase) -> "RequirementSet":
         alternatives = set()
         for item in self.items:
@@ -357,6 +390,7 @@ class ResourceRequirement(Requirement):
             else:
                 return self
 
+    @_memoize_as_set
     def as_set(self, database: ResourceDatabase) -> "RequirementSet":
         return RequirementSet([
             RequirementList([
@@ -390,6 +424,7 @@ class RequirementTemplate(Requirement):
     def simplify(self, keep_comments: bool = False) -> Requirement:
         return self
 
+    @_memoize_as_set
     def as_set(self, database: ResourceDatabase) -> "RequirementSet":
         return self.template_requirement(database).as_set(database)
 
@@ -417,8 +452,7 @@ class RequirementList:
         self.items = frozenset(items)
 
     def __eq__(self, other):
-        return isinstance(
-            other, RequirementList) and self.items == other.items
+        return self is other or (isinstance(other, RequirementList) and self.items == other.items)
 
     @property
     def as_stable_sort_tuple(self):
@@ -513,8 +547,7 @@ class RequirementSet:
         return self
 
     def __eq__(self, other):
-        return isinstance(
-            other, RequirementSet) and self.alternatives == other.alternatives
+        return self is other or (isinstance(other, RequirementSet) and self.alternatives == other.alternatives)
 
     def __hash__(self) -> int:
         if self._cached_hash is None:
@@ -565,6 +598,12 @@ class RequirementSet:
 
     def union(self, other: "RequirementSet") -> "RequirementSet":
         """Create a new RequirementSet that is only satisfied when both are satisfied"""
+        trivial = RequirementSet.trivial()
+        if other == trivial:
+            return self
+        if self == trivial:
+            return other
+
         return RequirementSet(
             a.union(b)
             for a in self.alternatives
@@ -604,3 +643,34 @@ class RequirementSet:
 
 
 SatisfiableRequirements = FrozenSet[RequirementList]
+
+# Equal RequirementList and RequirementSet share the same instance while any of them is in use, so the results of
+# as_set use less memory and compare mostly by identity.
+_interned_lists: "weakref.WeakValueDictionary[FrozenSet[ResourceRequirement], RequirementList]" = \
+    weakref.WeakValueDictionary()
+_interned_sets: "weakref.WeakValueDictionary[FrozenSet[RequirementList], RequirementSet]" = \
+    weakref.WeakValueDictionary()
+
+
+def intern_requirement_list(requirement_list: RequirementList) -> RequirementList:
+    """
+    Gets the shared instance that is equal to the given RequirementList, which becomes the shared one if needed.
+    """
+    result = _interned_lists.get(requirement_list.items)
+    if result is None:
+        result = _interned_lists[requirement_list.items] = requirement_list
+    return result
+
+
+def intern_requirement_set(requirement_set: RequirementSet) -> RequirementSet:
+    """
+    Gets the shared instance that is equal to the given RequirementSet, with all alternatives interned as well.
+    """
+    result = _interned_sets.get(requirement_set.alternatives)
+    if result is None:
+        # The alternatives are already without redundancy, so skip the constructor
+        result = RequirementSet.__new__(RequirementSet)
+        result.alternatives = frozenset(intern_requirement_list(alternative)
+                                        for alternative in requirement_set.alternatives)
+        _interned_sets[result.alternatives] = result
+    return result
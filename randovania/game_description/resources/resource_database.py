@@ -4,6 +4,7 @@ from typing import List, Dict, Optional, Callable
 from randovania.game_description.resources import search
 from randovania.game_description.resources.damage_resource_info import DamageReduction
 from randovania.game_description.resources.item_resource_info import ItemResourceInfo
+from randovania.game_description.resources.resource_index import ResourceIndexer
 from randovania.game_description.resources.resource_info import ResourceInfo, CurrentResources
 from randovania.game_description.resources.resource_type import ResourceType
 from randovania.game_description.resources.simple_resource_info import SimpleResourceInfo
@@ -31,6 +32,20 @@ class ResourceDatabase:
     multiworld_magic_item_index: Optional[str]
     base_damage_reduction: Callable[["ResourceDatabase", CurrentResources], float] = default_base_damage_reduction
 
+    # Shared with copies made via `dataclasses.replace`, so indices stay valid for patched databases
+    resource_indexer: ResourceIndexer = dataclasses.field(default_factory=ResourceIndexer, compare=False, repr=False)
+
+    # Increased by `set_requirement_template`, so what's remembered about templates can be discarded
+    requirement_template_version: int = dataclasses.field(default=0, compare=False, repr=False)
+
+    def set_requirement_template(self, name: str, requirement: "Requirement"):
+        """
+        Adds or changes a template. Use this instead of changing `requirement_template` once any requirement was
+        used with this database, so `Requirement.as_set` and the RequirementCompiler see the change.
+        """
+        self.requirement_template[name] = requirement
+        object.__setattr__(self, "requirement_template_version", self.requirement_template_version + 1)
+
     def get_by_type(self, resource_type: ResourceType) -> List[ResourceInfo]:
         if resource_type == ResourceType.ITEM:
             return self.item
@@ -0,0 +1,48 @@
+from typing import Dict, List, Hashable, Optional
+
+
+class ResourceIndexer:
+    """
+    Assigns a dense, stable integer index to each resource, so resource quantities can be stored in flat arrays.
+    Indices are assigned on first use, which covers resources that aren't listed in the ResourceDatabase,
+    such as PickupIndex and LogbookAsset.
+    """
+    _indices: Dict[Hashable, int]
+    _resources: List[Hashable]
+
+    def __init__(self):
+        self._indices = {}
+        self._resources = []
+
+    def __len__(self) -> int:
+        return len(self._resources)
+
+    def __contains__(self, resource: Hashable) -> bool:
+        return resource in self._indices
+
+    def __repr__(self):
+        return "ResourceIndexer[{} resources]".format(len(self._resources))
+
+    def index_of(self, resource: Hashable) -> int:
+        """
+        Gets the index of the given resource, assigning a new one if it's the first time it's seen.
+        :param resource:
+        :return:
+        """
+        index = self._indices.get(resource)
+        if index is None:
+            index = len(self._resources)
+            self._indices[resource] = index
+            self._resources.append(resource)
+        return index
+
+    def find(self, resource: Hashable) -> Optional[int]:
+        """
+        Gets the index of the given resource, or None if it was never assigned one.
+        :param resource:
+        :return:
+        """
+        return self._indices.get(resource)
+
+    def resource_at(self, index: int) -> Hashable:
+        return self._resources[index]
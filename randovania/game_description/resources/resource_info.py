@@ -1,8 +1,10 @@
-from typing import Union, Tuple, Iterator, Dict
+from array import array
+from typing import Union, Tuple, Iterator, MutableMapping, Iterable, Mapping, Optional, Any
 
 from randovania.game_description.resources.item_resource_info import ItemResourceInfo
 from randovania.game_description.resources.logbook_asset import LogbookAsset
 from randovania.game_description.resources.pickup_index import PickupIndex
+from randovania.game_description.resources.resource_index import ResourceIndexer
 from randovania.game_description.resources.simple_resource_info import SimpleResourceInfo
 from randovania.game_description.resources.trick_resource_info import TrickResourceInfo
 
@@ -11,7 +13,139 @@ ResourceInfo = Union[SimpleResourceInfo, ItemResourceInfo, TrickResourceInfo,
 ResourceQuantity = Tuple[ResourceInfo, int]
 ResourceGainTuple = Tuple[ResourceQuantity, ...]
 ResourceGain = Iterator[ResourceQuantity]
-CurrentResources = Dict[ResourceInfo, int]
+CurrentResources = MutableMapping[ResourceInfo, int]
+
+_ZERO = array("l", [0])
+
+
+class ResourceCollection(MutableMapping[ResourceInfo, int]):
+    """
+    A CurrentResources that stores the quantities in a flat array, using the indices of a ResourceIndexer.
+    Copies share the arrays until one of them is modified, so copying is cheap even for big collections.
+    Iteration follows the index order.
+    """
+    __slots__ = ("indexer", "_counts", "_present", "_shared")
+
+    indexer: ResourceIndexer
+    _counts: array
+    _present: bytearray
+    _shared: bool
+
+    def __init__(self, indexer: ResourceIndexer):
+        self.indexer = indexer
+        self._counts = _ZERO * len(indexer)
+        self._present = bytearray(len(indexer))
+        self._shared = False
+
+    @classmethod
+    def from_resources(cls, indexer: ResourceIndexer, resources: Mapping[ResourceInfo, int]) -> "ResourceCollection":
+        result = cls(indexer)
+        for resource, quantity in resources.items():
+            result[resource] = quantity
+        return result
+
+    @property
+    def counts(self) -> array:
+        """
+        The quantity of each resource, by index. Resources without an entry or with an index past the end have none.
+        Must not be modified directly.
+        """
+        return self._counts
+
+    def _prepare_write(self, index: int):
+        if self._shared:
+            self._counts = array("l", self._counts)
+            self._present = bytearray(self._present)
+            self._shared = False
+
+        missing = index + 1 - len(self._counts)
+        if missing > 0:
+            self._counts.extend(_ZERO * missing)
+            self._present.extend(bytes(missing))
+
+    def _present_index(self, resource: ResourceInfo) -> Optional[int]:
+        index = self.indexer.find(resource)
+        if index is not None and index < len(self._present) and self._present[index]:
+            return index
+        return None
+
+    def __getitem__(self, resource: ResourceInfo) -> int:
+        index = self._present_index(resource)
+        if index is None:
+            raise KeyError(resource)
+        return self._counts[index]
+
+    def get(self, resource: ResourceInfo, default: Any = None) -> Any:
+        index = self._present_index(resource)
+        if index is None:
+            return default
+        return self._counts[index]
+
+    def __contains__(self, resource: Any) -> bool:
+        return self._present_index(resource) is not None
+
+    def __setitem__(self, resource: ResourceInfo, quantity: int):
+        index = self.indexer.index_of(resource)
+        self._prepare_write(index)
+        self._counts[index] = quantity
+        self._present[index] = 1
+
+    def __delitem__(self, resource: ResourceInfo):
+        index = self._present_index(resource)
+        if index is None:
+            raise KeyError(resource)
+        self._prepare_write(index)
+        self._counts[index] = 0
+        self._present[index] = 0
+
+    def __iter__(self) -> Iterator[ResourceInfo]:
+        resource_at = self.indexer.resource_at
+        for index, present in enumerate(self._present):
+            if present:
+                yield resource_at(index)
+
+    def __len__(self) -> int:
+        return self._present.count(1)
+
+    def __repr__(self):
+        return "ResourceCollection({})".format(dict(self.items()))
+
+    def items(self) -> Iterable[ResourceQuantity]:
+        resource_at = self.indexer.resource_at
+        counts = self._counts
+        return [(resource_at(index), counts[index]) for index, present in enumerate(self._present) if present]
+
+    def add_resource_gain(self, resource_gain: ResourceGain):
+        """
+        Adds all resources from the given gain to this collection, writing directly into the arrays.
+        The gain is consumed lazily, as it might depend on the quantities being changed.
+        :param resource_gain:
+        """
+        index_of = self.indexer.index_of
+        self._prepare_write(0)
+        counts = self._counts
+        present = self._present
+
+        for resource, quantity in resource_gain:
+            index = index_of(resource)
+            if index >= len(counts):
+                self._prepare_write(index)
+            counts[index] += quantity
+            present[index] = 1
+
+    def copy(self) -> "ResourceCollection":
+        result = ResourceCollection.__new__(ResourceCollection)
+        result.indexer = self.indexer
+        result._counts = self._counts
+        result._present = self._present
+        result._shared = self._shared = True
+        return result
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memodict):
+        # The indexer is shared by everyone using the same ResourceDatabase, and the quantities are plain ints
+        return self.copy()
 
 
 def add_resource_gain_to_current_resources(resource_gain: ResourceGain,
@@ -22,6 +156,10 @@ def add_resource_gain_to_current_resources(resource_gain: ResourceGain,
     :param resources:
     :return: resources
     """
+    if isinstance(resources, ResourceCollection):
+        resources.add_resource_gain(resource_gain)
+        return resources
+
     for resource, quantity in resource_gain:
         resources[resource] = resources.get(resource, 0) + quantity
     return resources
@@ -0,0 +1,88 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from randovania.game_description.world.area import Area
+from randovania.game_description.world.area_identifier import AreaIdentifier
+from randovania.game_description.world.node import Node
+from randovania.game_description.world.node_identifier import NodeIdentifier
+from randovania.game_description.world.world import World
+from randovania.game_description.world.world_list import WorldList
+
+WorldDataSource = Callable[[], Dict]
+WorldDecoder = Callable[[Dict, int], World]
+
+
+class LazyWorldList(WorldList):
+    """
+    A WorldList that only decodes a world when it's first needed.
+    `world_with_name` and the lookups based on it, like `area_by_area_location` and `node_by_identifier`,
+    decode just the world they return, searching it by name until everything is decoded.
+    Anything else that needs `worlds`, such as `all_nodes`, decodes all of them.
+
+    Node indices are the same as when decoding everything at once, which requires the raw data of the worlds
+    before the one being decoded.
+    """
+    _sources: List[WorldDataSource]
+    _decode_world: WorldDecoder
+    _data: List[Optional[Dict]]
+    _decoded: List[Optional[World]]
+    _all_worlds: Optional[List[World]]
+
+    def __init__(self, sources: List[WorldDataSource], decode_world: WorldDecoder):
+        """
+        :param sources: For each world, a function that returns its raw data.
+        :param decode_world: Decodes the raw data of a world, with the given index for its first node.
+        """
+        self._sources = sources
+        self._decode_world = decode_world
+        self._data = [None] * len(sources)
+        self._decoded = [None] * len(sources)
+        super().__init__(None)
+
+    @property
+    def worlds(self) -> List[World]:
+        if self._all_worlds is None:
+            self._all_worlds = [self._world_at(i) for i in range(len(self._sources))]
+        return self._all_worlds
+
+    @worlds.setter
+    def worlds(self, value: Optional[List[World]]):
+        self._all_worlds = value
+
+    @property
+    def decoded_world_count(self) -> int:
+        return sum(1 for world in self._decoded if world is not None)
+
+    def _data_at(self, index: int) -> Dict:
+        if self._data[index] is None:
+            self._data[index] = self._sources[index]()
+        return self._data[index]
+
+    def _world_at(self, index: int) -> World:
+        if self._decoded[index] is None:
+            first_node_index = sum(
+                len(area["nodes"])
+                for previous in range(index)
+                for area in self._data_at(previous)["areas"].values()
+            )
+            self._decoded[index] = self._decode_world(self._data_at(index), first_node_index)
+        return self._decoded[index]
+
+    def world_and_area_by_area_identifier(self, identifier: AreaIdentifier) -> Tuple[World, Area]:
+        if self._all_worlds is not None:
+            return super().world_and_area_by_area_identifier(identifier)
+        return self._search_world_and_area(identifier)
+
+    def node_by_identifier(self, identifier: NodeIdentifier) -> Node:
+        if self._all_worlds is not None:
+            return super().node_by_identifier(identifier)
+        return self._search_node(identifier)
+
+    def world_with_name(self, world_name: str) -> World:
+        if self._all_worlds is not None:
+            return super().world_with_name(world_name)
+
+        for index in range(len(self._sources)):
+            data = self._data_at(index)
+            if data["name"] == world_name or data["extra"].get("dark_name") == world_name:
+                return self._world_at(index)
+        raise KeyError("Unknown name: {}".format(world_name))
@@ -45,12 +45,30 @@ class Node:
     extra: Dict[str, typing.Any]
     index: int
 
+    _cached_hash = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Otherwise `dataclass` gives each subclass a hash of all fields, which is slow and not cached
+        cls.__hash__ = Node.__hash__
+
     def __lt__(self, other):
         return self.name < other.name
 
     def __hash__(self):
+        if self._cached_hash is None:
+            object.__setattr__(self, "_cached_hash", self._calculate_hash())
+        return self._cached_hash
+
+    def _calculate_hash(self) -> int:
         return hash((self.index, self.name))
 
+    def __getstate__(self):
+        # The hash of strings changes between processes
+        state = dict(self.__dict__)
+        state.pop("_cached_hash", None)
+        return state
+
     def __post_init__(self):
         if not isinstance(self.extra, frozendict):
             if not isinstance(self.extra, dict):
@@ -105,7 +123,7 @@ class DockNode(Node):
     dock_type: DockType
     default_dock_weakness: DockWeakness
 
-    def __hash__(self):
+    def _calculate_hash(self) -> int:
         return hash((self.index, self.name, self.default_connection))
 
     def __repr__(self):
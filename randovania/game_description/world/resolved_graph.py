@@ -0,0 +1,67 @@
+import dataclasses
+import typing
+from typing import List, Optional, Tuple
+
+from randovania.game_description.game_patches import GamePatches
+from randovania.game_description.requirements import Requirement
+from randovania.game_description.world.node import Node
+
+if typing.TYPE_CHECKING:
+    from randovania.game_description.world.world_list import WorldList
+
+Connections = Tuple[Tuple[Optional[Node], Requirement], ...]
+
+
+class ResolvedGraph:
+    """
+    The connections of each node of a WorldList with the docks and teleporters of a GamePatches, resolved once
+    instead of every time a reach is calculated.
+    Only the dock connections, dock weaknesses and elevator connections of the patches are used, so any GamePatches
+    with the same contents in these dicts, like the ones created by assigning pickups, share the graph as well.
+    The graph keeps its own copy of these dicts, so editing them in place afterwards doesn't change it.
+    Nodes are resolved when first needed, then stored in a list at their index.
+    """
+    world_list: "WorldList"
+    _patches: GamePatches
+    _connections: List[Optional[Connections]]
+    _potential_nodes: List[Optional[Connections]]
+
+    def __init__(self, world_list: "WorldList", patches: GamePatches):
+        self.world_list = world_list
+        self._patches = dataclasses.replace(
+            patches,
+            dock_connection=dict(patches.dock_connection),
+            dock_weakness=dict(patches.dock_weakness),
+            elevator_connection=dict(patches.elevator_connection),
+        )
+        self._connections = [None] * (world_list.max_node_index + 1)
+        self._potential_nodes = [None] * (world_list.max_node_index + 1)
+
+    def is_for(self, patches: GamePatches) -> bool:
+        return (patches.elevator_connection == self._patches.elevator_connection
+                and patches.dock_connection == self._patches.dock_connection
+                and patches.dock_weakness == self._patches.dock_weakness)
+
+    def connections_from(self, node: Node) -> Connections:
+        """
+        The nodes in other areas the given node leads to, like WorldList.connections_from.
+        :param node:
+        :return:
+        """
+        result = self._connections[node.index]
+        if result is None:
+            result = tuple(self.world_list.connections_from(node, self._patches))
+            self._connections[node.index] = result
+        return result
+
+    def potential_nodes_from(self, node: Node) -> Connections:
+        """
+        All nodes the given node leads to, like WorldList.potential_nodes_from.
+        :param node:
+        :return:
+        """
+        result = self._potential_nodes[node.index]
+        if result is None:
+            result = self.connections_from(node) + tuple(self.world_list.area_connections_from(node))
+            self._potential_nodes[node.index] = result
+        return result
@@ -1,20 +1,34 @@
 import copy
+import dataclasses
 import logging
-from typing import List, Dict, Iterator, Tuple, Iterable, Optional
+from collections import defaultdict
+from typing import List, Dict, Iterator, Tuple, Iterable, Optional, NamedTuple
 
 from randovania.game_description.game_patches import GamePatches
+from randovania.game_description.patched_requirements_cache import PATCHED_REQUIREMENTS_CACHE
 from randovania.game_description.requirements import Requirement, RequirementAnd
 from randovania.game_description.resources.pickup_index import PickupIndex
 from randovania.game_description.resources.resource_database import ResourceDatabase
-from randovania.game_description.resources.resource_info import CurrentResources
+from randovania.game_description.resources.resource_info import CurrentResources, ResourceInfo
 from randovania.game_description.world.area import Area
 from randovania.game_description.world.area_identifier import AreaIdentifier
-from randovania.game_description.world.dock import DockLockType
+from randovania.game_description.world.dock import DockLockType, DockWeakness
 from randovania.game_description.world.node import Node, DockNode, TeleporterNode, PickupNode, PlayerShipNode
 from randovania.game_description.world.node_identifier import NodeIdentifier
+from randovania.game_description.world.resolved_graph import ResolvedGraph
 from randovania.game_description.world.world import World
 
 
+class RequirementUsage(NamedTuple):
+    """
+    A requirement in the logic, located by the node it's checked when leaving.
+    `target` is None when the requirement is the default dock weakness of `source`.
+    """
+    source: Node
+    target: Optional[Node]
+    requirement: Requirement
+
+
 class WorldList:
     worlds: List[World]
 
@@ -22,15 +36,46 @@ class WorldList:
     _nodes_to_world: Dict[Node, World]
     _nodes: Optional[Tuple[Node, ...]]
     _pickup_index_to_node: Dict[PickupIndex, PickupNode]
+    _num_pickup_nodes: int
+    _max_node_index: int
+    _worlds_by_name: Dict[str, World]
+    _areas_by_identifier: Dict[AreaIdentifier, Tuple[World, Area]]
+    _nodes_by_identifier: Dict[NodeIdentifier, Node]
+    _resource_usage: Optional[Tuple[ResourceDatabase, Dict[ResourceInfo, Tuple[RequirementUsage, ...]]]]
+    _patched_dock_weaknesses: Dict[DockWeakness, DockWeakness]
+    _resolved_graph: Optional[ResolvedGraph]
 
     def __deepcopy__(self, memodict):
-        return WorldList(
+        result = WorldList(
             worlds=copy.deepcopy(self.worlds, memodict),
         )
+        result._patched_dock_weaknesses = copy.deepcopy(self._patched_dock_weaknesses, memodict)
+        return result
 
     def __init__(self, worlds: List[World]):
         self.worlds = worlds
         self._nodes = None
+        self._resource_usage = None
+        self._patched_dock_weaknesses = {}
+        self._resolved_graph = None
+
+    def make_mutable_copy(self) -> "WorldList":
+        """
+        Creates a copy with its own worlds, areas and connection dicts, so these can be modified and
+        `patch_requirements` can be used. Nodes and requirements are shared with this WorldList.
+        """
+        result = WorldList([
+            dataclasses.replace(world, areas=[
+                dataclasses.replace(area, nodes=list(area.nodes), connections={
+                    source: dict(connections)
+                    for source, connections in area.connections.items()
+                })
+                for area in world.areas
+            ])
+            for world in self.worlds
+        ])
+        result._patched_dock_weaknesses = dict(self._patched_dock_weaknesses)
+        return result
 
     def _refresh_node_cache(self):
         self._nodes_to_area, self._nodes_to_world = _calculate_nodes_to_area_world(self.worlds)
@@ -40,6 +85,10 @@ class WorldList:
             for node in self._nodes
             if isinstance(node, PickupNode)
         }
+        self._num_pickup_nodes = sum(1 for node in self._nodes if isinstance(node, PickupNode))
+        self._max_node_index = max((node.index for node in self._nodes), default=-1)
+        self._worlds_by_name, self._areas_by_identifier, self._nodes_by_identifier = _calculate_name_indexes(
+            self.worlds)
 
     def ensure_has_node_cache(self):
         if self._nodes is None:
@@ -47,16 +96,19 @@ class WorldList:
 
     def invalidate_node_cache(self):
         self._nodes = None
+        self._resource_usage = None
+        self._resolved_graph = None
 
     def _iterate_over_nodes(self) -> Iterator[Node]:
         for world in self.worlds:
             yield from world.all_nodes
 
     def world_with_name(self, world_name: str) -> World:
-        for world in self.worlds:
-            if world.name == world_name or world.dark_name == world_name:
-                return world
-        raise KeyError("Unknown name: {}".format(world_name))
+        self.ensure_has_node_cache()
+        world = self._worlds_by_name.get(world_name)
+        if world is None:
+            raise KeyError("Unknown name: {}".format(world_name))
+        return world
 
     def world_with_area(self, area: Area) -> World:
         for world in self.worlds:
@@ -81,7 +133,17 @@ class WorldList:
 
     @property
     def num_pickup_nodes(self) -> int:
-        return sum(1 for node in self.all_nodes if isinstance(node, PickupNode))
+        self.ensure_has_node_cache()
+        return self._num_pickup_nodes
+
+    @property
+    def max_node_index(self) -> int:
+        """
+        The largest index of all nodes. Indices are unique, but nodes can be removed, so lists with an element for
+        each node index need one more element than this.
+        """
+        self.ensure_has_node_cache()
+        return self._max_node_index
 
     @property
     def all_worlds_areas_nodes(self) -> Iterable[Tuple[World, Area, Node]]:
@@ -136,12 +198,11 @@ class WorldList:
         if area.default_node is None:
             raise IndexError("Area '{}' does not have a default_node".format(area.name))
 
-        node = area.node_with_name(area.default_node)
-        if node is None:
+        try:
+            return self.node_by_identifier(NodeIdentifier(connection, area.default_node))
+        except ValueError:
             raise IndexError("Area '{}' default_node ({}) is missing".format(area.name, area.default_node))
 
-        return node
-
     def connections_from(self, node: Node, patches: GamePatches) -> Iterator[Tuple[Node, Requirement]]:
         """
         Queries all nodes from other areas you can go from a given node. Aka, doors and teleporters
@@ -156,7 +217,7 @@ class WorldList:
                     return
 
                 forward_weakness = patches.dock_weakness.get(self.identifier_for_node(node),
-                                                             node.default_dock_weakness)
+                                                             self.default_dock_weakness(node))
                 requirement = forward_weakness.requirement
 
                 # TODO: only add requirement if the blast shield has not been destroyed yet
@@ -164,7 +225,7 @@ class WorldList:
                 if isinstance(target_node, DockNode):
                     # TODO: Target node is expected to be a dock. Should this error?
                     back_weakness = patches.dock_weakness.get(self.identifier_for_node(target_node),
-                                                              target_node.default_dock_weakness)
+                                                              self.default_dock_weakness(target_node))
                     if back_weakness.lock_type == DockLockType.FRONT_BLAST_BACK_BLAST:
                         requirement = RequirementAnd([requirement, back_weakness.requirement])
 
@@ -189,6 +250,16 @@ class WorldList:
                 if isinstance(other_node, PlayerShipNode) and other_node != node:
                     yield other_node, other_node.is_unlocked
 
+    def default_dock_weakness(self, node: DockNode) -> DockWeakness:
+        """
+        The default dock weakness of the given node, with the requirement changed by `patch_requirements`.
+        Nodes are shared with the WorldList this was copied from, so the patched weakness isn't stored in them.
+        :param node:
+        :return:
+        """
+        weakness = node.default_dock_weakness
+        return self._patched_dock_weaknesses.get(weakness, weakness)
+
     def area_connections_from(self, node: Node) -> Iterator[Tuple[Node, Requirement]]:
         """
         Queries all nodes from the same area you can go from a given node.
@@ -206,8 +277,54 @@ class WorldList:
         :param patches:
         :return: Generator of pairs Node + Requirement for going to that node
         """
-        yield from self.connections_from(node, patches)
-        yield from self.area_connections_from(node)
+        yield from self.resolved_graph(patches).potential_nodes_from(node)
+
+    def resolved_graph(self, patches: GamePatches) -> ResolvedGraph:
+        """
+        The connections of all nodes with the given patches. Kept until the patches use different docks or
+        teleporters, or `invalidate_node_cache` is called.
+        :param patches:
+        :return:
+        """
+        if self._resolved_graph is None or not self._resolved_graph.is_for(patches):
+            self._resolved_graph = ResolvedGraph(self, patches)
+        return self._resolved_graph
+
+    def _calculate_resource_usage(self, database: ResourceDatabase) -> Dict[ResourceInfo, Tuple[RequirementUsage, ...]]:
+        result = defaultdict(list)
+
+        def add(usage: RequirementUsage):
+            resources = {individual.resource
+                         for individual in usage.requirement.iterate_resource_requirements(database)}
+            for resource in resources:
+                result[resource].append(usage)
+
+        for area in self.all_areas:
+            for node in area.nodes:
+                if isinstance(node, DockNode):
+                    add(RequirementUsage(node, None, self.default_dock_weakness(node).requirement))
+
+            for source, connections in area.connections.items():
+                for target, requirement in connections.items():
+                    add(RequirementUsage(source, target, requirement))
+
+        return {
+            resource: tuple(usages)
+            for resource, usages in result.items()
+        }
+
+    def requirements_using_resource(self, resource: ResourceInfo,
+                                    database: ResourceDatabase) -> Tuple[RequirementUsage, ...]:
+        """
+        Queries all connections and default dock weaknesses with a requirement that mentions the given resource.
+        The lookup is calculated once for all resources and kept until `invalidate_node_cache` is called.
+        :param resource:
+        :param database: Used to expand templates.
+        :return:
+        """
+        if self._resource_usage is None or self._resource_usage[0] is not database:
+            self._resource_usage = (database, self._calculate_resource_usage(database))
+        return self._resource_usage[1].get(resource, ())
 
     def patch_requirements(self, static_resources: CurrentResources, damage_multiplier: float,
                            database: ResourceDatabase) -> None:
@@ -220,21 +337,40 @@ class WorldList:
         :param database:
         :return:
         """
+        patched = PATCHED_REQUIREMENTS_CACHE.table_for(static_resources, damage_multiplier, database)
+
+        def patch(requirement: Requirement) -> Requirement:
+            result = patched.get(requirement)
+            if result is None:
+                result = requirement.patch_requirements(static_resources, damage_multiplier, database).simplify()
+                patched[requirement] = result
+            return result
+
         for world in self.worlds:
             for area in world.areas:
                 for node in area.nodes:
                     if isinstance(node, DockNode):
-                        requirement = node.default_dock_weakness.requirement
-                        object.__setattr__(node.default_dock_weakness, "requirement",
-                                           requirement.patch_requirements(static_resources,
-                                                                          damage_multiplier,
-                                                                          database).simplify())
+                        weakness = self.default_dock_weakness(node)
+                        self._patched_dock_weaknesses[node.default_dock_weakness] = dataclasses.replace(
+                            weakness,
+                            requirement=patch(weakness.requirement),
+                        )
                 for connections in area.connections.values():
                     for target, value in connections.items():
-                        connections[target] = value.patch_requirements(
-                            static_resources, damage_multiplier, database).simplify()
+                        connections[target] = patch(value)
+
+        PATCHED_REQUIREMENTS_CACHE.trim()
+        self._resource_usage = None
+        self._resolved_graph = None
 
     def node_by_identifier(self, identifier: NodeIdentifier) -> Node:
+        self.ensure_has_node_cache()
+        node = self._nodes_by_identifier.get(identifier)
+        if node is not None:
+            return node
+        return self._search_node(identifier)
+
+    def _search_node(self, identifier: NodeIdentifier) -> Node:
         area = self.area_by_area_location(identifier.area_location)
         node = area.node_with_name(identifier.node_name)
         if node is not None:
@@ -248,6 +384,13 @@ class WorldList:
         return self.world_with_name(location.world_name)
 
     def world_and_area_by_area_identifier(self, identifier: AreaIdentifier) -> tuple[World, Area]:
+        self.ensure_has_node_cache()
+        world_and_area = self._areas_by_identifier.get(identifier)
+        if world_and_area is not None:
+            return world_and_area
+        return self._search_world_and_area(identifier)
+
+    def _search_world_and_area(self, identifier: AreaIdentifier) -> tuple[World, Area]:
         world = self.world_with_name(identifier.world_name)
         area = world.area_by_name(identifier.area_name)
         return world, area
@@ -268,8 +411,44 @@ class WorldList:
 
     def add_new_node(self, area: Area, node: Node):
         self.ensure_has_node_cache()
+        self._resolved_graph = None
         self._nodes_to_area[node] = area
-        self._nodes_to_world[node] = self.world_with_area(area)
+        self._nodes_to_world[node] = world = self.world_with_area(area)
+        self._max_node_index = max(self._max_node_index, node.index)
+
+        for world_name in (world.name, world.dark_name):
+            if world_name is None:
+                continue
+            area_identifier = AreaIdentifier(world_name, area.name)
+            indexed = self._areas_by_identifier.get(area_identifier)
+            if indexed is not None and indexed[1] is area:
+                self._nodes_by_identifier.setdefault(NodeIdentifier(area_identifier, node.name), node)
+
+
+def _calculate_name_indexes(worlds: Iterable[World]):
+    """
+    Maps names to what searching each world, area and node in order would find: the first world with that name or
+    dark name, the first area with that name in it, and the first node with that name in that area.
+    """
+    worlds_by_name: Dict[str, World] = {}
+    for world in worlds:
+        worlds_by_name.setdefault(world.name, world)
+        if world.dark_name is not None:
+            worlds_by_name.setdefault(world.dark_name, world)
+
+    areas_by_identifier: Dict[AreaIdentifier, Tuple[World, Area]] = {}
+    nodes_by_identifier: Dict[NodeIdentifier, Node] = {}
+    for world_name, world in worlds_by_name.items():
+        for area in world.areas:
+            area_identifier = AreaIdentifier(world_name, area.name)
+            if area_identifier in areas_by_identifier:
+                continue
+
+            areas_by_identifier[area_identifier] = world, area
+            for node in area.nodes:
+                nodes_by_identifier.setdefault(NodeIdentifier(area_identifier, node.name), node)
+
+    return worlds_by_name, areas_by_identifier, nodes_by_identifier
 
 
 def _calculate_nodes_to_area_world(worlds: Iterable[World]):
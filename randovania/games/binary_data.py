@@ -1,5 +1,7 @@
 import copy
 import json
+import lzma
+import struct
 from pathlib import Path
 from typing import TypeVar, BinaryIO, Dict, Any
 
@@ -12,7 +14,9 @@ from randovania.game_description.world.node import LoreType
 from randovania.games.game import RandovaniaGame
 
 X = TypeVar('X')
-current_format_version = 10
+current_format_version = 11
+construct_format_version = 10
+_MAGIC_NUMBER = b"Req."
 
 String = CString("utf-8")
 
@@ -50,13 +54,175 @@ _EXPECTED_FIELDS = [
 ]
 
 
-def decode(binary_io: BinaryIO) -> dict:
-    decoded = ConstructGame.parse_stream(binary_io)
-    result: dict = convert_to_raw_python(decoded["db"])
+def _check_fields(data: dict, action: str):
+    if unknown_keys := [key for key in data if key not in _EXPECTED_FIELDS]:
+        raise ValueError(f"Unexpected fields in {action}: {unknown_keys}")
+
+
+# Format 11: after the header, a lzma compressed payload with a table of every string used, each one as a varint
+# length and utf-8 bytes, followed by the data as tagged values. Strings and dict keys are varint indices in the table.
+_TAG_NONE = 0
+_TAG_FALSE = 1
+_TAG_TRUE = 2
+_TAG_INT = 3
+_TAG_FLOAT = 4
+_TAG_STRING = 5
+_TAG_LIST = 6
+_TAG_DICT = 7
+
+_Double = struct.Struct(">d")
+
+
+def _write_varint(target: bytearray, value: int):
+    while value >= 0x80:
+        target.append((value & 0x7F) | 0x80)
+        value >>= 7
+    target.append(value)
+
+
+def _encode_tagged(data: dict) -> bytes:
+    strings: Dict[str, int] = {}
+    body = bytearray()
+
+    def write_varint(value: int):
+        _write_varint(body, value)
+
+    def write_string_index(value: str):
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        write_varint(index)
+
+    def write_value(value):
+        if value is None:
+            body.append(_TAG_NONE)
+        elif value is True:
+            body.append(_TAG_TRUE)
+        elif value is False:
+            body.append(_TAG_FALSE)
+        elif isinstance(value, str):
+            body.append(_TAG_STRING)
+            write_string_index(value)
+        elif isinstance(value, int):
+            body.append(_TAG_INT)
+            # zigzag, so small negative numbers are small varints too
+            write_varint(value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            body.append(_TAG_FLOAT)
+            body.extend(_Double.pack(value))
+        elif isinstance(value, dict):
+            body.append(_TAG_DICT)
+            write_varint(len(value))
+            for key, item in value.items():
+                if not isinstance(key, str):
+                    raise ValueError(f"Only str keys are supported, got {key!r}")
+                write_string_index(key)
+                write_value(item)
+        elif isinstance(value, (list, tuple)):
+            body.append(_TAG_LIST)
+            write_varint(len(value))
+            for item in value:
+                write_value(item)
+        else:
+            raise ValueError(f"Unable to encode value of type {type(value)}")
+
+    write_value(data)
+
+    result = bytearray()
+    _write_varint(result, len(strings))
+    for string in strings:
+        encoded = string.encode("utf-8")
+        _write_varint(result, len(encoded))
+        result.extend(encoded)
+
+    result.extend(body)
+    return bytes(result)
+
+
+def _decode_tagged(payload: bytes) -> dict:
+    position = 0
+
+    def read_varint() -> int:
+        nonlocal position
+        byte = payload[position]
+        position += 1
+        if byte < 0x80:
+            return byte
+
+        result = byte & 0x7F
+        shift = 7
+        while True:
+            byte = payload[position]
+            position += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    strings = []
+    for _ in range(read_varint()):
+        length = read_varint()
+        strings.append(payload[position:position + length].decode("utf-8"))
+        position += length
+
+    def read_value():
+        nonlocal position
+        tag = payload[position]
+        position += 1
+
+        if tag == _TAG_STRING:
+            return strings[read_varint()]
+        elif tag == _TAG_DICT:
+            return {
+                strings[read_varint()]: read_value()
+                for _ in range(read_varint())
+            }
+        elif tag == _TAG_LIST:
+            return [read_value() for _ in range(read_varint())]
+        elif tag == _TAG_INT:
+            value = read_varint()
+            return -(value >> 1) - 1 if value & 1 else value >> 1
+        elif tag == _TAG_NONE:
+            return None
+        elif tag == _TAG_FALSE:
+            return False
+        elif tag == _TAG_TRUE:
+            return True
+        elif tag == _TAG_FLOAT:
+            value = _Double.unpack_from(payload, position)[0]
+            position += 8
+            return value
+        else:
+            raise ValueError(f"Unknown tag {tag} at position {position - 1}")
+
+    result = read_value()
+    if position != len(payload):
+        raise ValueError(f"Unexpected {len(payload) - position} bytes after the data")
+    return result
 
-    if unknown_keys := [key for key in result if key not in _EXPECTED_FIELDS]:
-        raise ValueError(f"Unexpected fields in decoded data: {unknown_keys}")
 
+def decode(binary_io: BinaryIO) -> dict:
+    header = binary_io.read(8)
+    if len(header) != 8 or header[:4] != _MAGIC_NUMBER:
+        raise ValueError("Not a game data file: invalid magic number")
+
+    format_version = struct.unpack(">I", header[4:])[0]
+    if format_version == current_format_version:
+        result = _decode_tagged(lzma.decompress(binary_io.read()))
+        if not isinstance(result, dict):
+            raise ValueError(f"Expected a dict, got {type(result)}")
+        if result.get("schema_version") != game_migration.CURRENT_VERSION:
+            raise ValueError(f"Unsupported schema_version: {result.get('schema_version')}")
+
+    elif format_version == construct_format_version:
+        binary_io.seek(-len(header), 1)
+        decoded = ConstructGame.parse_stream(binary_io)
+        result = convert_to_raw_python(decoded["db"])
+
+    else:
+        raise ValueError(f"Unsupported format version: {format_version}")
+
+    _check_fields(result, "decoded data")
     return result
 
 
@@ -65,12 +231,31 @@ def decode_file_path(binary_file_path: Path) -> Dict:
         return decode(binary_io)
 
 
-def encode(original_data: Dict, x: BinaryIO) -> None:
-    if unknown_keys := [key for key in original_data if key not in _EXPECTED_FIELDS]:
-        raise ValueError(f"Unexpected fields in data to be encoded: {unknown_keys}")
+def encode(original_data: Dict, x: BinaryIO, format_version: int = current_format_version) -> None:
+    """
+    Writes the given game data to x.
+    :param original_data:
+    :param x:
+    :param format_version: Which version of the format to use. Besides the current one, only the previous,
+    construct based version is supported.
+    :return:
+    """
+    _check_fields(original_data, "data to be encoded")
+
+    if format_version == current_format_version:
+        if original_data.get("schema_version") != game_migration.CURRENT_VERSION:
+            raise ValueError(f"Unsupported schema_version: {original_data.get('schema_version')}")
+        RandovaniaGame(original_data["game"])
+        x.write(_MAGIC_NUMBER)
+        x.write(struct.pack(">I", current_format_version))
+        x.write(lzma.compress(_encode_tagged(original_data)))
+
+    elif format_version == construct_format_version:
+        data = copy.deepcopy(original_data)
+        ConstructGame.build_stream({"db": data}, x)
 
-    data = copy.deepcopy(original_data)
-    ConstructGame.build_stream({"db": data}, x)
+    else:
+        raise ValueError(f"Unsupported format version: {format_version}")
 
 
 def OptionalValue(subcon):
@@ -226,8 +411,8 @@ NodeBaseFields = {
 class NodeAdapter(construct.Adapter):
     def _decode(self, obj: construct.Container, context, path):
         result = construct.Container(node_type=obj["node_type"])
-        result.update(obj["data"])
-        result.move_to_end("connections")
+        result.update((key, value) for key, value in obj["data"].items() if key != "connections")
+        result["connections"] = obj["data"]["connections"]
         return result
 
     def _encode(self, obj: construct.Container, context, path):
@@ -326,8 +511,8 @@ ConstructDockWeaknessDatabase = Struct(
 )
 
 ConstructGame = Struct(
-    magic_number=Const(b"Req."),
-    format_version=Const(current_format_version, Int32ub),
+    magic_number=Const(_MAGIC_NUMBER),
+    format_version=Const(construct_format_version, Int32ub),
     db=Compressed(Struct(
         schema_version=Const(game_migration.CURRENT_VERSION, VarInt),
         game=ConstructGameEnum,
@@ -9,16 +9,30 @@ from randovania.games import binary_data
 from randovania.games.game import RandovaniaGame
 
 
-@functools.lru_cache()
-def read_json_then_binary(game: RandovaniaGame) -> Tuple[Path, dict]:
+def json_then_binary_path(game: RandovaniaGame) -> Path:
+    """
+    The path that `read_json_then_binary` reads the game's data from: a split json directory, a json file or
+    a binary file, in this order of preference.
+    """
     dir_path = game.data_path.joinpath("json_data")
     if dir_path.exists():
-        return dir_path, data_reader.read_split_file(dir_path)
+        return dir_path
 
     json_path = dir_path.joinpath(f"{game.value}.json")
     if json_path.exists():
-        with json_path.open("r") as open_file:
-            return json_path, data_reader.read_json_file(open_file)
+        return json_path
+
+    return get_data_path().joinpath("binary_data", f"{game.value}.bin")
+
+
+@functools.lru_cache()
+def read_json_then_binary(game: RandovaniaGame) -> Tuple[Path, dict]:
+    path = json_then_binary_path(game)
+    if path.is_dir():
+        return path, data_reader.read_split_file(path)
+
+    if path.suffix == ".json":
+        with path.open("r") as open_file:
+            return path, data_reader.read_json_file(open_file)
 
-    binary_path = get_data_path().joinpath("binary_data", f"{game.value}.bin")
-    return binary_path, binary_data.decode_file_path(binary_path)
+    return path, binary_data.decode_file_path(path)
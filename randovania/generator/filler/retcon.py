@@ -19,6 +19,7 @@ from randovania.generator.filler.filler_library import UnableToGenerate, should_
 from randovania.generator.filler.filler_logging import debug_print_collect_event
 from randovania.generator.filler.player_state import PlayerState
 from randovania.generator.generator_reach import GeneratorReach
+from randovania.lib import metrics
 from randovania.resolver import debug
 from randovania.resolver.random_lib import select_element_with_weight
 
@@ -97,6 +98,7 @@ def _get_next_player(rng: Random, player_states: List[PlayerState], num_indices:
             )
 
 
+@metrics.timed("filler.weighted_potential_actions")
 def weighted_potential_actions(player_state: PlayerState, status_update: Callable[[str], None],
                                num_available_indices: int) -> Dict[Action, float]:
     """
@@ -133,6 +135,7 @@ def weighted_potential_actions(player_state: PlayerState, status_update: Callabl
                 current_uncollected) * _DANGEROUS_ACTION_MULTIPLIER
 
         actions_weights[action] = weight
+        metrics.increment("filler.actions_weighted")
         update_for_option()
 
     if debug.debug_level() > 1:
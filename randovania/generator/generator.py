@@ -1,4 +1,3 @@
-import asyncio
 from random import Random
 from typing import Optional, Callable, List, Dict
 
@@ -20,8 +19,10 @@ from randovania.layout.base.base_configuration import BaseConfiguration
 from randovania.layout.layout_description import LayoutDescription
 from randovania.layout.permalink import Permalink
 from randovania.layout.preset import Preset
+from randovania.lib import metrics
 from randovania.resolver import resolver, bootstrap
-from randovania.resolver.exceptions import GenerationFailure, InvalidConfiguration, ImpossibleForSolver
+from randovania.resolver.exceptions import GenerationFailure, InvalidConfiguration, ImpossibleForSolver, \
+    ResolverTimeout
 
 
 def _validate_item_pool_size(item_pool: List[PickupEntry], game: GameDescription,
@@ -115,6 +116,7 @@ async def _create_pools_and_fill(rng: Random,
     :param status_update:
     :return:
     """
+    metrics.increment("generator.attempts")
     player_pools: Dict[int, PlayerPool] = {}
 
     for player_index, player_preset in presets.items():
@@ -224,29 +226,62 @@ async def generate_and_validate_description(permalink: Permalink,
         status_update = id
 
     try:
-        result = await _create_description(
-            permalink=permalink,
-            status_update=status_update,
-            attempts=attempts,
-        )
+        return await _generate_and_validate_description(permalink, status_update, validate_after_generation,
+                                                        timeout, attempts)
+    finally:
+        metrics.export()
+
+
+async def _generate_and_validate_description(permalink: Permalink,
+                                             status_update: Callable[[str], None],
+                                             validate_after_generation: bool,
+                                             timeout: Optional[int],
+                                             attempts: int,
+                                             ) -> LayoutDescription:
+    try:
+        with metrics.timer("generator.generate"):
+            result = await _create_description(
+                permalink=permalink,
+                status_update=status_update,
+                attempts=attempts,
+            )
     except UnableToGenerate as e:
         raise GenerationFailure("Could not generate a game with the given settings",
                                 permalink=permalink, source=e) from e
 
-    if validate_after_generation and permalink.player_count == 1:
-        final_state_async = resolver.resolve(
-            configuration=permalink.presets[0].configuration,
-            patches=result.all_patches[0],
-            status_update=status_update,
-        )
-        try:
-            final_state_by_resolve = await asyncio.wait_for(final_state_async, timeout)
-        except asyncio.TimeoutError as e:
-            raise GenerationFailure("Timeout reached when validating possibility",
-                                    permalink=permalink, source=e) from e
-
-        if final_state_by_resolve is None:
-            raise GenerationFailure("Generated game was considered impossible by the solver",
-                                    permalink=permalink, source=ImpossibleForSolver())
+    if validate_after_generation:
+        await validate_description(result, status_update, timeout)
 
     return result
+
+
+async def validate_description(description: LayoutDescription,
+                               status_update: Callable[[str], None],
+                               timeout: Optional[int],
+                               ):
+    """
+    Checks if the given LayoutDescription is possible, raising GenerationFailure otherwise.
+    Multiworld descriptions can't be validated yet, so they're always accepted.
+    :param description:
+    :param status_update:
+    :param timeout: Abort validation after this many seconds.
+    """
+    permalink = description.permalink
+    if permalink.player_count != 1:
+        return
+
+    try:
+        with metrics.timer("generator.validate"):
+            final_state_by_resolve = await resolver.resolve(
+                configuration=permalink.presets[0].configuration,
+                patches=description.all_patches[0],
+                status_update=status_update,
+                cancellation=resolver.CancellationToken.with_timeout(timeout),
+            )
+    except ResolverTimeout as e:
+        raise GenerationFailure("Timeout reached when validating possibility",
+                                permalink=permalink, source=e) from e
+
+    if final_state_by_resolve is None:
+        raise GenerationFailure("Generated game was considered impossible by the solver",
+                                permalink=permalink, source=ImpossibleForSolver())
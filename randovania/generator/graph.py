@@ -1,7 +1,9 @@
 import copy
 import itertools
+from array import array
+from collections import deque
 from heapq import heappush, heappop
-from typing import Dict, Iterator, Tuple, Set, Callable
+from typing import Dict, Iterator, Tuple, Set, Callable, List, NamedTuple, Optional
 
 from randovania.game_description.requirements import RequirementSet
 
@@ -29,41 +31,94 @@ class BaseGraph:
         raise NotImplementedError()
 
     def multi_source_dijkstra(self, sources: Set[int], weight: Callable[[int, int, RequirementSet], float]):
+        """
+        Finds the shortest distance from any of the sources to each node.
+        :return: The distance to each reachable node, and the node before each on its shortest path, with None
+        for the sources. Use `path_from_predecessors` to get the full paths.
+        """
         raise NotImplementedError()
 
+    def multi_source_zero_one_bfs(self, sources: Set[int], weight: Callable[[int, int, RequirementSet], Optional[int]]):
+        """
+        Same as multi_source_dijkstra, but `weight` must return only 0, 1 or None.
+        """
+        return self.multi_source_dijkstra(sources, weight)
+
     def strongly_connected_components(self) -> Iterator[Set[int]]:
         raise NotImplementedError()
 
+    def strongly_connected_component(self, node: int) -> Set[int]:
+        """
+        The strongly connected component that contains the given node. The result must not be modified.
+        """
+        for component in self.strongly_connected_components():
+            if node in component:
+                return component
+        raise KeyError(node)
+
+
+def path_from_predecessors(predecessors: Dict[int, Optional[int]], target: int) -> List[int]:
+    """
+    The path from a source to the given node, including both, using the predecessors from `multi_source_dijkstra`.
+    """
+    path = [target]
+    previous = predecessors[target]
+    while previous is not None:
+        path.append(previous)
+        previous = predecessors[previous]
+    path.reverse()
+    return path
+
 
 class RandovaniaGraph(BaseGraph):
+    """
+    Copies share the edges with the original. Each graph copies the outer dict and each adjacency row the first
+    time it changes them, so copying is O(1) and only the rows that are modified get duplicated.
+    """
     edges: Dict[int, Dict[int, RequirementSet]]
+    _owns_edges: bool
+    _owned_rows: Set[int]
 
     @classmethod
     def new(cls):
         return cls({})
 
     def __init__(self, edges: Dict[int, Dict[int, RequirementSet]]):
-        import networkx
-        self.networkx = networkx
         self.edges = edges
+        self._owns_edges = True
+        self._owned_rows = set(edges.keys())
 
     def copy(self):
-        return RandovaniaGraph(
-            {
-                source: copy.copy(data)
-                for source, data in self.edges.items()
-            },
-        )
+        result = type(self).__new__(type(self))
+        result.edges = self.edges
+        result._owns_edges = self._owns_edges = False
+        result._owned_rows = set()
+        self._owned_rows = set()
+        return result
+
+    def _writable_edges(self) -> Dict[int, Dict[int, RequirementSet]]:
+        if not self._owns_edges:
+            self.edges = copy.copy(self.edges)
+            self._owns_edges = True
+        return self.edges
+
+    def _writable_row(self, node: int) -> Dict[int, RequirementSet]:
+        edges = self._writable_edges()
+        if node not in self._owned_rows:
+            edges[node] = copy.copy(edges[node])
+            self._owned_rows.add(node)
+        return edges[node]
 
     def add_node(self, node: int):
         if node not in self.edges:
-            self.edges[node] = {}
+            self._writable_edges()[node] = {}
+            self._owned_rows.add(node)
 
     def add_edge(self, previous_node: int, next_node: int, requirement: RequirementSet):
-        self.edges[previous_node][next_node] = requirement
+        self._writable_row(previous_node)[next_node] = requirement
 
     def remove_edge(self, previous: int, target: int):
-        self.edges[previous].pop(target)
+        self._writable_row(previous).pop(target)
 
     def has_edge(self, previous_node: int, next_node: int) -> bool:
         return next_node in self.edges.get(previous_node, {})
@@ -77,7 +132,7 @@ class RandovaniaGraph(BaseGraph):
                 yield source, target, requirement
 
     def multi_source_dijkstra(self, sources: Set[int], weight: Callable[[int, int, RequirementSet], float]):
-        paths = {source: [source] for source in sources}  # dictionary of paths
+        predecessors: Dict[int, Optional[int]] = {source: None for source in sources}
         edges = self.edges
 
         push = heappush
@@ -110,9 +165,9 @@ class RandovaniaGraph(BaseGraph):
                 elif u not in seen or vu_dist < seen[u]:
                     seen[u] = vu_dist
                     push(fringe, (vu_dist, next(c), u))
-                    paths[u] = paths[v] + [u]
+                    predecessors[u] = v
 
-        return dist, paths
+        return dist, predecessors
 
     def strongly_connected_components(self) -> Iterator[Set[int]]:
         preorder = {}
@@ -152,3 +207,269 @@ class RandovaniaGraph(BaseGraph):
                             yield scc
                         else:
                             scc_queue.append(v)
+
+
+class _CompactEdges(NamedTuple):
+    """
+    The edges of a graph in CSR layout: the edges leaving `node` have the ids `range(starts[node], ends[node])`,
+    which index both `targets` and `requirements`. Nodes not in the graph have an empty range.
+    """
+    nodes: List[int]
+    starts: array
+    ends: array
+    targets: array
+    requirements: List[RequirementSet]
+
+
+def _compact_edges(edges: Dict[int, Dict[int, RequirementSet]]) -> _CompactEdges:
+    size = max(edges.keys(), default=-1) + 1
+    starts = array("l", bytes(size * array("l").itemsize))
+    ends = array("l", starts)
+    targets = array("l")
+    requirements = []
+
+    for node, row in edges.items():
+        starts[node] = len(targets)
+        targets.extend(row.keys())
+        requirements.extend(row.values())
+        ends[node] = len(targets)
+
+    return _CompactEdges(list(edges.keys()), starts, ends, targets, requirements)
+
+
+class _IncrementalComponents:
+    """
+    Strongly connected components kept up to date while edges are added, using union-find for the components
+    and the condensation graph to detect the cycles that a new edge creates.
+    The member and successor sets are replaced instead of modified, so a copy only needs to copy the dicts.
+    """
+    __slots__ = ("parent", "members", "successors")
+    parent: Dict[int, int]
+    members: Dict[int, Set[int]]
+    successors: Dict[int, Set[int]]
+
+    def __init__(self, parent: Dict[int, int], members: Dict[int, Set[int]], successors: Dict[int, Set[int]]):
+        self.parent = parent
+        self.members = members
+        self.successors = successors
+
+    @classmethod
+    def from_graph(cls, graph: "CompactGraph") -> "_IncrementalComponents":
+        parent = {}
+        members = {}
+        for component in graph.strongly_connected_components():
+            root = next(iter(component))
+            members[root] = component
+            for node in component:
+                parent[node] = root
+
+        successors = {root: set() for root in members}
+        for source, target, _ in graph.edges_data():
+            if parent[source] != parent[target]:
+                successors[parent[source]].add(parent[target])
+
+        return cls(parent, members, successors)
+
+    def copy(self) -> "_IncrementalComponents":
+        return _IncrementalComponents(copy.copy(self.parent), copy.copy(self.members), copy.copy(self.successors))
+
+    def find(self, node: int) -> int:
+        parent = self.parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    def add_node(self, node: int):
+        self.parent[node] = node
+        self.members[node] = {node}
+        self.successors[node] = set()
+
+    def add_edge(self, source: int, target: int):
+        source_root = self.find(source)
+        target_root = self.find(target)
+        if source_root == target_root or target_root in self.successors[source_root]:
+            return
+
+        # The condensation is acyclic, so the new edge closes a cycle through every component that
+        # is both reachable from the target and reaches the source.
+        find = self.find
+        successors = self.successors
+        reaches_source = {source_root: True}
+        stack = [(target_root, iter(successors[target_root]))]
+        while stack:
+            root, children = stack[-1]
+            for child in children:
+                child = find(child)
+                if child not in reaches_source:
+                    stack.append((child, iter(successors[child])))
+                    break
+            else:
+                stack.pop()
+                reaches_source[root] = any(reaches_source[find(child)] for child in successors[root])
+
+        if not reaches_source[target_root]:
+            successors[source_root] = successors[source_root] | {target_root}
+            return
+
+        merged = [root for root, reaches in reaches_source.items() if reaches]
+        new_root = max(merged, key=lambda root: len(self.members[root]))
+        new_members = set()
+        new_successors = set()
+        for root in merged:
+            new_members.update(self.members.pop(root))
+            new_successors.update(find(child) for child in successors.pop(root))
+            self.parent[root] = new_root
+
+        new_successors.difference_update(merged)
+        self.members[new_root] = new_members
+        successors[new_root] = new_successors
+
+    def component(self, node: int) -> Set[int]:
+        return self.members[self.find(node)]
+
+
+class CompactGraph(RandovaniaGraph):
+    """
+    A RandovaniaGraph that runs its traversals over integer arrays instead of the dicts.
+    The arrays are built when first needed after a change and are shared with copies until either changes.
+    Strongly connected components are updated incrementally as edges are added, and only recalculated
+    from scratch after an edge is removed.
+    """
+    _compact: Optional[_CompactEdges]
+    _components: Optional[_IncrementalComponents]
+    _owns_components: bool
+
+    def __init__(self, edges: Dict[int, Dict[int, RequirementSet]]):
+        super().__init__(edges)
+        self._compact = None
+        self._components = None
+        self._owns_components = True
+
+    def copy(self):
+        result = super().copy()
+        result._compact = self._compact
+        result._components = self._components
+        result._owns_components = self._owns_components = False
+        return result
+
+    def _writable_components(self) -> Optional[_IncrementalComponents]:
+        if self._components is not None and not self._owns_components:
+            self._components = self._components.copy()
+            self._owns_components = True
+        return self._components
+
+    def add_node(self, node: int):
+        if node not in self.edges:
+            super().add_node(node)
+            self._compact = None
+            components = self._writable_components()
+            if components is not None:
+                components.add_node(node)
+
+    def add_edge(self, previous_node: int, next_node: int, requirement: RequirementSet):
+        super().add_edge(previous_node, next_node, requirement)
+        self._compact = None
+        components = self._writable_components()
+        if components is not None:
+            components.add_edge(previous_node, next_node)
+
+    def remove_edge(self, previous: int, target: int):
+        super().remove_edge(previous, target)
+        self._compact = None
+        self._components = None
+
+    def strongly_connected_component(self, node: int) -> Set[int]:
+        if self._components is None:
+            self._components = _IncrementalComponents.from_graph(self)
+            self._owns_components = True
+        return self._components.component(node)
+
+    def _compact_edges(self) -> _CompactEdges:
+        if self._compact is None:
+            self._compact = _compact_edges(self.edges)
+        return self._compact
+
+    def multi_source_zero_one_bfs(self, sources: Set[int], weight: Callable[[int, int, RequirementSet], Optional[int]]):
+        compact = self._compact_edges()
+        starts, ends, targets, requirements = compact.starts, compact.ends, compact.targets, compact.requirements
+
+        predecessors: Dict[int, Optional[int]] = {source: None for source in sources}
+        dist = {}
+        seen = {source: 0 for source in sources}
+        fringe = deque((0, source) for source in sources)
+
+        while fringe:
+            d, v = fringe.popleft()
+            if v in dist:
+                continue
+            dist[v] = d
+            for edge in range(starts[v], ends[v]):
+                u = targets[edge]
+                cost = weight(v, u, requirements[edge])
+                if cost is None or u in dist:
+                    continue
+                vu_dist = d + cost
+                if u not in seen or vu_dist < seen[u]:
+                    seen[u] = vu_dist
+                    predecessors[u] = v
+                    if cost == 0:
+                        fringe.appendleft((vu_dist, u))
+                    else:
+                        fringe.append((vu_dist, u))
+
+        return dist, predecessors
+
+    def strongly_connected_components(self) -> Iterator[Set[int]]:
+        compact = self._compact_edges()
+        starts, ends, targets = compact.starts, compact.ends, compact.targets
+
+        size = len(starts)
+        preorder = [0] * size
+        lowlink = [0] * size
+        found = bytearray(size)
+        # The first edge of each node that wasn't visited yet. Once visited, a node's preorder never resets.
+        next_edge = array("l", starts)
+        scc_queue = []
+        i = 0  # Preorder counter
+        for source in compact.nodes:
+            if found[source]:
+                continue
+            queue = [source]
+            while queue:
+                v = queue[-1]
+                if not preorder[v]:
+                    i = i + 1
+                    preorder[v] = i
+                done = True
+                for edge in range(next_edge[v], ends[v]):
+                    w = targets[edge]
+                    if not preorder[w]:
+                        next_edge[v] = edge + 1
+                        queue.append(w)
+                        done = False
+                        break
+                if done:
+                    v_preorder = preorder[v]
+                    low = v_preorder
+                    for edge in range(starts[v], ends[v]):
+                        w = targets[edge]
+                        if not found[w]:
+                            if preorder[w] > v_preorder:
+                                if lowlink[w] < low:
+                                    low = lowlink[w]
+                            elif preorder[w] < low:
+                                low = preorder[w]
+                    lowlink[v] = low
+                    queue.pop()
+                    if low == v_preorder:
+                        scc = {v}
+                        while scc_queue and preorder[scc_queue[-1]] > v_preorder:
+                            scc.add(scc_queue.pop())
+                        for k in scc:
+                            found[k] = 1
+                        yield scc
+                    else:
+                        scc_queue.append(v)
@@ -4,8 +4,10 @@ from typing import Iterator, Optional, Set, Dict, List, NamedTuple, Tuple
 from randovania.game_description.game_description import GameDescription
 from randovania.game_description.requirements import RequirementSet, Requirement, ResourceRequirement, RequirementAnd
 from randovania.game_description.world.node import Node, ResourceNode
+from randovania.game_description.world.resolved_graph import ResolvedGraph
 from randovania.generator import graph as graph_module
 from randovania.generator.generator_reach import GeneratorReach
+from randovania.lib import metrics
 from randovania.resolver.state import State
 
 
@@ -43,26 +45,31 @@ class OldGeneratorReach(GeneratorReach):
     _digraph: graph_module.BaseGraph
     _state: State
     _game: GameDescription
-    _reachable_paths: Optional[Dict[int, List[Node]]]
+    _reachable_predecessors: Optional[Dict[int, Optional[int]]]
     _reachable_costs: Optional[Dict[int, int]]
     _node_reachable_cache: Dict[int, bool]
     _unreachable_paths: Dict[Tuple[Node, Node], RequirementSet]
     _safe_nodes: Optional[Set[int]]
     _is_node_safe_cache: Dict[Node, bool]
+    _owns_caches: bool
 
     def __deepcopy__(self, memodict):
+        metrics.increment("generator_reach.deepcopy")
         reach = OldGeneratorReach(
             self._game,
             self._state,
             self._digraph.copy()
         )
-        reach._unreachable_paths = copy.copy(self._unreachable_paths)
-        reach._reachable_paths = self._reachable_paths
+        reach._unreachable_paths = self._unreachable_paths
+        reach._reachable_predecessors = self._reachable_predecessors
         reach._reachable_costs = self._reachable_costs
         reach._safe_nodes = self._safe_nodes
 
-        reach._node_reachable_cache = copy.copy(self._node_reachable_cache)
-        reach._is_node_safe_cache = copy.copy(self._is_node_safe_cache)
+        reach._node_reachable_cache = self._node_reachable_cache
+        reach._is_node_safe_cache = self._is_node_safe_cache
+
+        # The dicts are shared now, so whoever changes them first must copy them
+        reach._owns_caches = self._owns_caches = False
         return reach
 
     def __init__(self,
@@ -75,9 +82,17 @@ class OldGeneratorReach(GeneratorReach):
         self._state = state
         self._digraph = graph
         self._unreachable_paths = {}
-        self._reachable_paths = None
+        self._reachable_predecessors = None
         self._node_reachable_cache = {}
         self._is_node_safe_cache = {}
+        self._owns_caches = True
+
+    def _ensure_owns_caches(self):
+        if not self._owns_caches:
+            self._unreachable_paths = copy.copy(self._unreachable_paths)
+            self._node_reachable_cache = copy.copy(self._node_reachable_cache)
+            self._is_node_safe_cache = copy.copy(self._is_node_safe_cache)
+            self._owns_caches = True
 
     @classmethod
     def reach_from_state(cls,
@@ -85,15 +100,15 @@ class OldGeneratorReach(GeneratorReach):
                          initial_state: State,
                          ) -> "GeneratorReach":
 
-        reach = cls(game, initial_state, graph_module.RandovaniaGraph.new())
+        reach = cls(game, initial_state, graph_module.CompactGraph.new())
         reach._expand_graph([GraphPath(None, initial_state.node, RequirementSet.trivial())])
         return reach
 
-    def _potential_nodes_from(self, node: Node) -> Iterator[Tuple[Node, RequirementSet]]:
+    def _potential_nodes_from(self, node: Node, graph: ResolvedGraph) -> Iterator[Tuple[Node, Requirement]]:
         extra_requirement = _extra_requirement_for_node(self._game, node)
         requirement_to_leave = node.requirement_to_leave(self._state.patches, self._state.resources)
 
-        for target_node, requirement in self._game.world_list.potential_nodes_from(node, self.state.patches):
+        for target_node, requirement in graph.potential_nodes_from(node):
             if target_node is None:
                 continue
 
@@ -103,11 +118,19 @@ class OldGeneratorReach(GeneratorReach):
             if extra_requirement is not None:
                 requirement = RequirementAnd([requirement, extra_requirement])
 
-            yield target_node, requirement.as_set(self._state.resource_database)
+            yield target_node, requirement
 
+    @metrics.timed("generator_reach.expand_graph")
     def _expand_graph(self, paths_to_check: List[GraphPath]):
         # print("!! _expand_graph", len(paths_to_check))
-        self._reachable_paths = None
+        self._reachable_predecessors = None
+        self._ensure_owns_caches()
+        compiler = self._game.requirement_compiler
+        counts, multipliers = compiler.vector_for(self._state.resources)
+        energy = self._state.energy
+        database = self._state.resource_database
+        graph = self._game.world_list.resolved_graph(self._state.patches)
+
         while paths_to_check:
             path = paths_to_check.pop(0)
 
@@ -118,8 +141,11 @@ class OldGeneratorReach(GeneratorReach):
             # print(">>> will check starting at", self.game.world_list.node_name(path.node))
             path.add_to_graph(self._digraph)
 
-            for target_node, requirement in self._potential_nodes_from(path.node):
-                if requirement.satisfied(self._state.resources, self._state.energy, self._state.resource_database):
+            for target_node, requirement in self._potential_nodes_from(path.node, graph):
+                satisfied = compiler.compile(requirement).satisfied(counts, multipliers, energy)
+                metrics.increment("requirements.compiled_evaluations")
+                requirement = requirement.as_set(database)
+                if satisfied:
                     # print("* Queue path to", self.game.world_list.node_name(target_node))
                     paths_to_check.append(GraphPath(path.node, target_node, requirement))
                 else:
@@ -147,15 +173,10 @@ class OldGeneratorReach(GeneratorReach):
         if self._safe_nodes is not None:
             return
 
-        for component in self._digraph.strongly_connected_components():
-            if self._state.node.index in component:
-                assert self._safe_nodes is None
-                self._safe_nodes = component
-
-        assert self._safe_nodes is not None
+        self._safe_nodes = self._digraph.strongly_connected_component(self._state.node.index)
 
     def _calculate_reachable_paths(self):
-        if self._reachable_paths is not None:
+        if self._reachable_predecessors is not None:
             return
 
         all_nodes = self.all_nodes
@@ -166,8 +187,8 @@ class OldGeneratorReach(GeneratorReach):
             else:
                 return 1
 
-        self._reachable_costs, self._reachable_paths = self._digraph.multi_source_dijkstra({self.state.node.index},
-                                                                                           weight=weight)
+        self._reachable_costs, self._reachable_predecessors = self._digraph.multi_source_zero_one_bfs(
+            {self.state.node.index}, weight=weight)
 
     def is_reachable_node(self, node: Node) -> bool:
         index = node.index
@@ -177,6 +198,7 @@ class OldGeneratorReach(GeneratorReach):
             return cached_value
 
         self._calculate_reachable_paths()
+        self._ensure_owns_caches()
 
         cost = self._reachable_costs.get(index)
         if cost is not None:
@@ -199,7 +221,7 @@ class OldGeneratorReach(GeneratorReach):
         """
         self._calculate_reachable_paths()
         all_nodes = self.all_nodes
-        for index in self._reachable_paths.keys():
+        for index in self._reachable_predecessors.keys():
             yield all_nodes[index]
 
     @property
@@ -232,6 +254,7 @@ class OldGeneratorReach(GeneratorReach):
             return is_safe
 
         self._calculate_safe_nodes()
+        self._ensure_owns_caches()
         self._is_node_safe_cache[node] = node.index in self._safe_nodes
         return self._is_node_safe_cache[node]
 
@@ -242,26 +265,30 @@ class OldGeneratorReach(GeneratorReach):
         # assert self.is_reachable_node(new_state.node)
 
         if is_safe or self.is_safe_node(new_state.node):
-            for index in [index for index, flag in self._node_reachable_cache.items()
-                          if not flag]:
-                del self._node_reachable_cache[index]
-
-            for node in [node for node, flag in self._is_node_safe_cache.items()
-                         if not flag]:
-                del self._is_node_safe_cache[node]
+            self._node_reachable_cache = {index: flag for index, flag in self._node_reachable_cache.items() if flag}
+            self._is_node_safe_cache = {node: flag for node, flag in self._is_node_safe_cache.items() if flag}
         else:
             self._node_reachable_cache = {}
             self._is_node_safe_cache = {}
 
+        if not self._owns_caches:
+            self._unreachable_paths = copy.copy(self._unreachable_paths)
+            self._owns_caches = True
+
         self._state = new_state
 
         paths_to_check: List[GraphPath] = []
 
         edges_to_remove = []
+        compiler = self._game.requirement_compiler
+        counts, multipliers = compiler.vector_for(self._state.resources)
+        energy = self._state.energy
+
         # Check if we can expand the corners of our graph
         # TODO: check if expensive. We filter by only nodes that depends on a new resource
         for edge, requirement in self._unreachable_paths.items():
-            if requirement.satisfied(self._state.resources, self._state.energy, self._state.resource_database):
+            metrics.increment("requirements.compiled_evaluations")
+            if compiler.compile(requirement).satisfied(counts, multipliers, energy):
                 from_node, to_node = edge
                 paths_to_check.append(GraphPath(from_node, to_node, requirement))
                 edges_to_remove.append(edge)
@@ -250,7 +250,7 @@ class ResourceDatabaseEditor(QtWidgets.QDockWidget, Ui_ResourceDatabaseEditor):
         if not did_confirm or template_name == "":
             return
 
-        self.db.requirement_template[template_name] = Requirement.trivial()
+        self.db.set_requirement_template(template_name, Requirement.trivial())
         self.create_template_editor(template_name)
         self.tab_template_layout.removeWidget(self.create_new_template_button)
         self.tab_template_layout.addWidget(self.create_new_template_button)
@@ -284,5 +284,5 @@ class ResourceDatabaseEditor(QtWidgets.QDockWidget, Ui_ResourceDatabaseEditor):
         editor = ConnectionsEditor(self, self.db, requirement)
         result = editor.exec_()
         if result == QtWidgets.QDialog.Accepted:
-            self.db.requirement_template[name] = editor.final_requirement
+            self.db.set_requirement_template(name, editor.final_requirement)
             self.editor_for_template[name].create_visualizer(self.db)
@@ -5,7 +5,6 @@ import os
 import sys
 import traceback
 import typing
-from argparse import ArgumentParser
 from pathlib import Path
 
 from PySide2 import QtCore, QtWidgets
@@ -284,37 +283,3 @@ def run(args):
     with loop:
         loop.create_task(qt_main(app, data_dir, args)).add_done_callback(main_done)
         loop.run_forever()
-
-
-def create_subparsers(sub_parsers):
-    parser: ArgumentParser = sub_parsers.add_parser(
-        "gui",
-        help="Run the Graphical User Interface"
-    )
-    parser.add_argument("--preview", action="store_true", help="Activates preview features")
-    parser.add_argument("--custom-network-storage", type=Path, help="Use a custom path to store the network login.")
-    parser.add_argument("--login-as-guest", type=str, help="Login as the given quest user")
-    parser.add_argument("--debug-game-backend", action="store_true", help="Opens the debug game backend.")
-
-    gui_parsers = parser.add_subparsers(dest="command")
-    gui_parsers.add_parser("main", help="Displays the Main Window").set_defaults(func=run)
-    gui_parsers.add_parser("tracker", help="Opens only the auto tracker").set_defaults(func=run)
-
-    editor_parser = gui_parsers.add_parser("data_editor", help="Opens a data editor for the given game")
-    editor_parser.add_argument("--game", required=True, choices=[game.value for game in RandovaniaGame])
-    editor_parser.set_defaults(func=run)
-
-    game_parser = gui_parsers.add_parser("game", help="Opens an rdvgame")
-    game_parser.add_argument("rdvgame", type=Path, help="Path ")
-    game_parser.set_defaults(func=run)
-
-    session_parser = gui_parsers.add_parser("session", help="Connects to a game session")
-    session_parser.add_argument("session_id", type=int, help="Id of the session")
-    session_parser.set_defaults(func=run)
-
-    def check_command(args):
-        if args.command is None:
-            parser.print_help()
-            raise SystemExit(1)
-
-    parser.set_defaults(func=check_command)
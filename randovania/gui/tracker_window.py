@@ -24,7 +24,6 @@ from randovania.game_description.resources.pickup_entry import PickupEntry
 from randovania.game_description.resources.resource_info import add_resource_gain_to_current_resources
 from randovania.game_description.world.area import Area
 from randovania.game_description.world.area_identifier import AreaIdentifier
-from randovania.game_description.world.dock import DockLockType
 from randovania.game_description.world.node import Node, ResourceNode, ConfigurableNode, TeleporterNode, DockNode
 from randovania.game_description.world.node_identifier import NodeIdentifier
 from randovania.game_description.world.world import World
@@ -327,7 +326,7 @@ class TrackerWindow(QMainWindow, Ui_TrackerWindow):
         node: Optional[Node] = getattr(target, "node", None)
         if node is not None:
             reach = ResolverReach.calculate_reach(self.logic, self.state_for_current_configuration())
-            path = reach.path_to_node.get(node, [])
+            path = reach.path_to_node(node)
 
             wl = self.logic.game.world_list
             text = [f"<p><span style='font-weight:600;'>Path to {node.name}</span></p><ul>"]
@@ -391,6 +390,7 @@ class TrackerWindow(QMainWindow, Ui_TrackerWindow):
         for area in world.areas:
             g.add_node(area)
 
+        resolved_graph = world_list.resolved_graph(state.patches)
         for area in world.areas:
             nearby_areas = set()
             for node in area.nodes:
@@ -399,24 +399,11 @@ class TrackerWindow(QMainWindow, Ui_TrackerWindow):
 
                 if isinstance(node, DockNode):
                     try:
-                        target_node = world_list.resolve_dock_node(node, state.patches)
-                        if target_node is None:
-                            continue
-                        forward_weakness = state.patches.dock_weakness.get(world_list.identifier_for_node(node),
-                                                                           node.default_dock_weakness)
-                        requirement = forward_weakness.requirement
-                        # TODO: only add requirement if the blast shield has not been destroyed yet
-
-                        if isinstance(target_node, DockNode):
-                            # TODO: Target node is expected to be a dock. Should this error?
-                            back_weakness = state.patches.dock_weakness.get(
-                                world_list.identifier_for_node(target_node),
-                                target_node.default_dock_weakness)
-                            if back_weakness.lock_type == DockLockType.FRONT_BLAST_BACK_BLAST:
-                                requirement = RequirementAnd([requirement, back_weakness.requirement])
-
-                        if requirement.satisfied(state.resources, state.energy, state.resource_database):
-                            nearby_areas.add(world_list.nodes_to_area(target_node))
+                        for target_node, requirement in resolved_graph.connections_from(node):
+                            if target_node is None:
+                                continue
+                            if requirement.satisfied(state.resources, state.energy, state.resource_database):
+                                nearby_areas.add(world_list.nodes_to_area(target_node))
 
                     except IndexError as e:
                         logging.error(f"For {node.name} in {area.name}, received {e}")
@@ -0,0 +1,151 @@
+import atexit
+import dataclasses
+import importlib.abc
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+PROFILE_IMPORTS_ARGUMENT = "--profile-imports"
+
+
+@dataclasses.dataclass(frozen=True)
+class ModuleImportTime:
+    name: str
+    imported_by: Optional[str]
+    cumulative: float
+    """Seconds spent executing the module, including the modules it imported."""
+    self_time: float
+    """Seconds spent executing the module, excluding the modules it imported."""
+
+    @property
+    def as_json(self) -> dict:
+        return {
+            "name": self.name,
+            "imported_by": self.imported_by,
+            "cumulative": self.cumulative,
+            "self": self.self_time,
+        }
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps the loader of a module, timing `exec_module` and forwarding everything else."""
+
+    def __init__(self, loader, profiler: "ImportProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler.run_timed(module.__name__, self._loader.exec_module, module)
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """
+    Records how long each module takes to be imported, similar to `python -X importtime` but without needing
+    to be enabled when Python starts, and exportable as JSON.
+    Only modules imported while installed are recorded.
+    """
+    modules: Dict[str, ModuleImportTime]
+    _started_at: float
+    _stopped_at: Optional[float]
+    _stack: List[str]
+    _children_time: List[float]
+
+    def __init__(self):
+        self.modules = {}
+        self._started_at = time.perf_counter()
+        self._stopped_at = None
+        self._stack = []
+        self._children_time = []
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        self._stopped_at = time.perf_counter()
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+
+        return None
+
+    def run_timed(self, name: str, function, *args):
+        imported_by = self._stack[-1] if self._stack else None
+        self._stack.append(name)
+        self._children_time.append(0.0)
+        start = time.perf_counter()
+        try:
+            function(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            children_time = self._children_time.pop()
+            if self._children_time:
+                self._children_time[-1] += elapsed
+            self.modules[name] = ModuleImportTime(name, imported_by, elapsed, elapsed - children_time)
+
+    @property
+    def total_time(self) -> float:
+        """Seconds spent importing the modules that weren't imported by another recorded module."""
+        return sum(module.cumulative for module in self.modules.values() if module.imported_by is None)
+
+    @property
+    def as_json(self) -> dict:
+        stopped_at = self._stopped_at if self._stopped_at is not None else time.perf_counter()
+        return {
+            "argv": sys.argv,
+            "wall_time": stopped_at - self._started_at,
+            "import_time": self.total_time,
+            "modules": [
+                module.as_json
+                for module in sorted(self.modules.values(), key=lambda it: it.self_time, reverse=True)
+            ],
+        }
+
+    def write_report(self, output_path: Path):
+        output_path.write_text(json.dumps(self.as_json, indent=4))
+
+
+def report_path_from_argv(argv: Sequence[str]) -> Optional[Path]:
+    """
+    Finds the value of the `--profile-imports` argument without argparse, as it's needed before the
+    argument parser and the modules it uses are imported.
+    """
+    for i, arg in enumerate(argv):
+        if arg == PROFILE_IMPORTS_ARGUMENT and i + 1 < len(argv):
+            return Path(argv[i + 1])
+        if arg.startswith(f"{PROFILE_IMPORTS_ARGUMENT}="):
+            return Path(arg.split("=", 1)[1])
+    return None
+
+
+def profile_until_exit(output_path: Path) -> ImportProfiler:
+    """
+    Starts recording imports, writing the report to the given path when the process exits.
+    """
+    profiler = ImportProfiler()
+    profiler.install()
+
+    def _write_report():
+        profiler.uninstall()
+        profiler.write_report(output_path)
+
+    atexit.register(_write_report)
+    return profiler
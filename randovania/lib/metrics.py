@@ -0,0 +1,145 @@
+"""
+Counters and timers for finding out where the generator and the resolver spend their time.
+
+The default backend ignores everything, so instrumented code only pays for a function call. Use `set_backend` with
+a `CollectingMetrics`, or `collecting()`, to record them.
+Callers must use `metrics.increment`, `metrics.timer` and `metrics.backend` through the module, as `set_backend`
+replaces them.
+"""
+import contextlib
+import dataclasses
+import functools
+import json
+import time
+from pathlib import Path
+from typing import ContextManager, Dict, Iterator, Optional
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+class MetricsBackend:
+    """Ignores all metrics."""
+
+    def increment(self, name: str, amount: int = 1):
+        pass
+
+    def timer(self, name: str) -> ContextManager:
+        """
+        A context manager that measures how long its body takes. Also counts how many times it was used.
+        """
+        return _NULL_CONTEXT
+
+    @property
+    def as_json(self) -> dict:
+        return {}
+
+    def export(self):
+        """Called once the generation of a game finishes."""
+
+
+@dataclasses.dataclass()
+class TimerStatistics:
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+
+    @property
+    def as_json(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.maximum,
+        }
+
+
+class CollectingMetrics(MetricsBackend):
+    """
+    Keeps all metrics in memory. When `export_path` is set, `export` writes them to it as JSON.
+    """
+    counters: Dict[str, int]
+    timers: Dict[str, TimerStatistics]
+    export_path: Optional[Path]
+
+    def __init__(self, export_path: Optional[Path] = None):
+        self.counters = {}
+        self.timers = {}
+        self.export_path = export_path
+
+    def increment(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextlib.contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            statistics = self.timers.get(name)
+            if statistics is None:
+                statistics = self.timers[name] = TimerStatistics()
+            statistics.count += 1
+            statistics.total += elapsed
+            statistics.maximum = max(statistics.maximum, elapsed)
+
+    @property
+    def as_json(self) -> dict:
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "timers": {
+                name: statistics.as_json
+                for name, statistics in sorted(self.timers.items())
+            },
+        }
+
+    def export(self):
+        if self.export_path is not None:
+            self.export_path.write_text(json.dumps(self.as_json, indent=4))
+
+
+backend: MetricsBackend = MetricsBackend()
+increment = backend.increment
+timer = backend.timer
+
+
+def set_backend(new_backend: MetricsBackend) -> MetricsBackend:
+    """
+    Makes all metrics go to the given backend.
+    :return: The previous backend.
+    """
+    global backend, increment, timer
+    previous = backend
+    backend = new_backend
+    increment = new_backend.increment
+    timer = new_backend.timer
+    return previous
+
+
+@contextlib.contextmanager
+def collecting() -> Iterator[CollectingMetrics]:
+    """Collects the metrics recorded inside the block, restoring the previous backend after."""
+    collected = CollectingMetrics()
+    previous = set_backend(collected)
+    try:
+        yield collected
+    finally:
+        set_backend(previous)
+
+
+def export():
+    backend.export()
+
+
+def timed(name: str):
+    """Decorator that uses `timer` with the given name for every call of the function."""
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
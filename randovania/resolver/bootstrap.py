@@ -9,7 +9,7 @@ from randovania.game_description.requirements import ResourceRequirement
 from randovania.game_description.resources.damage_resource_info import DamageReduction
 from randovania.game_description.resources.resource_database import ResourceDatabase
 from randovania.game_description.resources.resource_info import CurrentResources, \
-    add_resource_gain_to_current_resources
+    add_resource_gain_to_current_resources, ResourceCollection
 from randovania.game_description.resources.resource_type import ResourceType
 from randovania.game_description.world.node import PlayerShipNode
 from randovania.games.game import RandovaniaGame
@@ -71,7 +71,8 @@ def _add_minimal_logic_initial_resources(resources: CurrentResources,
 
 def calculate_starting_state(game: GameDescription, patches: GamePatches, energy_per_tank: int) -> "State":
     starting_node = game.world_list.resolve_teleporter_connection(patches.starting_location)
-    initial_resources = copy.copy(patches.starting_items)
+    initial_resources = ResourceCollection.from_resources(game.resource_database.resource_indexer,
+                                                          patches.starting_items)
 
     if isinstance(starting_node, PlayerShipNode):
         add_resource_gain_to_current_resources(
@@ -81,6 +81,11 @@ def log_rollback(state: "State", has_action, possible_action: bool):
     _current_indent -= 1
 
 
+def log_skip_dead_end(state: "State"):
+    if _DEBUG_LEVEL > 1:
+        print("{}* Skip {}, known dead end".format(_indent(1), n(state.node, world_list=state.world_list)))
+
+
 def log_skip_action_missing_requirement(node: Node, game: "GameDescription", requirement_set: RequirementSet):
     if _DEBUG_LEVEL > 1:
         if node in _last_printed_additional and _last_printed_additional[node] == requirement_set:
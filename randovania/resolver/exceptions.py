@@ -29,3 +29,11 @@ class ImpossibleForSolver(Exception):
 
 class InvalidConfiguration(Exception):
     pass
+
+
+class ResolverCancelled(Exception):
+    pass
+
+
+class ResolverTimeout(ResolverCancelled):
+    pass
@@ -11,7 +11,8 @@ class Logic:
 
     game: GameDescription
     configuration: BaseConfiguration
-    additional_requirements: Dict[Node, RequirementSet]
+    additional_requirements: Dict[int, RequirementSet]
+    """Keyed by the index of the node."""
 
     def __init__(self, game: GameDescription, configuration: BaseConfiguration):
         self.game = game
@@ -19,4 +20,4 @@ class Logic:
         self.additional_requirements = {}
 
     def get_additional_requirements(self, node: Node) -> RequirementSet:
-        return self.additional_requirements.get(node, RequirementSet.trivial())
+        return self.additional_requirements.get(node.index, RequirementSet.trivial())
@@ -1,16 +1,25 @@
 import asyncio
+import collections
 import copy
-from typing import Optional, Tuple, Callable, FrozenSet
+import dataclasses
+import itertools
+import multiprocessing
+import threading
+import time
+from typing import Optional, Tuple, Callable, FrozenSet, List, Dict, NamedTuple, Iterator, Union
 
 from randovania.game_description import default_database
 from randovania.game_description.game_patches import GamePatches
 from randovania.game_description.world.node import PickupNode, ResourceNode, EventNode, Node
 from randovania.game_description.requirements import RequirementSet, RequirementList
-from randovania.game_description.resources.resource_info import ResourceInfo
+from randovania.game_description.resources.resource_info import ResourceInfo, CurrentResources
+from randovania.game_description.world.world_list import WorldList
 from randovania.layout.base.base_configuration import BaseConfiguration
+from randovania.lib import metrics
 from randovania.resolver import debug, event_pickup, bootstrap
 from randovania.resolver.bootstrap import logic_bootstrap
 from randovania.resolver.event_pickup import EventPickupNode
+from randovania.resolver.exceptions import ResolverCancelled, ResolverTimeout
 from randovania.resolver.logic import Logic
 from randovania.resolver.resolver_reach import ResolverReach
 from randovania.resolver.state import State
@@ -80,71 +89,313 @@ def _should_check_if_action_is_safe(state: State,
     return False
 
 
-async def _inner_advance_depth(state: State,
-                               logic: Logic,
-                               status_update: Callable[[str], None],
-                               *,
-                               reach: Optional[ResolverReach] = None,
-                               ) -> Tuple[Optional[State], bool]:
+class _DeadEnd(NamedTuple):
+    resources: CurrentResources
+    energy: int
+    has_action: bool
+
+
+def _resources_subsumed(resources: CurrentResources, by: CurrentResources,
+                        equal_resources: FrozenSet[ResourceInfo]) -> bool:
     """
+    Checks if `resources` has at most the quantity of each resource in `by`, and the same quantity of each resource
+    in `equal_resources`.
+    """
+    for resource, quantity in resources.items():
+        if quantity > by.get(resource, 0):
+            return False
 
-    :param state:
-    :param logic:
-    :param status_update:
-    :param reach: A precalculated reach for the given state
-    :return:
+    return all(resources.get(resource, 0) == by.get(resource, 0)
+               for resource in equal_resources)
+
+
+class DeadEndTable:
+    """
+    Remembers states the resolver gave up on, so states reached again with the same node and at most the same
+    resources and energy can be skipped. Keeps only the most recently used entries.
+
+    Having more of a dangerous resource might be worse, so these must be equal. Energy tanks must be equal too:
+    collecting one refills the energy, so a state with fewer tanks and less energy can still end up with more
+    energy than the dead end had.
     """
+    _by_node: Dict[Node, Dict[int, _DeadEnd]]
+    _usage: "collections.OrderedDict[int, Node]"
+
+    def __init__(self, dangerous_resources: FrozenSet[ResourceInfo], energy_tank: ResourceInfo,
+                 max_size: int = 10000):
+        self.dangerous_resources = dangerous_resources
+        self.equal_resources = dangerous_resources | {energy_tank}
+        self.max_size = max_size
+        self._by_node = collections.defaultdict(dict)
+        self._usage = collections.OrderedDict()
+        self._next_key = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._usage)
+
+    def add(self, state: State, has_action: bool):
+        key = next(self._next_key)
+        self._by_node[state.node][key] = _DeadEnd(copy.copy(state.resources), state.energy, has_action)
+        self._usage[key] = state.node
+
+        while len(self._usage) > self.max_size:
+            old_key, old_node = self._usage.popitem(last=False)
+            node_entries = self._by_node[old_node]
+            del node_entries[old_key]
+            if not node_entries:
+                del self._by_node[old_node]
+
+    def find(self, state: State) -> Optional[_DeadEnd]:
+        """
+        Finds a dead end with the same node as the given state and at least as many resources and energy.
+        :param state:
+        :return:
+        """
+        node_entries = self._by_node.get(state.node)
+        if not node_entries:
+            return None
+
+        for key, dead_end in node_entries.items():
+            if dead_end.energy >= state.energy and _resources_subsumed(state.resources, dead_end.resources,
+                                                                       self.equal_resources):
+                self._usage.move_to_end(key)
+                return dead_end
 
+        return None
+
+
+@dataclasses.dataclass(frozen=True)
+class ResolverProgress:
+    depth: int
+    """How many states are being explored, from the starting state to the current one."""
+    states_explored: int
+    best_resource_count: int
+    """The most resources any explored state had."""
+
+
+class CancellationToken:
+    """
+    Stops a resolve, between reach calculations, once `cancel` is called or the deadline passes.
+    `cancel` can be called from another thread. To cancel from another process, use a `multiprocessing.Event`.
+    """
+    deadline: Optional[float]
+
+    def __init__(self, deadline: Optional[float] = None, event=None):
+        """
+        :param deadline: A value of `time.monotonic()` after which the resolve is stopped.
+        :param event: Anything with `set` and `is_set`. Defaults to a `threading.Event`.
+        """
+        self.deadline = deadline
+        self._event = event if event is not None else threading.Event()
+
+    @classmethod
+    def with_timeout(cls, timeout: Optional[float]) -> "CancellationToken":
+        return cls(time.monotonic() + timeout if timeout is not None else None)
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise ResolverCancelled("Resolver was cancelled")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise ResolverTimeout("Resolver reached the deadline")
+
+
+class _Call(NamedTuple):
+    """A state to explore, with the arguments the recursive version of the search would use."""
+    state: State
+    reach: Optional[ResolverReach]
+    parent_reach: Optional[ResolverReach]
+    process_count: int
+
+
+# The result of exploring a state: the state where victory is reached, or None, and if any action was possible.
+_Result = Tuple[Optional[State], bool]
+
+
+@dataclasses.dataclass()
+class _SearchFrame:
+    """A state being explored, waiting for the result of the state it's exploring next."""
+    state: State
+    reach: ResolverReach
+    process_count: int
+    exploring_safe_action: bool = False
+    satisfiable_actions: Optional[Iterator[Tuple[ResourceNode, int]]] = None
+    has_action: bool = False
+
+
+def _result_without_expanding(state: State, logic: Logic, dead_ends: Optional[DeadEndTable]) -> Optional[_Result]:
     if logic.game.victory_condition.satisfied(state.resources, state.energy, state.resource_database):
         return state, True
 
-    # Yield back to the asyncio runner, so cancel can do something
-    await asyncio.sleep(0)
+    if dead_ends is not None:
+        dead_end = dead_ends.find(state)
+        if dead_end is not None:
+            debug.log_skip_dead_end(state)
+            return None, dead_end.has_action
+
+    return None
+
 
+def _expand_state(call: _Call, logic: Logic, status_update: Callable[[str], None],
+                  cancellation: CancellationToken) -> _SearchFrame:
+    reach = call.reach
     if reach is None:
-        reach = ResolverReach.calculate_reach(logic, state)
+        cancellation.check()
+        reach = ResolverReach.calculate_reach(logic, call.state, parent=call.parent_reach)
 
-    debug.log_new_advance(state, reach)
-    status_update("Resolving... {} total resources".format(len(state.resources)))
+    debug.log_new_advance(call.state, reach)
+    metrics.increment("resolver.nodes_expanded")
+    status_update("Resolving... {} total resources".format(len(call.state.resources)))
+    return _SearchFrame(call.state, reach, call.process_count)
+
+
+def _find_safe_action(frame: _SearchFrame, logic: Logic, cancellation: CancellationToken) -> Optional[_Call]:
+    state, reach = frame.state, frame.reach
 
     for action, energy in reach.possible_actions(state):
         if _should_check_if_action_is_safe(state, action, logic.game.dangerous_resources,
                                            logic.game.world_list.all_nodes):
 
-            potential_state = state.act_on_node(action, path=reach.path_to_node[action], new_energy=energy)
-            potential_reach = ResolverReach.calculate_reach(logic, potential_state)
+            potential_state = state.act_on_node(action, path=reach.path_to_node(action), new_energy=energy)
+            cancellation.check()
+            potential_reach = ResolverReach.calculate_reach(logic, potential_state, parent=reach)
 
             # If we can go back to where we were, it's a simple safe node
             if state.node in potential_reach.nodes:
-                new_result = await _inner_advance_depth(
-                    state=potential_state,
-                    logic=logic,
-                    status_update=status_update,
-                    reach=potential_reach,
-                )
+                return _Call(potential_state, potential_reach, None, frame.process_count)
+
+    return None
 
-                if not new_result[1]:
-                    debug.log_rollback(state, True, True)
 
-                # If a safe node was a dead end, we're certainly a dead end as well
-                return new_result
+def _next_satisfiable_action(frame: _SearchFrame, logic: Logic,
+                             dead_ends: Optional[DeadEndTable]) -> Union[_Call, _Result]:
+    next_action = next(frame.satisfiable_actions, None)
+    if next_action is None:
+        return _give_up_on_state(frame.state, logic, frame.reach, frame.has_action, dead_ends)
+
+    action, energy = next_action
+    return _Call(frame.state.act_on_node(action, path=frame.reach.path_to_node(action), new_energy=energy),
+                 None, frame.reach, 1)
+
+
+async def _start_exploring(frame: _SearchFrame, logic: Logic, dead_ends: Optional[DeadEndTable],
+                           cancellation: CancellationToken) -> Union[_Call, _Result]:
+    safe_action = _find_safe_action(frame, logic, cancellation)
+    if safe_action is not None:
+        frame.exploring_safe_action = True
+        return safe_action
 
     debug.log_checking_satisfiable_actions()
-    has_action = False
-    for action, energy in reach.satisfiable_actions(state, logic.game.victory_condition):
-        new_result = await _inner_advance_depth(
-            state=state.act_on_node(action, path=reach.path_to_node[action], new_energy=energy),
-            logic=logic,
-            status_update=status_update,
-        )
-
-        # We got a positive result. Send it back up
-        if new_result[0] is not None:
-            return new_result
+
+    if frame.process_count > 1 and _can_explore_in_parallel():
+        actions = list(frame.reach.satisfiable_actions(frame.state, logic.game.victory_condition))
+        if len(actions) > 1:
+            new_state = await _explore_actions_in_parallel(frame.state, logic, frame.reach, actions,
+                                                           frame.process_count, dead_ends, cancellation)
+            if new_state is not None:
+                return new_state, True
+            return _give_up_on_state(frame.state, logic, frame.reach, True, dead_ends)
+
+    frame.satisfiable_actions = frame.reach.satisfiable_actions(frame.state, logic.game.victory_condition)
+    return _next_satisfiable_action(frame, logic, dead_ends)
+
+
+def _continue_exploring(frame: _SearchFrame, result: _Result, logic: Logic,
+                        dead_ends: Optional[DeadEndTable]) -> Union[_Call, _Result]:
+    if frame.exploring_safe_action:
+        if not result[1]:
+            debug.log_rollback(frame.state, True, True)
+
+        if result[0] is None and dead_ends is not None:
+            dead_ends.add(frame.state, result[1])
+
+        # If a safe node was a dead end, we're certainly a dead end as well
+        return result
+
+    # We got a positive result. Send it back up
+    if result[0] is not None:
+        return result
+
+    frame.has_action = True
+    return _next_satisfiable_action(frame, logic, dead_ends)
+
+
+async def _inner_advance_depth(state: State,
+                               logic: Logic,
+                               status_update: Callable[[str], None],
+                               *,
+                               reach: Optional[ResolverReach] = None,
+                               parent_reach: Optional[ResolverReach] = None,
+                               process_count: int = 1,
+                               dead_ends: Optional[DeadEndTable] = None,
+                               progress_update: Optional[Callable[[ResolverProgress], None]] = None,
+                               cancellation: Optional[CancellationToken] = None,
+                               ) -> _Result:
+    """
+    Depth-first search for a state where victory is reached. The states being explored are kept in a stack
+    instead of recursing, so long playthroughs aren't limited by Python's recursion limit.
+    :param state:
+    :param logic:
+    :param status_update:
+    :param reach: A precalculated reach for the given state
+    :param parent_reach: The reach of the state the given state came from, used to speed up calculating the reach
+    :param process_count: When more than 1, the first time multiple actions must be tried they're explored in
+    parallel by this many processes.
+    :param dead_ends: States that are known to fail, used to skip the given state and filled when it fails.
+    :param progress_update: Called after each state is expanded.
+    :param cancellation: Checked before each reach calculation, raising ResolverCancelled when cancelled.
+    :return:
+    """
+    if cancellation is None:
+        cancellation = CancellationToken()
+
+    stack: List[_SearchFrame] = []
+    states_explored = 0
+    best_resource_count = 0
+    step: Union[_Call, _Result] = _Call(state, reach, parent_reach, process_count)
+
+    while True:
+        if isinstance(step, _Call):
+            result = _result_without_expanding(step.state, logic, dead_ends)
+            if result is not None:
+                step = result
+                continue
+
+            # Yield back to the asyncio runner, so cancel can do something
+            await asyncio.sleep(0)
+
+            frame = _expand_state(step, logic, status_update, cancellation)
+            stack.append(frame)
+            states_explored += 1
+            best_resource_count = max(best_resource_count, len(frame.state.resources))
+            if progress_update is not None:
+                progress_update(ResolverProgress(len(stack), states_explored, best_resource_count))
+
+            step = await _start_exploring(frame, logic, dead_ends, cancellation)
+
+        elif stack:
+            step = _continue_exploring(stack[-1], step, logic, dead_ends)
+
         else:
-            has_action = True
+            return step
+
+        if not isinstance(step, _Call):
+            # The frame on top is done, with `step` being its result
+            stack.pop()
+
 
+def _give_up_on_state(state: State, logic: Logic, reach: ResolverReach, has_action: bool,
+                      dead_ends: Optional[DeadEndTable]) -> Tuple[None, bool]:
     debug.log_rollback(state, has_action, False)
+    metrics.increment("resolver.backtracks")
+    if dead_ends is not None:
+        dead_ends.add(state, has_action)
     additional_requirements = reach.satisfiable_as_requirement_set
 
     if has_action:
@@ -154,14 +405,114 @@ async def _inner_advance_depth(state: State,
 
         additional_requirements = additional_requirements.union(RequirementSet(additional))
 
-    logic.additional_requirements[state.node] = _simplify_additional_requirement_set(additional_requirements,
-                                                                                     state,
-                                                                                     logic.game.dangerous_resources)
+    logic.additional_requirements[state.node.index] = _simplify_additional_requirement_set(
+        additional_requirements, state, logic.game.dangerous_resources)
     return None, has_action
 
 
-async def advance_depth(state: State, logic: Logic, status_update: Callable[[str], None]) -> Optional[State]:
-    return (await _inner_advance_depth(state, logic, status_update))[0]
+# Set only while the processes that explore actions in parallel are being created, which inherit it with fork.
+_parallel_context: Optional[Tuple[State, Logic, ResolverReach, List[Tuple[ResourceNode, int]],
+                                  Optional[DeadEndTable], CancellationToken]] = None
+_PARALLEL_POLL_INTERVAL = 0.05
+
+# One step taken from a state: the position of the node collected, the energy after collecting and the positions
+# of the nodes in the path to it. Positions are indices of `_nodes_in_order`.
+ActionStep = Tuple[int, int, Tuple[int, ...]]
+
+
+def _nodes_in_order(world_list: WorldList) -> Tuple[Node, ...]:
+    # Not `all_nodes`, as that's not refreshed when event_pickup adds nodes
+    return tuple(node for _, _, node in world_list.all_worlds_areas_nodes)
+
+
+def _can_explore_in_parallel() -> bool:
+    # The GameDescription and the current state are shared with the processes via fork
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def _explore_action_in_process(action_position: int) -> Optional[List[ActionStep]]:
+    state, logic, reach, actions, dead_ends, cancellation = _parallel_context
+    action, energy = actions[action_position]
+
+    new_state, _ = asyncio.run(_inner_advance_depth(
+        state=state.act_on_node(action, path=reach.path_to_node(action), new_energy=energy),
+        logic=logic,
+        status_update=_quiet_print,
+        parent_reach=reach,
+        dead_ends=dead_ends,
+        cancellation=cancellation,
+    ))
+    if new_state is None:
+        return None
+
+    node_positions = {node: i for i, node in enumerate(_nodes_in_order(logic.game.world_list))}
+    steps = []
+    while new_state is not state:
+        steps.append((node_positions[new_state.node], new_state.energy,
+                      tuple(node_positions[node] for node in new_state.path_from_previous_state)))
+        new_state = new_state.previous_state
+    steps.reverse()
+    return steps
+
+
+def _replay_steps(state: State, steps: List[ActionStep]) -> State:
+    all_nodes = _nodes_in_order(state.world_list)
+    for node_position, energy, path in steps:
+        state = state.act_on_node(all_nodes[node_position], path=tuple(all_nodes[i] for i in path),
+                                  new_energy=energy)
+    return state
+
+
+async def _explore_actions_in_parallel(state: State, logic: Logic, reach: ResolverReach,
+                                       actions: List[Tuple[ResourceNode, int]],
+                                       process_count: int,
+                                       dead_ends: Optional[DeadEndTable],
+                                       cancellation: CancellationToken) -> Optional[State]:
+    """
+    Explores each of the given actions in a separate process, returning the first victory state found.
+    The remaining processes are terminated as soon as a victory is found.
+    :param state:
+    :param logic:
+    :param reach:
+    :param actions:
+    :param process_count:
+    :param dead_ends:
+    :param cancellation: Also used by the processes, which can only see the deadline.
+    :return:
+    """
+    global _parallel_context
+
+    _parallel_context = (state, logic, reach, actions, dead_ends, cancellation)
+    try:
+        pool = multiprocessing.get_context("fork").Pool(processes=min(process_count, len(actions)))
+    finally:
+        _parallel_context = None
+
+    try:
+        pending = [pool.apply_async(_explore_action_in_process, (i,)) for i in range(len(actions))]
+        while pending:
+            await asyncio.sleep(_PARALLEL_POLL_INTERVAL)
+            cancellation.check()
+            for result in [result for result in pending if result.ready()]:
+                pending.remove(result)
+                steps = result.get()
+                if steps is not None:
+                    return _replay_steps(state, steps)
+        return None
+
+    finally:
+        pool.terminate()
+
+
+async def advance_depth(state: State, logic: Logic, status_update: Callable[[str], None],
+                        process_count: int = 1,
+                        progress_update: Optional[Callable[[ResolverProgress], None]] = None,
+                        cancellation: Optional[CancellationToken] = None,
+                        ) -> Optional[State]:
+    dead_ends = DeadEndTable(logic.game.dangerous_resources, logic.game.resource_database.energy_tank)
+    return (await _inner_advance_depth(state, logic, status_update, process_count=process_count,
+                                       dead_ends=dead_ends, progress_update=progress_update,
+                                       cancellation=cancellation))[0]
 
 
 def _quiet_print(s):
@@ -170,8 +521,24 @@ def _quiet_print(s):
 
 async def resolve(configuration: BaseConfiguration,
                   patches: GamePatches,
-                  status_update: Optional[Callable[[str], None]] = None
+                  status_update: Optional[Callable[[str], None]] = None,
+                  process_count: int = 1,
+                  progress_update: Optional[Callable[[ResolverProgress], None]] = None,
+                  cancellation: Optional[CancellationToken] = None,
                   ) -> Optional[State]:
+    """
+    Checks if the game is possible with the given patches.
+    Only yields to the event loop between states, so use `asyncio.run` in a worker thread or process to keep
+    an event loop responsive, and `cancellation` to stop it from there.
+    :param configuration:
+    :param patches:
+    :param status_update:
+    :param process_count: Opt-in for exploring alternative actions in parallel with this many processes.
+    Requires the fork start method, otherwise it's ignored.
+    :param progress_update: Called with the progress after each state is expanded.
+    :param cancellation: Raises ResolverCancelled, or ResolverTimeout once the deadline passes, when set.
+    :return: The state where victory is reached, or None if impossible.
+    """
     if status_update is None:
         status_update = _quiet_print
 
@@ -184,4 +551,5 @@ async def resolve(configuration: BaseConfiguration,
     starting_state.resources["add_self_as_requirement_to_resources"] = 1
     debug.log_resolve_start()
 
-    return await advance_depth(starting_state, logic, status_update)
+    return await advance_depth(starting_state, logic, status_update, process_count,
+                               progress_update=progress_update, cancellation=cancellation)
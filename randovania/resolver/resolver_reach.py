@@ -1,24 +1,128 @@
+import copy
 import math
 import typing
 from collections import defaultdict
-from typing import Dict, Set, Iterator, Tuple, FrozenSet
+from typing import Dict, Set, Iterator, Tuple, FrozenSet, Optional, NamedTuple, List, Sequence
 
 from randovania.game_description.game_description import calculate_interesting_resources
+from randovania.game_description.game_patches import GamePatches
+from randovania.game_description.requirement_compiler import RequirementCompiler, ResourceVector
+from randovania.game_description.resources.resource_info import CurrentResources, ResourceInfo
 from randovania.game_description.world.node import ResourceNode, Node
+from randovania.game_description.world.resolved_graph import ResolvedGraph
 from randovania.game_description.requirements import RequirementList, RequirementSet, SatisfiableRequirements, \
     RequirementAnd, Requirement
+from randovania.lib import metrics
 from randovania.resolver import debug
 from randovania.resolver.logic import Logic
 from randovania.resolver.state import State
 
 
+class _Edge:
+    """A connection from a node, evaluated for a given set of resources."""
+    __slots__ = ("target", "target_index", "minimum_energy", "damage", "requirement", "_alternatives")
+
+    def __init__(self, target: Node, minimum_energy: float, damage: int, requirement: Requirement):
+        self.target = target
+        self.target_index = target.index
+        self.minimum_energy = minimum_energy
+        self.damage = damage
+        self.requirement = requirement
+        self._alternatives = None
+
+    def alternatives(self, database) -> FrozenSet[RequirementList]:
+        if self._alternatives is None:
+            self._alternatives = self.requirement.as_set(database).alternatives
+        return self._alternatives
+
+
+# The path to a node, as the path to the node before it and that node. Empty for the initial node.
+# Paths share their beginning with the path of the node they came from, so each discovered node costs one tuple.
+PathLink = Tuple  # Tuple["PathLink", Node]
+
+
+def _path_from_link(link: Optional[PathLink]) -> Tuple[Node, ...]:
+    path = []
+    while link:
+        link, node = link
+        path.append(node)
+    path.reverse()
+    return tuple(path)
+
+
+class _NodeEdges(NamedTuple):
+    edges: Tuple[_Edge, ...]
+    dependencies: FrozenSet[ResourceInfo]
+    uses_damage: bool
+
+
+class _EdgeTable(NamedTuple):
+    """The evaluated connections of each visited node, along with what's needed to know when they're outdated."""
+    patches: GamePatches
+    resources: CurrentResources
+    vector: ResourceVector
+    edges_by_index: Dict[int, _NodeEdges]
+
+
+def _changed_resources(old: CurrentResources, new: CurrentResources) -> Set[ResourceInfo]:
+    return {
+        resource
+        for resource in set(old.keys()) | set(new.keys())
+        if old.get(resource, 0) != new.get(resource, 0)
+    }
+
+
+def _evaluate_edges(logic: Logic, state: State, node: Node, graph: ResolvedGraph, compiler: RequirementCompiler,
+                    vector: ResourceVector) -> _NodeEdges:
+    database = state.resource_database
+    counts, multipliers = vector
+
+    requirement_to_leave = node.requirement_to_leave(state.patches, state.resources)
+    if requirement_to_leave != Requirement.trivial():
+        compiled_to_leave = compiler.compile(requirement_to_leave)
+        leave_minimum_energy = compiled_to_leave.minimum_energy(counts, multipliers)
+        leave_damage = compiled_to_leave.damage(counts, multipliers)
+        metrics.increment("requirements.compiled_evaluations")
+    else:
+        requirement_to_leave = None
+        leave_minimum_energy = -math.inf
+        leave_damage = 0
+
+    edges: List[_Edge] = []
+    requirements = [requirement_to_leave] if requirement_to_leave is not None else []
+
+    for target_node, requirement in graph.potential_nodes_from(node):
+        if target_node is None:
+            continue
+
+        compiled = compiler.compile(requirement)
+        minimum_energy = max(compiled.minimum_energy(counts, multipliers), leave_minimum_energy)
+        damage = compiled.damage(counts, multipliers) + leave_damage
+        metrics.increment("requirements.compiled_evaluations")
+        requirements.append(requirement)
+
+        if requirement_to_leave is not None:
+            requirement = RequirementAnd([requirement, requirement_to_leave])
+        edges.append(_Edge(target_node, minimum_energy, damage, requirement))
+
+    dependencies = set()
+    uses_damage = False
+    for requirement in requirements:
+        for individual in requirement.iterate_resource_requirements(database):
+            dependencies.add(individual.resource)
+            uses_damage = uses_damage or individual.is_damage
+
+    return _NodeEdges(tuple(edges), frozenset(dependencies), uses_damage)
+
+
 class ResolverReach:
     _nodes: Tuple[Node, ...]
     _energy_at_node: Dict[Node, int]
-    path_to_node: Dict[Node, Tuple[Node, ...]]
+    _path_links: Sequence[Optional[PathLink]]
     _satisfiable_requirements: SatisfiableRequirements
     _safe_nodes: FrozenSet[Node]
     _logic: Logic
+    _edge_table: Optional[_EdgeTable]
 
     @property
     def nodes(self) -> Iterator[Node]:
@@ -34,91 +138,169 @@ class ResolverReach:
 
     def __init__(self,
                  nodes: Dict[Node, int],
-                 path_to_node: Dict[Node, Tuple[Node, ...]],
+                 path_links: Sequence[Optional[PathLink]],
                  requirements: SatisfiableRequirements,
-                 logic: Logic):
+                 logic: Logic,
+                 edge_table: Optional[_EdgeTable] = None):
         self._nodes = tuple(nodes.keys())
         self._energy_at_node = nodes
         self._logic = logic
-        self.path_to_node = path_to_node
+        self._path_links = path_links
         self._satisfiable_requirements = requirements
+        self._edge_table = edge_table
+
+    def path_to_node(self, node: Node) -> Tuple[Node, ...]:
+        """
+        The nodes to go through to reach the given node, starting with the initial node of this reach.
+        Empty for the initial node and for nodes not in this reach.
+        :param node:
+        :return:
+        """
+        return _path_from_link(self._path_links[node.index])
+
+    def _reusable_edges(self, logic: Logic, state: State, vector: ResourceVector) -> Dict[int, _NodeEdges]:
+        """
+        Gets the evaluated connections of this reach that are still valid for the given state, which are the ones
+        with requirements that don't mention any of the resources that changed.
+        :param logic:
+        :param state:
+        :param vector:
+        :return:
+        """
+        table = self._edge_table
+        if table is None or self._logic is not logic or table.patches is not state.patches:
+            return {}
+
+        changed = _changed_resources(table.resources, state.resources)
+        # FIXME: this key changes the requirement_to_leave of resource nodes
+        if "add_self_as_requirement_to_resources" in changed:
+            return {}
+
+        damage_changed = list(table.vector.damage_multipliers) != list(vector.damage_multipliers)
+        if not changed and not damage_changed:
+            return dict(table.edges_by_index)
+
+        return {
+            index: node_edges
+            for index, node_edges in table.edges_by_index.items()
+            if not (damage_changed and node_edges.uses_damage) and node_edges.dependencies.isdisjoint(changed)
+        }
 
     @classmethod
+    @metrics.timed("resolver_reach.calculate_reach")
     def calculate_reach(cls,
                         logic: Logic,
-                        initial_state: State) -> "ResolverReach":
+                        initial_state: State,
+                        parent: Optional["ResolverReach"] = None) -> "ResolverReach":
+        """
+        Calculates which nodes can be reached from the given state.
+        :param logic:
+        :param initial_state:
+        :param parent: The reach of a previous state, usually the one the given state came from.
+        Connections of the parent whose requirements don't involve the resources that changed between the two states
+        are reused instead of evaluated again.
+        :return:
+        """
 
-        checked_nodes: Dict[Node, int] = {}
         database = initial_state.resource_database
+        compiler = logic.game.requirement_compiler
+        graph = logic.game.world_list.resolved_graph(initial_state.patches)
+        vector = compiler.vector_for(initial_state.resources)
+        counts, multipliers = vector
+
+        if parent is not None:
+            edges_by_index = parent._reusable_edges(logic, initial_state, vector)
+        else:
+            edges_by_index = {}
+
+        # Everything about nodes is kept by their index, in lists with one element per node or dicts with int keys
+        index_count = logic.game.world_list.max_node_index + 1
+        initial_index = initial_state.node.index
+        node_at: List[Optional[Node]] = [None] * index_count
+        node_at[initial_index] = initial_state.node
 
         # Keys: nodes to check
         # Value: how much energy was available when visiting that node
-        nodes_to_check: Dict[Node, int] = {
-            initial_state.node: initial_state.energy
+        nodes_to_check: Dict[int, int] = {
+            initial_index: initial_state.energy
         }
+        energy_to_check: List[float] = [math.inf] * index_count
+        energy_to_check[initial_index] = initial_state.energy
+
+        # How much energy was available when each node was last checked
+        checked_energy: List[float] = [math.inf] * index_count
 
-        reach_nodes: Dict[Node, int] = {}
-        requirements_by_node: Dict[Node, Set[RequirementList]] = defaultdict(set)
+        reach_order: List[int] = []
+        reach_energy: List[Optional[int]] = [None] * index_count
+        requirements_by_index: Dict[int, Set[RequirementList]] = defaultdict(set)
 
-        path_to_node: Dict[Node, Tuple[Node, ...]] = {}
-        path_to_node[initial_state.node] = tuple()
+        path_links: List[Optional[PathLink]] = [None] * index_count
+        path_links[initial_index] = ()
 
         while nodes_to_check:
-            node = next(iter(nodes_to_check))
-            energy = nodes_to_check.pop(node)
+            index = next(iter(nodes_to_check))
+            energy = nodes_to_check.pop(index)
+            energy_to_check[index] = math.inf
+            node = node_at[index]
 
             if node.heal:
                 energy = initial_state.maximum_energy
 
-            checked_nodes[node] = energy
-            if node != initial_state.node:
-                reach_nodes[node] = energy
+            checked_energy[index] = energy
+            if index != initial_index:
+                if reach_energy[index] is None:
+                    reach_order.append(index)
+                reach_energy[index] = energy
 
-            requirement_to_leave = node.requirement_to_leave(initial_state.patches, initial_state.resources)
+            node_edges = edges_by_index.get(index)
+            if node_edges is None:
+                node_edges = _evaluate_edges(logic, initial_state, node, graph, compiler, vector)
+                edges_by_index[index] = node_edges
+            compiled_additional = None
 
-            for target_node, requirement in logic.game.world_list.potential_nodes_from(node, initial_state.patches):
-                if target_node is None:
+            for edge in node_edges.edges:
+                target_index = edge.target_index
+                if checked_energy[target_index] <= energy or energy_to_check[target_index] <= energy:
                     continue
 
-                if checked_nodes.get(target_node, math.inf) <= energy or nodes_to_check.get(target_node,
-                                                                                            math.inf) <= energy:
-                    continue
-
-                if requirement_to_leave != Requirement.trivial():
-                    requirement = RequirementAnd([requirement, requirement_to_leave])
-
                 # Check if the normal requirements to reach that node is satisfied
-                satisfied = requirement.satisfied(initial_state.resources, energy, database)
+                satisfied = energy >= edge.minimum_energy
+
                 if satisfied:
                     # If it is, check if we additional requirements figured out by backtracking is satisfied
-                    satisfied = logic.get_additional_requirements(node).satisfied(initial_state.resources,
-                                                                                  energy,
-                                                                                  initial_state.resource_database)
+                    if compiled_additional is None:
+                        compiled_additional = compiler.compile(logic.get_additional_requirements(node))
+                    satisfied = compiled_additional.satisfied(counts, multipliers, energy)
+                    metrics.increment("requirements.compiled_evaluations")
 
                 if satisfied:
-                    nodes_to_check[target_node] = energy - requirement.damage(initial_state.resources, database)
-                    path_to_node[target_node] = path_to_node[node] + (node,)
+                    nodes_to_check[target_index] = energy_to_check[target_index] = energy - edge.damage
+                    node_at[target_index] = edge.target
+                    path_links[target_index] = (path_links[index], node)
 
-                elif target_node:
+                else:
                     # If we can't go to this node, store the reason in order to build the satisfiable requirements.
                     # Note we ignore the 'additional requirements' here because it'll be added on the end.
-                    requirements_by_node[target_node].update(
-                        requirement.as_set(initial_state.resource_database).alternatives)
+                    node_at[target_index] = edge.target
+                    requirements_by_index[target_index].update(edge.alternatives(database))
 
         # Discard satisfiable requirements of nodes reachable by other means
-        for node in set(reach_nodes.keys()).intersection(requirements_by_node.keys()):
-            requirements_by_node.pop(node)
+        for index in reach_order:
+            requirements_by_index.pop(index, None)
 
-        if requirements_by_node:
+        if requirements_by_index:
             satisfiable_requirements = frozenset.union(
-                *[RequirementSet(requirements).union(logic.get_additional_requirements(node)).alternatives
-                  for node, requirements in requirements_by_node.items()])
+                *[RequirementSet(requirements).union(logic.get_additional_requirements(node_at[index])).alternatives
+                  for index, requirements in requirements_by_index.items()])
         else:
             satisfiable_requirements = frozenset()
 
-        return ResolverReach(reach_nodes, path_to_node,
+        reach_nodes = {node_at[index]: reach_energy[index] for index in reach_order}
+        return ResolverReach(reach_nodes, path_links,
                              satisfiable_requirements,
-                             logic)
+                             logic,
+                             _EdgeTable(initial_state.patches, copy.copy(initial_state.resources), vector,
+                                        edges_by_index))
 
     def possible_actions(self,
                          state: State) -> Iterator[Tuple[ResourceNode, int]]:
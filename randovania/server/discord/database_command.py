@@ -108,6 +108,8 @@ class DatabaseCommandCog(commands.Cog):
             self._on_database_component_listener[custom_id] = functools.partial(call, **kwargs)
 
         for game in enum_lib.iterate_enum(RandovaniaGame):
+            # Not loaded lazily: the menus need every world, and the handlers below look up the areas from these
+            # menus in this same cached database.
             db = default_database.game_description_for(game)
             world_options = await create_split_worlds(db)
             self._split_worlds[game] = world_options
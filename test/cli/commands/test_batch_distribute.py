@@ -1,5 +1,12 @@
-from mock import MagicMock, AsyncMock
+import os
+import queue as queue_module
+from types import SimpleNamespace
 
+import pytest
+from mock import MagicMock, AsyncMock, call
+
+from randovania.cli import batch_queue
+from randovania.cli.batch_queue import BatchJob, BatchJobResult
 from randovania.cli.commands import batch_distribute
 from randovania.layout.permalink import Permalink
 
@@ -38,3 +45,183 @@ def test_batch_distribute_helper(mocker):
     assert delta_time == 4000
     output_dir.joinpath.assert_called_once_with("{}.rdvgame".format(seed_number))
     description.save_to_file.assert_called_once_with(output_dir.joinpath.return_value)
+
+
+@pytest.mark.parametrize("already_exists", [False, True])
+def test_run_job(mocker, tmp_path, already_exists):
+    mock_helper = mocker.patch("randovania.cli.commands.batch_distribute.batch_distribute_helper", return_value=12.5)
+    mock_from_str = mocker.patch("randovania.layout.permalink.Permalink.from_str")
+    mocker.patch("time.time", return_value=1000.0)
+    job = BatchJob(seed_number=5000, permalink="the-permalink", timeout=67, validate=True)
+    if already_exists:
+        tmp_path.joinpath("5000.rdvgame").write_text("{}")
+
+    # Run
+    result = batch_distribute.run_job(job, tmp_path, "host/0")
+
+    # Assert
+    assert result == BatchJobResult(seed_number=5000, success=True, worker="host/0", finished_at=1000.0,
+                                    duration=None if already_exists else 12.5, output="5000.rdvgame", error=None)
+    if already_exists:
+        mock_helper.assert_not_called()
+    else:
+        mock_from_str.assert_called_once_with("the-permalink")
+        mock_helper.assert_called_once_with(mock_from_str.return_value, 5000, 67, True, tmp_path)
+
+
+def test_run_job_failure(mocker, tmp_path):
+    mocker.patch("randovania.cli.commands.batch_distribute.batch_distribute_helper",
+                 side_effect=ValueError("no seed for you"))
+    mocker.patch("randovania.layout.permalink.Permalink.from_str")
+    job = BatchJob(seed_number=5000, permalink="the-permalink", timeout=67, validate=True)
+
+    # Run
+    result = batch_distribute.run_job(job, tmp_path, "host/0")
+
+    # Assert
+    assert not result.success
+    assert result.output is None
+    assert result.error == "no seed for you"
+
+
+def test_batch_worker_helper(mocker, tmp_path):
+    queue_path = tmp_path.joinpath("queue.db")
+    queue = batch_queue.open_job_queue(queue_path)
+    queue.add_jobs([BatchJob(seed_number=seed, permalink="the-permalink", timeout=67, validate=True)
+                    for seed in (1, 2)])
+
+    def run_job(job, output_dir, worker):
+        return BatchJobResult(seed_number=job.seed_number, success=True, worker=worker, finished_at=1000.0,
+                              duration=1.0, output=f"{job.seed_number}.rdvgame", error=None)
+
+    mocker.patch("randovania.cli.commands.batch_distribute.run_job", side_effect=run_job)
+
+    # Run
+    processed = batch_distribute.batch_worker_helper(queue_path, tmp_path, "host/0")
+
+    # Assert
+    assert processed == 2
+    assert [result.seed_number for result in queue.results()] == [1, 2]
+    assert queue.pending_count() == 0
+    queue.close()
+
+
+def test_pipeline_generate_helper(mocker):
+    # Setup
+    description = MagicMock()
+    mock_generate = mocker.patch("randovania.cli.commands.batch_distribute._generate_description",
+                                 return_value=(description, 12.5))
+    queue = MagicMock()
+    mocker.patch("randovania.cli.commands.batch_distribute._pipeline_queue", queue)
+    base_permalink = MagicMock()
+
+    # Run
+    delta_time = batch_distribute.pipeline_generate_helper(base_permalink, 5000, 67)
+
+    # Assert
+    assert delta_time == 12.5
+    mock_generate.assert_called_once_with(base_permalink, 5000, 67, False)
+    queue.put.assert_called_once_with((5000, description.as_json, 12.5))
+
+
+def test_pipeline_validate_worker(mocker, tmp_path):
+    # Setup
+    descriptions = queue_module.Queue()
+    messages = queue_module.Queue()
+    mock_from_json = mocker.patch("randovania.layout.layout_description.LayoutDescription.from_json_dict")
+    mock_validate: AsyncMock = mocker.patch("randovania.generator.generator.validate_description",
+                                            new_callable=AsyncMock,
+                                            side_effect=[None, ValueError("impossible")])
+    mock_from_json.return_value.file_extension.return_value = "rdvgame"
+
+    descriptions.put((1, {"a": 1}, 10.0))
+    descriptions.put((2, {"b": 2}, 20.0))
+    descriptions.put(None)
+
+    # Run
+    batch_distribute.pipeline_validate_worker(descriptions, messages, 67, tmp_path)
+
+    # Assert
+    assert mock_from_json.call_args_list == [call({"a": 1}), call({"b": 2})]
+    assert mock_validate.await_count == 2
+    assert mock_validate.call_args.args[2] == 67
+    mock_from_json.return_value.save_to_file.assert_called_once_with(tmp_path.joinpath("1.rdvgame"))
+    assert messages.get_nowait().startswith("Finished seed in 10.0 seconds, validated in ")
+    assert messages.get_nowait() == "Failed to validate seed: impossible"
+    assert messages.empty()
+
+
+def _fake_generate_description(base_permalink, seed_number, timeout, validate):
+    return SimpleNamespace(as_json={"seed": seed_number}), 1.5
+
+
+def _fake_save_description(description, seed_number, output_dir):
+    output_dir.joinpath(f"{seed_number}.rdvgame").write_text("")
+
+
+@pytest.mark.parametrize("validator_dies", [False, True])
+def test_batch_distribute_pipelined(mocker, tmp_path, validator_dies):
+    # Setup
+    mocker.patch("randovania.cli.commands.batch_distribute._generate_description",
+                 side_effect=_fake_generate_description)
+    mocker.patch("randovania.cli.commands.batch_distribute._save_description", side_effect=_fake_save_description)
+    mocker.patch("randovania.layout.layout_description.LayoutDescription.from_json_dict")
+    if validator_dies:
+        mocker.patch("randovania.generator.generator.validate_description", side_effect=lambda *args: os._exit(3))
+    else:
+        mocker.patch("randovania.generator.generator.validate_description", new_callable=AsyncMock)
+
+    args = SimpleNamespace(seed_count=4, process_count=1, validator_count=2, timeout=67, output_dir=tmp_path)
+    base_permalink = SimpleNamespace(seed_number=100)
+    messages = []
+
+    # Run
+    if validator_dies:
+        with pytest.raises(RuntimeError, match="exit code 3"):
+            batch_distribute.batch_distribute_pipelined(args, base_permalink, messages.append)
+    else:
+        batch_distribute.batch_distribute_pipelined(args, base_permalink, messages.append)
+
+    # Assert
+    if validator_dies:
+        assert list(tmp_path.iterdir()) == []
+    else:
+        assert len(messages) == 4
+        assert all(message.startswith("Finished seed in 1.5 seconds, validated in ") for message in messages)
+        assert sorted(path.name for path in tmp_path.iterdir()) == [f"{seed}.rdvgame" for seed in range(100, 104)]
+
+
+def _fake_run_job(job, output_dir, worker):
+    return BatchJobResult(seed_number=job.seed_number, success=True, worker=worker, finished_at=1000.0,
+                          duration=1.0, output=f"{job.seed_number}.rdvgame", error=None)
+
+
+@pytest.mark.parametrize("other_command_running", [False, True])
+def test_work_on_queue(mocker, tmp_path, other_command_running):
+    # Setup
+    mocker.patch("randovania.cli.commands.batch_distribute.run_job", side_effect=_fake_run_job)
+    queue_path = tmp_path.joinpath("queue.db")
+    queue = batch_queue.open_job_queue(queue_path)
+    queue.add_jobs([BatchJob(seed_number=seed, permalink="the-permalink", timeout=67, validate=True)
+                    for seed in (1, 2)])
+    # An earlier command with the same name crashed with a job claimed
+    queue.claim("host/0")
+    if other_command_running:
+        queue.heartbeat("host")
+
+    # Run
+    if other_command_running:
+        with pytest.raises(SystemExit):
+            batch_distribute.work_on_queue(queue_path, tmp_path.joinpath("out"), 1, "host", None)
+    else:
+        batch_distribute.work_on_queue(queue_path, tmp_path.joinpath("out"), 1, "host", None)
+
+    # Assert
+    if other_command_running:
+        assert queue.results() == []
+        assert queue.last_heartbeat("host") is not None
+    else:
+        assert [result.seed_number for result in queue.results()] == [1, 2]
+        assert queue.last_heartbeat("host") is None
+        assert tmp_path.joinpath("out", "manifest.json").is_file()
+    queue.close()
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+from mock import MagicMock, AsyncMock
+
+from randovania.cli.commands import benchmark
+from randovania.cli.commands.benchmark import BenchmarkCase
+from randovania.games.game import RandovaniaGame
+from randovania.interface_common.preset_manager import PresetManager
+
+
+def _seed(seed_number, success=True, wall_time=10.0, reach_count=100, peak_rss=1000):
+    return {
+        "seed_number": seed_number,
+        "success": success,
+        "error": None if success else "failed",
+        "wall_time": wall_time,
+        "filler_actions": 30 if success else None,
+        "reach_count": reach_count,
+        "resolver_nodes_expanded": 50,
+        "peak_rss": peak_rss,
+    }
+
+
+def _report(summary):
+    return {"cases": [{"name": "prime2/Starter Preset/solo", "summary": summary}]}
+
+
+@pytest.mark.parametrize("all_presets", [False, True])
+def test_create_benchmark_matrix(all_presets):
+    preset_manager = PresetManager(None)
+
+    # Run
+    cases = benchmark.create_benchmark_matrix(preset_manager, [RandovaniaGame.METROID_PRIME_ECHOES], all_presets, 2)
+
+    # Assert
+    preset_names = [preset["path"] for preset in RandovaniaGame.METROID_PRIME_ECHOES.data.presets]
+    assert len(cases) == 2 * (len(preset_names) if all_presets else 1)
+    assert cases[0] == BenchmarkCase(RandovaniaGame.METROID_PRIME_ECHOES, "Starter Preset", 1)
+    assert cases[1] == BenchmarkCase(RandovaniaGame.METROID_PRIME_ECHOES, "Starter Preset", 2)
+    assert cases[1].name == "prime2/Starter Preset/2 players"
+
+
+def test_run_benchmark_seed(mocker):
+    description = MagicMock()
+    description.item_order = ["a", "b", "c"]
+    mock_generate: AsyncMock = mocker.patch("randovania.generator.generator.generate_and_validate_description",
+                                            new_callable=AsyncMock, return_value=description)
+    mock_from_str = mocker.patch("randovania.layout.permalink.Permalink.from_str")
+    mock_from_str.return_value.presets = {}
+
+    # Run
+    result = benchmark.run_benchmark_seed("the-permalink", 5, 60, True)
+
+    # Assert
+    mock_generate.assert_awaited_once()
+    assert mock_generate.call_args.kwargs["permalink"].seed_number == 5
+    assert result["success"]
+    assert result["filler_actions"] == 3
+    assert result["reach_count"] == 0
+    assert result["resolver_nodes_expanded"] == 0
+
+
+def test_summarize_seeds():
+    seeds = [_seed(0, wall_time=10.0), _seed(1, wall_time=20.0, peak_rss=3000), _seed(2, False, wall_time=30.0)]
+
+    # Run
+    summary = benchmark.summarize_seeds(seeds)
+
+    # Assert
+    assert summary["seed_count"] == 3
+    assert summary["failures"] == 1
+    assert summary["failure_rate"] == pytest.approx(1 / 3)
+    assert summary["mean_wall_time"] == 20.0
+    assert summary["mean_filler_actions"] == 30
+    assert summary["mean_reach_count"] == 100
+    assert summary["max_peak_rss"] == 3000
+
+
+def test_compare_reports():
+    baseline = _report(benchmark.summarize_seeds([_seed(0, wall_time=10.0), _seed(1, wall_time=10.0)]))
+    same = _report(benchmark.summarize_seeds([_seed(0, wall_time=10.5), _seed(1, wall_time=10.5)]))
+    slower = _report(benchmark.summarize_seeds([_seed(0, wall_time=15.0), _seed(1, False, wall_time=15.0)]))
+
+    # Run
+    no_regressions = benchmark.compare_reports(same, baseline, 0.1)
+    regressions = benchmark.compare_reports(slower, baseline, 0.1)
+
+    # Assert
+    assert no_regressions == []
+    assert len(regressions) == 2
+    assert regressions[0].startswith("prime2/Starter Preset/solo: mean_wall_time went from 10.00 to 15.00")
+    assert regressions[1].startswith("prime2/Starter Preset/solo: failure_rate")
+
+
+@pytest.mark.parametrize("regressed", [False, True])
+def test_benchmark_command_logic(mocker, tmp_path, regressed):
+    report = _report(benchmark.summarize_seeds([_seed(0, wall_time=20.0 if regressed else 10.0)]))
+    mock_run = mocker.patch("randovania.cli.commands.benchmark.run_benchmark", return_value=report)
+    baseline_path = tmp_path.joinpath("baseline.json")
+    baseline_path.write_text(json.dumps(_report(benchmark.summarize_seeds([_seed(0)]))))
+
+    args = MagicMock()
+    args.game = ["prime2"]
+    args.all_presets = False
+    args.multiworld_players = 1
+    args.first_seed = 10
+    args.seed_count = 2
+    args.output_file = tmp_path.joinpath("report.json")
+    args.baseline = baseline_path
+    args.threshold = 0.1
+
+    # Run
+    if regressed:
+        with pytest.raises(SystemExit):
+            benchmark.benchmark_command_logic(args)
+    else:
+        benchmark.benchmark_command_logic(args)
+
+    # Assert
+    cases, seed_numbers = mock_run.call_args.args[1:3]
+    assert cases == [BenchmarkCase(RandovaniaGame.METROID_PRIME_ECHOES, "Starter Preset", 1)]
+    assert seed_numbers == [10, 11]
+    assert json.loads(args.output_file.read_text()) == report
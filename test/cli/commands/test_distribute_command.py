@@ -22,6 +22,7 @@ def test_distribute_command_logic(no_retry: bool, preset_name: str, mocker, pres
     args.game = RandovaniaGame.METROID_PRIME_ECHOES.value
     args.preset_name = preset_name
     args.seed_number = 0
+    args.metrics = None
     extra_args = {}
     if no_retry:
         extra_args["attempts"] = 0
@@ -0,0 +1,161 @@
+import json
+import os
+
+import pytest
+
+from randovania.cli import batch_queue
+from randovania.cli.batch_queue import BatchJob, BatchJobResult
+
+
+@pytest.fixture(params=["queue.db", "queue"])
+def queue_path(request, tmp_path):
+    return tmp_path.joinpath(request.param)
+
+
+def _job(seed_number: int) -> BatchJob:
+    return BatchJob(seed_number=seed_number, permalink="permalink", timeout=90, validate=True)
+
+
+def _result(seed_number: int, success: bool = True) -> BatchJobResult:
+    return BatchJobResult(seed_number=seed_number, success=success, worker="host/0", finished_at=1000.0,
+                          duration=12.5 if success else None, output=f"{seed_number}.rdvgame" if success else None,
+                          error=None if success else "failed")
+
+
+def test_open_job_queue(tmp_path):
+    assert isinstance(batch_queue.open_job_queue(tmp_path.joinpath("a.sqlite")), batch_queue.SqliteJobQueue)
+    assert isinstance(batch_queue.open_job_queue(tmp_path.joinpath("a")), batch_queue.DirectoryJobQueue)
+
+
+def test_claim_and_finish(queue_path):
+    queue = batch_queue.open_job_queue(queue_path)
+
+    # Run
+    added = queue.add_jobs([_job(10), _job(2), _job(5)])
+    added_again = queue.add_jobs([_job(5), _job(7)])
+    other_queue = batch_queue.open_job_queue(queue_path)
+    claimed = [queue.claim("host/0"), other_queue.claim("host/1")]
+    queue.finish(_job(2), _result(2))
+    other_queue.finish(_job(5), _result(5, success=False))
+
+    # Assert
+    assert (added, added_again) == (3, 1)
+    assert claimed == [_job(2), _job(5)]
+    assert queue.pending_count() == 2
+    assert queue.results() == [_result(2), _result(5, success=False)]
+    assert [queue.claim("host/0"), queue.claim("host/0"), queue.claim("host/0")] == [_job(7), _job(10), None]
+    queue.close()
+    other_queue.close()
+
+
+def test_release_claims(queue_path):
+    queue = batch_queue.open_job_queue(queue_path)
+    queue.add_jobs([_job(1), _job(2), _job(3)])
+    queue.claim("host/0")
+    queue.claim("host2/0")
+    queue.claim("host/1")
+
+    # Run
+    released_by_name = queue.release_claims("host/")
+    released_recent = queue.release_stale(60)
+    released_stale = queue.release_stale(-1)
+
+    # Assert
+    assert (released_by_name, released_recent, released_stale) == (2, 0, 1)
+    assert queue.pending_count() == 3
+    queue.close()
+
+
+def test_finish_after_claim_released(queue_path):
+    queue = batch_queue.open_job_queue(queue_path)
+    queue.add_jobs([_job(1), _job(2)])
+    first_claim = queue.claim("host/0")
+
+    # Run
+    queue.release_claims("host/")
+    second_claim = queue.claim("other/0")
+    queue.finish(first_claim, _result(1))
+    queue.finish(second_claim, _result(1, success=False))
+
+    # Assert
+    assert first_claim == second_claim == _job(1)
+    assert queue.results() == [_result(1)]
+    assert queue.pending_count() == 1
+    assert queue.claim("host/0") == _job(2)
+    assert queue.claim("host/0") is None
+    queue.close()
+
+
+def test_finish_after_claim_released_to_pending(queue_path):
+    queue = batch_queue.open_job_queue(queue_path)
+    queue.add_jobs([_job(1)])
+    job = queue.claim("host/0")
+
+    # Run
+    queue.release_stale(-1)
+    queue.finish(job, _result(1))
+
+    # Assert
+    assert queue.results() == [_result(1)]
+    assert queue.pending_count() == 0
+    assert queue.claim("host/0") is None
+    queue.close()
+
+
+def test_directory_claim_is_not_stale(tmp_path):
+    queue = batch_queue.DirectoryJobQueue(tmp_path)
+    queue.add_jobs([_job(1)])
+    pending = queue.pending.joinpath("1.json")
+    os.utime(pending, (0, 0))
+    os.rename(pending, queue.claimed.joinpath("1.json"))
+    os.utime(queue.claimed.joinpath("1.json"))
+
+    # Run
+    released = queue.release_stale(60)
+
+    # Assert
+    assert released == 0
+
+
+def test_heartbeat(queue_path):
+    queue = batch_queue.open_job_queue(queue_path)
+    other_queue = batch_queue.open_job_queue(queue_path)
+
+    # Run
+    before = queue.last_heartbeat("host/name")
+    queue.heartbeat("host/name")
+    after = other_queue.last_heartbeat("host/name")
+    other = other_queue.last_heartbeat("host")
+    queue.clear_heartbeat("host/name")
+    cleared = other_queue.last_heartbeat("host/name")
+
+    # Assert
+    assert before is None
+    assert after is not None
+    assert other is None
+    assert cleared is None
+    queue.close()
+    other_queue.close()
+
+
+def test_write_manifest(queue_path, tmp_path):
+    queue = batch_queue.open_job_queue(queue_path)
+    queue.add_jobs([_job(1), _job(2), _job(3)])
+    queue.claim("host/0")
+    queue.claim("host/0")
+    queue.finish(_job(1), _result(1))
+    queue.finish(_job(2), _result(2, success=False))
+    manifest = tmp_path.joinpath("manifest.json")
+
+    # Run
+    batch_queue.write_manifest(queue, manifest)
+
+    # Assert
+    assert json.loads(manifest.read_text()) == {
+        "schema_version": batch_queue.MANIFEST_SCHEMA_VERSION,
+        "finished": 1,
+        "failed": 1,
+        "pending": 1,
+        "seeds": [_result(1).as_json, _result(2, success=False).as_json],
+    }
+    queue.close()
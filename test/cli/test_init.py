@@ -1,3 +1,5 @@
+import subprocess
+import sys
 from unittest.mock import MagicMock, patch, ANY
 
 import pytest
@@ -98,3 +100,18 @@ def test_run_pytest(mocker):
     mock_main.assert_called_once_with(["c", "d"], plugins=ANY)
     mock_exit.assert_called_once_with(mock_main.return_value)
 
+
+
+def test_create_parser_is_lightweight():
+    # Creating the parser must not import what only some commands need, as every invocation pays for it
+    code = ("import sys; from randovania import cli; cli._create_parser(); "
+            "print(' '.join(sorted(sys.modules)))")
+
+    # Run
+    result = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+
+    # Assert
+    modules = set(result.stdout.split())
+    for heavy in ["networkx", "PySide2", "peewee", "flask", "construct", "randovania.generator",
+                  "randovania.resolver.resolver", "randovania.layout.permalink"]:
+        assert heavy not in modules
@@ -21,6 +21,9 @@ from randovania.interface_common.preset_manager import PresetManager
 from randovania.layout.base.base_configuration import BaseConfiguration
 from randovania.layout.preset import Preset
 
+# Tests shouldn't use the user's cache of decoded game descriptions
+default_database.GAME_DESCRIPTION_CACHE_ENABLED = False
+
 
 @pytest.fixture(scope="session")
 def test_files_dir() -> Path:
@@ -2,9 +2,11 @@ import copy
 
 import pytest
 
+from randovania.game_description import data_reader
 from randovania.game_description.data_reader import WorldReader
 from randovania.game_description.resources.resource_database import ResourceDatabase
 from randovania.game_description.resources.search import MissingResource
+from randovania.games import default_data
 from randovania.games.game import RandovaniaGame
 
 
@@ -63,3 +65,27 @@ def test_area_with_invalid_connections():
 
     assert str(e.value) == ("In area Broken Area, connection from Broken to A got error: "
                             "items Resource with short_name 'Dark' not found in 0 resources")
+
+
+def test_decode_split_file_lazily(game_enum: RandovaniaGame):
+    path = default_data.json_then_binary_path(game_enum)
+    if not path.is_dir():
+        pytest.skip("Game data isn't split")
+    eager = data_reader.decode_data(data_reader.read_split_file(path))
+
+    # Run
+    lazy = data_reader.decode_split_file_lazily(path)
+    last_world = eager.world_list.worlds[-1]
+    area = lazy.world_list.world_with_name(last_world.name).areas[0]
+    decoded_after_lookup = lazy.world_list.decoded_world_count
+
+    # Assert
+    assert decoded_after_lookup == 1
+    assert [(node.index, node.name) for node in area.nodes] == [
+        (node.index, node.name) for node in last_world.areas[0].nodes
+    ]
+    assert [(node.index, node.name) for node in lazy.world_list.all_nodes] == [
+        (node.index, node.name) for node in eager.world_list.all_nodes
+    ]
+    assert lazy.world_list.decoded_world_count == len(eager.world_list.worlds)
+    assert lazy.world_list.world_with_name(last_world.name) is lazy.world_list.worlds[-1]
@@ -0,0 +1,71 @@
+import sys
+
+import randovania.interface_common
+from randovania.game_description import default_database, data_reader
+from randovania.games.game import RandovaniaGame
+
+
+def _use_cache_dir(monkeypatch, path):
+    monkeypatch.setattr(default_database, "GAME_DESCRIPTION_CACHE_ENABLED", True)
+    monkeypatch.setattr(default_database, "GAME_DESCRIPTION_CACHE_DIR", path)
+
+
+def test_decode_game_description_uses_cache(monkeypatch, mocker, tmp_path):
+    _use_cache_dir(monkeypatch, tmp_path)
+    game = RandovaniaGame.METROID_PRIME
+    tmp_path.joinpath(f"{game.value}-outdated.pickle").write_bytes(b"")
+    decode_data = mocker.patch("randovania.game_description.data_reader.decode_data", wraps=data_reader.decode_data)
+
+    # Run
+    first = default_database._decode_game_description(game)
+    second = default_database._decode_game_description(game)
+
+    # Assert
+    decode_data.assert_called_once()
+    assert [path.name for path in tmp_path.iterdir()] == [
+        f"{game.value}-{default_database.game_description_cache_key(game)}.pickle"
+    ]
+    assert first is not second
+    assert [node.name for node in first.world_list.all_nodes] == [node.name for node in second.world_list.all_nodes]
+    assert first.resource_database.item == second.resource_database.item
+
+
+def test_decode_game_description_invalid_cache(monkeypatch, tmp_path):
+    _use_cache_dir(monkeypatch, tmp_path)
+    game = RandovaniaGame.METROID_PRIME
+    cache = tmp_path.joinpath(f"{game.value}-{default_database.game_description_cache_key(game)}.pickle")
+    cache.write_bytes(b"not a pickle")
+
+    # Run
+    result = default_database._decode_game_description(game)
+
+    # Assert
+    assert result.game == game
+    assert cache.read_bytes() != b"not a pickle"
+
+
+def test_decode_game_description_cache_disabled(monkeypatch, tmp_path):
+    monkeypatch.setattr(default_database, "GAME_DESCRIPTION_CACHE_ENABLED", False)
+    monkeypatch.setattr(default_database, "GAME_DESCRIPTION_CACHE_DIR", tmp_path)
+
+    # Run
+    default_database._decode_game_description(RandovaniaGame.METROID_PRIME)
+
+    # Assert
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_game_description_cache_dir_without_appdirs(monkeypatch):
+    monkeypatch.setattr(default_database, "GAME_DESCRIPTION_CACHE_ENABLED", True)
+    monkeypatch.setattr(default_database, "GAME_DESCRIPTION_CACHE_DIR", None)
+    monkeypatch.setitem(sys.modules, "appdirs", None)
+    monkeypatch.delitem(sys.modules, "randovania.interface_common.persistence", raising=False)
+    monkeypatch.delattr(randovania.interface_common, "persistence", raising=False)
+
+    # Run
+    cache_dir = default_database._game_description_cache_dir()
+    result = default_database._decode_game_description(RandovaniaGame.METROID_PRIME_ECHOES)
+
+    # Assert
+    assert cache_dir is None
+    assert result.game == RandovaniaGame.METROID_PRIME_ECHOES
@@ -4,7 +4,7 @@ import pytest
 
 from randovania.game_description import game_description
 from randovania.game_description.world.area import Area
-from randovania.game_description.world.node import Node
+from randovania.game_description.world.node import Node, DockNode
 from randovania.game_description.requirements import Requirement
 
 
@@ -51,3 +51,51 @@ def test_calculate_dangerous_resources(danger_a, danger_b, expected_result):
 
     # Assert
     assert set(result) == set(expected_result)
+
+
+def test_make_mutable_copy_patch_keeps_original(echoes_game_description):
+    original_connections = {
+        area: {source: dict(connections) for source, connections in area.connections.items()}
+        for area in echoes_game_description.world_list.all_areas
+    }
+    original_weaknesses = {
+        node: node.default_dock_weakness.requirement
+        for node in echoes_game_description.world_list.all_nodes
+        if isinstance(node, DockNode)
+    }
+    resources = {trick: 0 for trick in echoes_game_description.resource_database.trick}
+
+    # Run
+    game = echoes_game_description.make_mutable_copy()
+    game.patch_requirements(resources, 2.0)
+
+    # Assert
+    assert game.mutable
+    assert not echoes_game_description.mutable
+    assert game.world_list.all_nodes == echoes_game_description.world_list.all_nodes
+    assert {
+        area: area.connections
+        for area in echoes_game_description.world_list.all_areas
+    } == original_connections
+    assert {node: node.default_dock_weakness.requirement for node in original_weaknesses} == original_weaknesses
+    assert any(
+        game.world_list.default_dock_weakness(node).requirement != requirement
+        for node, requirement in original_weaknesses.items()
+    )
+
+
+def test_patch_requirements_reuses_patched_requirements(echoes_game_description, mocker):
+    resources = {trick: 0 for trick in echoes_game_description.resource_database.trick}
+    first = echoes_game_description.make_mutable_copy()
+    first.patch_requirements(resources, 1.0)
+    second = echoes_game_description.make_mutable_copy()
+    patch = mocker.patch("randovania.game_description.requirements.RequirementAnd.patch_requirements")
+
+    # Run
+    second.patch_requirements(resources, 1.0)
+
+    # Assert
+    patch.assert_not_called()
+    assert [area.connections for area in second.world_list.all_areas] == [
+        area.connections for area in first.world_list.all_areas
+    ]
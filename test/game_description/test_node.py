@@ -1,6 +1,9 @@
+import dataclasses
+import pickle
+
 import pytest
 
-from randovania.game_description.world.node import LogbookNode, LoreType
+from randovania.game_description.world.node import LogbookNode, LoreType, GenericNode
 from randovania.game_description.resources.item_resource_info import ItemResourceInfo
 from randovania.game_description.resources.resource_info import convert_resource_gain_to_current_resources
 
@@ -59,3 +62,29 @@ def test_logbook_node_resource_gain_on_collect(logbook_node,
 
     # Assert
     assert convert_resource_gain_to_current_resources(gain) == {node.resource(): 1}
+
+
+def test_node_hash_is_cached(logbook_node):
+    node = logbook_node[-1]
+
+    # Run
+    first = hash(node)
+    unpickled = pickle.loads(pickle.dumps(node))
+    renamed = dataclasses.replace(node, name="Other")
+
+    # Assert
+    assert first == hash(node) == hash((0, "Logbook"))
+    assert unpickled._cached_hash is None
+    assert unpickled == node
+    assert hash(unpickled) == first
+    assert hash(renamed) == hash((0, "Other"))
+
+
+def test_node_equal_nodes_have_equal_hash():
+    node = GenericNode("Node", False, None, "", {}, 2)
+    other = GenericNode("Node", False, None, "", {}, 2)
+    hash(node)
+
+    assert node == other
+    assert hash(node) == hash(other)
+    assert {node: 1}[other] == 1
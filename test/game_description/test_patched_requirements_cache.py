@@ -0,0 +1,58 @@
+from unittest.mock import MagicMock
+
+from randovania.game_description.patched_requirements_cache import PatchedRequirementsCache
+
+
+def _database(templates=None):
+    database = MagicMock()
+    database.requirement_template = templates or {}
+    return database
+
+
+def test_table_for_same_arguments():
+    cache = PatchedRequirementsCache()
+    database = _database()
+
+    # Run
+    first = cache.table_for({"a": 1}, 1.0, database)
+    second = cache.table_for({"a": 1}, 1.0, _database())
+    other_multiplier = cache.table_for({"a": 1}, 1.5, database)
+    other_resources = cache.table_for({"a": 2}, 1.0, database)
+    other_templates = cache.table_for({"a": 1}, 1.0, _database({"template": "req"}))
+
+    # Assert
+    assert first is second
+    assert len({id(first), id(other_multiplier), id(other_resources), id(other_templates)}) == 4
+    assert len(cache) == 4
+
+
+def test_trim_discards_least_recently_used():
+    cache = PatchedRequirementsCache(max_tables=2, max_requirements=5)
+    database = _database()
+    cache.table_for({"a": 1}, 1.0, database)["x"] = "y"
+    cache.table_for({"a": 2}, 1.0, database)["x"] = "y"
+    first = cache.table_for({"a": 1}, 1.0, database)
+
+    # Run
+    cache.table_for({"a": 3}, 1.0, database)
+    cache.trim()
+
+    # Assert
+    assert len(cache) == 2
+    assert cache.table_for({"a": 1}, 1.0, database) is first
+    assert cache.table_for({"a": 2}, 1.0, database) == {}
+
+
+def test_trim_max_requirements_keeps_most_recent():
+    cache = PatchedRequirementsCache(max_tables=5, max_requirements=3)
+    database = _database()
+    cache.table_for({"a": 1}, 1.0, database).update({"x": "x", "y": "y"})
+    latest = cache.table_for({"a": 2}, 1.0, database)
+    latest.update({"x": "x", "y": "y", "z": "z", "w": "w"})
+
+    # Run
+    cache.trim()
+
+    # Assert
+    assert len(cache) == 1
+    assert cache.table_for({"a": 2}, 1.0, database) is latest
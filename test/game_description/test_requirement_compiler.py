@@ -0,0 +1,115 @@
+import dataclasses
+
+import pytest
+
+from randovania.game_description import data_reader
+from randovania.game_description.requirement_compiler import RequirementCompiler
+from randovania.game_description.requirements import ResourceRequirement, RequirementAnd, RequirementOr, \
+    Requirement, RequirementList, RequirementSet, MAX_DAMAGE, RequirementTemplate
+from randovania.game_description.resources.pickup_index import PickupIndex
+from randovania.game_description.resources.resource_type import ResourceType
+
+
+def _json_req(amount: int, name: str = "Damage", resource_type: ResourceType = ResourceType.DAMAGE):
+    return {"type": "resource", "data": {"type": resource_type.value, "name": name,
+                                         "amount": amount, "negate": False}}
+
+
+def _arr_req(req_type: str, items: list):
+    return {"type": req_type, "data": {"comment": None, "items": items}}
+
+
+@pytest.mark.parametrize("requirement", [
+    _arr_req("and", [_json_req(50)]),
+    _arr_req("and", [_json_req(1, "Dark", ResourceType.ITEM)]),
+    _arr_req("or", [_json_req(50), _json_req(1, "Dark", ResourceType.ITEM)]),
+    _arr_req("or", [
+        _json_req(100),
+        _arr_req("and", [_json_req(50), _json_req(1, "Dark", ResourceType.ITEM)]),
+    ]),
+    _arr_req("and", [
+        _json_req(100),
+        _arr_req("or", [_json_req(50), _json_req(1, "Dark", ResourceType.ITEM)]),
+    ]),
+    _arr_req("and", [_json_req(100), _json_req(100, "DarkWorld1")]),
+    _arr_req("and", [_json_req(1, "Dark", ResourceType.ITEM), _json_req(1, "Light", ResourceType.ITEM),
+                     _json_req(1, "DarkSuit", ResourceType.ITEM)]),
+    _arr_req("and", []),
+    _arr_req("or", []),
+])
+@pytest.mark.parametrize("items", [[], ["Dark"], ["DarkSuit"], ["LightSuit"], ["Dark", "Light", "DarkSuit"]])
+@pytest.mark.parametrize("energy", [0, 99, 150, 299])
+def test_compiled_matches_requirement(requirement, items, energy, echoes_resource_database):
+    db = echoes_resource_database
+    req = data_reader.read_requirement(requirement, db)
+    resources = {db.get_item(item): 1 for item in items}
+    compiler = RequirementCompiler(db)
+
+    # Run
+    compiled = compiler.compile(req)
+    counts, multipliers = compiler.vector_for(resources)
+
+    # Assert
+    assert compiled.satisfied(counts, multipliers, energy) == req.satisfied(resources, energy, db)
+    assert compiled.damage(counts, multipliers) == req.damage(resources, db)
+    assert compiled.satisfied(counts, multipliers, energy) == (energy >= compiled.minimum_energy(counts, multipliers))
+
+
+def test_compile_negate_and_missing_resource(echoes_resource_database):
+    db = echoes_resource_database
+    compiler = RequirementCompiler(db)
+    counts, multipliers = compiler.vector_for({})
+
+    # Compiled after the vector was created, so PickupIndex(500) has no entry in `counts`
+    has = compiler.compile(ResourceRequirement(PickupIndex(500), 1, False))
+    has_not = compiler.compile(ResourceRequirement(PickupIndex(500), 1, True))
+
+    assert not has.satisfied(counts, multipliers, 99)
+    assert has_not.satisfied(counts, multipliers, 99)
+    assert has.damage(counts, multipliers) == 0
+
+
+def test_compile_requirement_set(echoes_resource_database):
+    db = echoes_resource_database
+    dark = ResourceRequirement(db.get_item("Dark"), 1, False)
+    light = ResourceRequirement(db.get_item("Light"), 1, False)
+    req_set = RequirementSet([RequirementList([dark, light]), RequirementList([light, dark])])
+    compiler = RequirementCompiler(db)
+
+    compiled = compiler.compile(req_set)
+
+    assert not compiled.satisfied(*compiler.vector_for({db.get_item("Dark"): 1}), 99)
+    assert compiled.satisfied(*compiler.vector_for({db.get_item("Dark"): 1, db.get_item("Light"): 1}), 99)
+    assert not compiler.compile(RequirementSet.impossible()).satisfied(*compiler.vector_for({}), 99)
+    assert compiler.compile(RequirementSet.trivial()).satisfied(*compiler.vector_for({}), 99)
+
+
+def test_compile_template_and_cache(echoes_resource_database):
+    db = echoes_resource_database
+    compiler = RequirementCompiler(db)
+    template_name = next(iter(db.requirement_template.keys()))
+    template = RequirementTemplate(template_name)
+
+    assert compiler.compile(template) is compiler.compile(db.requirement_template[template_name])
+    assert compiler.compile(RequirementAnd([])) is compiler.compile(Requirement.trivial())
+    assert compiler.compile(RequirementOr([])).damage(*compiler.vector_for({})) == MAX_DAMAGE
+
+
+def test_compile_template_after_change(echoes_resource_database):
+    db = dataclasses.replace(echoes_resource_database,
+                             requirement_template=dict(echoes_resource_database.requirement_template))
+    dark = ResourceRequirement(db.get_item("Dark"), 1, False)
+    light = ResourceRequirement(db.get_item("Light"), 1, False)
+    db.set_requirement_template("Custom", dark)
+    compiler = RequirementCompiler(db)
+    requirement = RequirementAnd([RequirementTemplate("Custom")])
+    with_dark = compiler.vector_for({db.get_item("Dark"): 1})
+
+    # Run
+    before = compiler.compile(requirement).satisfied(*with_dark, 99)
+    db.set_requirement_template("Custom", light)
+    after = compiler.compile(requirement).satisfied(*with_dark, 99)
+
+    # Assert
+    assert before
+    assert not after
@@ -1,3 +1,4 @@
+import copy
 from typing import Tuple
 from unittest.mock import MagicMock
 
@@ -548,3 +549,79 @@ def test_requirement_set_constructor(echoes_resource_database):
             ("Space Jump Boots", 1),
         ],
     ]
+
+
+def test_as_set_is_memoized(database):
+    # Setup
+    req = RequirementAnd([_req("A"), RequirementOr([_req("B"), _req("C")])])
+    other_database = MagicMock()
+
+    # Run
+    first = req.as_set(database)
+    second = req.as_set(database)
+    with_other_database = req.as_set(other_database)
+
+    # Assert
+    assert first is second
+    assert with_other_database == first
+    assert req.as_set(other_database) is with_other_database
+
+
+def test_as_set_memoized_template(database):
+    # Setup
+    database.requirement_template["Use A"] = _req("A")
+    other_database = MagicMock()
+    other_database.requirement_template = {"Use A": _req("B")}
+    req = RequirementTemplate("Use A")
+
+    # Run and Assert
+    assert req.as_set(database) == make_single_set(make_req_a())
+    assert req.as_set(other_database) == make_single_set(make_req_b())
+
+
+def test_as_set_memoized_template_after_change(database):
+    # Setup
+    database.set_requirement_template("Use A", _req("A"))
+    template = RequirementTemplate("Use A")
+    req = RequirementAnd([template, _req("C")])
+    before = req.as_set(database)
+
+    # Run
+    database.set_requirement_template("Use A", _req("B"))
+
+    # Assert
+    assert before == RequirementSet([RequirementList([_req("A"), _req("C")])])
+    assert template.as_set(database) == make_single_set(make_req_b())
+    assert req.as_set(database) == RequirementSet([RequirementList([_req("B"), _req("C")])])
+
+
+def test_as_set_interns_results():
+    # Run
+    first = RequirementOr([_req("A"), RequirementAnd([_req("B"), _req("C")])]).as_set(None)
+    second = RequirementOr([RequirementAnd([_req("C"), _req("B")]), _req("A")]).as_set(None)
+    single = RequirementAnd([_req("B"), _req("C")]).as_set(None)
+
+    # Assert
+    assert first is second
+    assert next(iter(single.alternatives)) in first.alternatives
+    assert any(alternative is next(iter(single.alternatives)) for alternative in first.alternatives)
+
+
+def test_copy_drops_memoized_as_set():
+    # Setup
+    req = RequirementAnd([_req("A"), _req("B")])
+    req.as_set(None)
+
+    # Run
+    result = copy.deepcopy(req)
+
+    # Assert
+    assert result == req
+    assert result._cached_as_set is None
+    assert req._cached_as_set is not None
+
+
+def test_union_with_trivial():
+    req_set = make_single_set(make_req_a())
+    assert req_set.union(RequirementSet.trivial()) is req_set
+    assert RequirementSet.trivial().union(req_set) is req_set
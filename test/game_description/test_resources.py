@@ -1,3 +1,4 @@
+import copy
 import dataclasses
 
 import pytest
@@ -7,7 +8,8 @@ from randovania.game_description.resources.pickup_entry import ConditionalResour
     ResourceLock
 from randovania.game_description.resources.pickup_index import PickupIndex
 from randovania.game_description.resources.resource_info import add_resource_gain_to_current_resources, \
-    add_resources_into_another, convert_resource_gain_to_current_resources
+    add_resources_into_another, convert_resource_gain_to_current_resources, ResourceCollection
+from randovania.game_description.resources.resource_index import ResourceIndexer
 from randovania.game_description.resources.resource_type import ResourceType
 
 
@@ -72,3 +74,59 @@ def test_resource_type_from_index():
 
     # Assert
     assert result == ResourceType.ITEM
+
+
+def test_resource_collection_dict_compatible():
+    # Setup
+    collection = ResourceCollection(ResourceIndexer())
+
+    # Run
+    collection["a"] = 5
+    collection["b"] = 0
+    collection["c"] = 2
+    del collection["c"]
+
+    # Assert
+    assert collection == {"a": 5, "b": 0}
+    assert "b" in collection
+    assert "c" not in collection
+    assert collection.get("c") is None
+    assert collection.get("b", 10) == 0
+    assert len(collection) == 2
+    assert list(collection.items()) == [("a", 5), ("b", 0)]
+    with pytest.raises(KeyError):
+        collection["c"]
+
+
+def test_resource_collection_copy_on_write():
+    # Setup
+    original = ResourceCollection.from_resources(ResourceIndexer(), {"a": 5})
+
+    # Run
+    shallow = copy.copy(original)
+    deep = copy.deepcopy(original)
+    shallow["a"] = 1
+    add_resource_gain_to_current_resources([("b", 2)], deep)
+    original["c"] = 3
+
+    # Assert
+    assert original == {"a": 5, "c": 3}
+    assert shallow == {"a": 1}
+    assert deep == {"a": 5, "b": 2}
+
+
+def test_resource_collection_add_resource_gain_convert(blank_pickup):
+    # Setup
+    resource_a = ItemResourceInfo("A", "A", 10, None)
+    resource_b = ItemResourceInfo("B", "B", 10, None)
+    pickup = dataclasses.replace(
+        blank_pickup,
+        progression=(), resource_lock=ResourceLock(resource_b, resource_b, resource_a), unlocks_resource=True,
+    )
+    current_resources = ResourceCollection.from_resources(ResourceIndexer(), {resource_a: 5})
+
+    # Run
+    add_resource_gain_to_current_resources(pickup.resource_gain(current_resources), current_resources)
+
+    # Assert
+    assert current_resources == {resource_a: 0, resource_b: 5}
@@ -1,14 +1,20 @@
+import dataclasses
+from unittest.mock import MagicMock
+
+import pytest
 from frozendict import frozendict
 
-from randovania.game_description.requirements import ResourceRequirement, RequirementAnd
+from randovania.game_description.requirements import ResourceRequirement, RequirementAnd, Requirement
+from randovania.game_description.resources.pickup_index import PickupIndex
 from randovania.game_description.resources.resource_type import ResourceType
 from randovania.game_description.resources.simple_resource_info import SimpleResourceInfo
 from randovania.game_description.world.area import Area
+from randovania.game_description.world.area_identifier import AreaIdentifier
 from randovania.game_description.world.dock import DockWeakness, DockLockType, DockType
-from randovania.game_description.world.node import DockNode
+from randovania.game_description.world.node import DockNode, GenericNode, PickupNode, TeleporterNode
 from randovania.game_description.world.node_identifier import NodeIdentifier
 from randovania.game_description.world.world import World
-from randovania.game_description.world.world_list import WorldList
+from randovania.game_description.world.world_list import WorldList, RequirementUsage
 
 
 def test_connections_from_dock_blast_shield(empty_patches):
@@ -41,3 +47,165 @@ def test_connections_from_dock_blast_shield(empty_patches):
     assert result_2 == [
         (node_1, req_2),
     ]
+
+
+def test_requirements_using_resource():
+    # Setup
+    ev_1 = SimpleResourceInfo("Ev1", "Ev1", ResourceType.EVENT)
+    ev_2 = SimpleResourceInfo("Ev2", "Ev2", ResourceType.EVENT)
+    req_1 = ResourceRequirement(ev_1, 1, False)
+    req_2 = ResourceRequirement(ev_2, 1, False)
+    both = RequirementAnd([req_1, req_2])
+    dock_type = DockType("Type", "Type", frozendict())
+    weakness = DockWeakness("Weak", DockLockType.FRONT_ALWAYS_BACK_FREE, frozendict(), req_2)
+
+    node_1 = GenericNode("Node 1", False, None, "", {}, 0)
+    node_2 = DockNode("Node 2", False, None, "", {}, 1,
+                      NodeIdentifier.create("W", "Area 1", "Node 1"), dock_type, weakness)
+    area = Area("Area 1", None, True, [node_1, node_2], {node_1: {node_2: req_1}, node_2: {node_1: both}}, {})
+    world_list = WorldList([World("W", [area], {})])
+    database = MagicMock()
+
+    # Run
+    result_1 = world_list.requirements_using_resource(ev_1, database)
+    result_2 = world_list.requirements_using_resource(ev_2, database)
+    area.connections[node_1][node_2] = req_2
+    cached = world_list.requirements_using_resource(ev_2, database)
+    world_list.invalidate_node_cache()
+    refreshed = world_list.requirements_using_resource(ev_2, database)
+
+    # Assert
+    assert result_1 == (
+        RequirementUsage(node_1, node_2, req_1),
+        RequirementUsage(node_2, node_1, both),
+    )
+    assert result_2 == (
+        RequirementUsage(node_2, None, req_2),
+        RequirementUsage(node_2, node_1, both),
+    )
+    assert cached == result_2
+    assert refreshed == (
+        RequirementUsage(node_2, None, req_2),
+        RequirementUsage(node_1, node_2, req_2),
+        RequirementUsage(node_2, node_1, both),
+    )
+
+
+def test_resolved_graph(empty_patches):
+    # Setup
+    req_1 = ResourceRequirement(SimpleResourceInfo("Ev1", "Ev1", ResourceType.EVENT), 1, False)
+    req_2 = ResourceRequirement(SimpleResourceInfo("Ev2", "Ev2", ResourceType.EVENT), 1, False)
+    dock_type = DockType("Type", "Type", frozendict())
+    weakness = DockWeakness("Weak", DockLockType.FRONT_ALWAYS_BACK_FREE, frozendict(), req_1)
+
+    node_1 = GenericNode("Node 1", False, None, "", {}, 0)
+    node_2 = DockNode("Node 2", False, None, "", {}, 1,
+                      NodeIdentifier.create("W", "Area 2", "Node 3"), dock_type, weakness)
+    node_3 = GenericNode("Node 3", False, None, "", {}, 2)
+    area_1 = Area("Area 1", None, True, [node_1, node_2], {node_1: {node_2: req_2}, node_2: {node_1: req_2}}, {})
+    area_2 = Area("Area 2", None, True, [node_3], {node_3: {}}, {})
+    world_list = WorldList([World("W", [area_1, area_2], {})])
+
+    # Run
+    graph = world_list.resolved_graph(empty_patches)
+    potential = list(world_list.potential_nodes_from(node_2, empty_patches))
+    area_1.connections[node_2][node_1] = req_1
+    cached = list(world_list.potential_nodes_from(node_2, empty_patches))
+    same_graph = world_list.resolved_graph(dataclasses.replace(empty_patches, pickup_assignment={}))
+    other_docks = world_list.resolved_graph(dataclasses.replace(
+        empty_patches, dock_connection={world_list.identifier_for_node(node_2): None},
+    ))
+    world_list.invalidate_node_cache()
+    refreshed = list(world_list.potential_nodes_from(node_2, empty_patches))
+
+    # Assert
+    assert potential == [(node_3, req_1), (node_1, req_2)]
+    assert graph.connections_from(node_2) == ((node_3, req_1),)
+    assert graph.potential_nodes_from(node_1) == ((node_2, req_2),)
+    assert cached == potential
+    assert same_graph is graph
+    assert other_docks is not graph
+    assert refreshed == [(node_3, req_1), (node_1, req_1)]
+
+
+def test_name_indexes():
+    # Setup
+    node_1 = GenericNode("Node", False, None, "", {}, 0)
+    node_2 = PickupNode("Pickup", False, None, "", {}, 1, PickupIndex(5), True)
+    node_3 = GenericNode("Node", False, None, "", {}, 2)
+    node_4 = GenericNode("Node", False, None, "", {}, 3)
+    area_1 = Area("Area", None, True, [node_1, node_2], {}, {})
+    area_2 = Area("Area", None, True, [node_3], {}, {})
+    area_3 = Area("Other", None, True, [node_4], {}, {})
+    world_1 = World("W", [area_1, area_2], {"dark_name": "Dark W"})
+    world_2 = World("X", [area_3], {})
+    world_list = WorldList([world_1, world_2])
+
+    # Run
+    new_node = GenericNode("New", False, None, "", {}, 4)
+    area_1.nodes.append(new_node)
+    world_list.add_new_node(area_1, new_node)
+
+    # Assert
+    assert world_list.world_with_name("W") is world_1
+    assert world_list.world_with_name("Dark W") is world_1
+    assert world_list.world_with_name("X") is world_2
+    assert world_list.world_and_area_by_area_identifier(AreaIdentifier("Dark W", "Area")) == (world_1, area_1)
+    assert world_list.node_by_identifier(NodeIdentifier.create("W", "Area", "Node")) is node_1
+    assert world_list.node_by_identifier(NodeIdentifier.create("X", "Other", "Node")) is node_4
+    assert world_list.node_by_identifier(NodeIdentifier.create("Dark W", "Area", "New")) is new_node
+    assert world_list.num_pickup_nodes == 1
+    assert world_list.max_node_index == 4
+
+    with pytest.raises(KeyError):
+        world_list.world_with_name("Y")
+    with pytest.raises(KeyError):
+        world_list.area_by_area_location(AreaIdentifier("X", "Area"))
+    with pytest.raises(ValueError):
+        world_list.node_by_identifier(NodeIdentifier.create("X", "Other", "New"))
+
+
+def test_name_indexes_after_rename():
+    # Setup
+    node = GenericNode("Node", False, None, "", {}, 0)
+    area = Area("Area", None, True, [node], {}, {})
+    world_list = WorldList([World("W", [area], {})])
+    assert world_list.node_by_identifier(NodeIdentifier.create("W", "Area", "Node")) is node
+
+    # Run
+    renamed = dataclasses.replace(node, name="Renamed")
+    area.nodes[0] = renamed
+    world_list.invalidate_node_cache()
+
+    # Assert
+    assert world_list.node_by_identifier(NodeIdentifier.create("W", "Area", "Renamed")) is renamed
+    with pytest.raises(ValueError):
+        world_list.node_by_identifier(NodeIdentifier.create("W", "Area", "Node"))
+
+
+def test_resolved_graph_elevator_changed_in_place(empty_patches):
+    # Setup
+    area_1_identifier = AreaIdentifier("W", "Area 1")
+    area_2_identifier = AreaIdentifier("W", "Area 2")
+    teleporter = TeleporterNode("Teleporter", False, None, "", {}, 0, area_1_identifier, False, True)
+    node_1 = GenericNode("Node 1", False, None, "", {}, 1)
+    node_2 = GenericNode("Node 2", False, None, "", {}, 2)
+    world_list = WorldList([World("W", [
+        Area("Area 0", None, True, [teleporter], {teleporter: {}}, {}),
+        Area("Area 1", "Node 1", True, [node_1], {node_1: {}}, {}),
+        Area("Area 2", "Node 2", True, [node_2], {node_2: {}}, {}),
+    ], {})])
+    teleporter_identifier = world_list.identifier_for_node(teleporter)
+    patches = dataclasses.replace(empty_patches, elevator_connection={teleporter_identifier: area_1_identifier})
+
+    # Run
+    graph = world_list.resolved_graph(patches)
+    before = list(world_list.potential_nodes_from(teleporter, patches))
+    patches.elevator_connection[teleporter_identifier] = area_2_identifier
+    after = list(world_list.potential_nodes_from(teleporter, patches))
+
+    # Assert
+    assert before == [(node_1, Requirement.trivial())]
+    assert after == [(node_2, Requirement.trivial())]
+    assert graph.connections_from(teleporter) == ((node_1, Requirement.trivial()),)
+    assert world_list.resolved_graph(patches) is not graph
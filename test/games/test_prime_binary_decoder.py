@@ -1,3 +1,4 @@
+import copy
 import io
 import json
 from pathlib import Path
@@ -92,6 +93,56 @@ def test_complex_decode(test_files_dir):
     assert decoded_data == saved_data
 
 
+def test_decode_construct_format(test_files_dir):
+    # Run
+    decoded_data = binary_data.decode_file_path(Path(test_files_dir.joinpath("prime_data_as_binary_v10.bin")))
+
+    # Assert
+    with test_files_dir.joinpath("prime_data_as_json.json").open("r") as data_file:
+        saved_data = json.load(data_file)
+    saved_data = game_migration.migrate_to_current(saved_data)
+
+    assert decoded_data == saved_data
+
+
+def test_encode_construct_format(test_files_dir):
+    with test_files_dir.joinpath("prime_data_as_json.json").open("r") as data_file:
+        data = game_migration.migrate_to_current(json.load(data_file))
+
+    b = io.BytesIO()
+
+    # Run
+    binary_data.encode(data, b, format_version=10)
+
+    # Assert
+    assert test_files_dir.joinpath("prime_data_as_binary_v10.bin").read_bytes() == b.getvalue()
+
+
+def test_round_trip_values():
+    data = copy.deepcopy(sample_data)
+    data["resource_database"]["items"]["Foo"] = {
+        "long_name": "Föo", "max_capacity": 300, "extra": {
+            "negative": -1, "big": 2 ** 40, "float": -1.25, "flags": [True, False, None], "empty": {},
+        },
+    }
+    b = io.BytesIO()
+    binary_data.encode(data, b)
+
+    b.seek(0)
+    decoded = binary_data.decode(b)
+
+    assert decoded == data
+    assert _comparable_dict(decoded) == _comparable_dict(data)
+    assert type(decoded["resource_database"]["items"]["Foo"]["extra"]["float"]) is float
+
+
+def test_decode_unknown_format_version():
+    b = io.BytesIO(b"Req." + (9).to_bytes(4, "big"))
+
+    with pytest.raises(ValueError, match="Unsupported format version: 9"):
+        binary_data.decode(b)
+
+
 def _comparable_dict(value):
     if isinstance(value, dict):
         return [
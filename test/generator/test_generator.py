@@ -7,7 +7,7 @@ import randovania
 from randovania.generator import generator
 from randovania.generator.filler.runner import FillerPlayerResult
 from randovania.layout.layout_description import LayoutDescription
-from randovania.resolver.exceptions import InvalidConfiguration
+from randovania.resolver.exceptions import InvalidConfiguration, GenerationFailure
 
 
 @patch("randovania.generator.generator._validate_item_pool_size", autospec=True)
@@ -75,3 +75,33 @@ def test_distribute_remaining_items_no_locations_left(echoes_game_description):
     with pytest.raises(InvalidConfiguration,
                        match=r"Received 1000 remaining pickups, but there's only \d+ unassigned locations."):
         generator._distribute_remaining_items(rng, filler_results)
+
+
+@pytest.mark.parametrize(["player_count", "final_state"], [
+    (1, MagicMock()),
+    (1, None),
+    (2, None),
+])
+@pytest.mark.asyncio
+async def test_validate_description(mocker, player_count, final_state):
+    # Setup
+    mock_resolve: AsyncMock = mocker.patch("randovania.resolver.resolver.resolve", new_callable=AsyncMock,
+                                           return_value=final_state)
+    description = MagicMock()
+    description.permalink.player_count = player_count
+    status_update = MagicMock()
+
+    # Run
+    if player_count == 1 and final_state is None:
+        with pytest.raises(GenerationFailure, match="considered impossible by the solver"):
+            await generator.validate_description(description, status_update, 60)
+    else:
+        await generator.validate_description(description, status_update, 60)
+
+    # Assert
+    if player_count == 1:
+        mock_resolve.assert_awaited_once()
+        assert mock_resolve.call_args.kwargs["patches"] == description.all_patches[0]
+        assert mock_resolve.call_args.kwargs["cancellation"].deadline is not None
+    else:
+        mock_resolve.assert_not_called()
@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from randovania.game_description.requirements import RequirementSet
+from randovania.generator.graph import RandovaniaGraph, CompactGraph, path_from_predecessors
+
+
+def test_copy_is_independent():
+    graph = RandovaniaGraph.new()
+    for node in range(3):
+        graph.add_node(node)
+    graph.add_edge(0, 1, RequirementSet.trivial())
+    graph.add_edge(1, 2, RequirementSet.trivial())
+
+    # Run
+    copy = graph.copy()
+    copy.add_node(3)
+    copy.add_edge(0, 3, RequirementSet.trivial())
+    copy.remove_edge(1, 2)
+    graph.add_edge(2, 0, RequirementSet.impossible())
+
+    # Assert
+    assert set((source, target) for source, target, _ in graph.edges_data()) == {(0, 1), (1, 2), (2, 0)}
+    assert set((source, target) for source, target, _ in copy.edges_data()) == {(0, 1), (0, 3)}
+    assert 3 not in graph
+    assert not copy.has_edge(2, 0)
+
+
+def test_copy_of_copy_is_independent():
+    graph = RandovaniaGraph.new()
+    graph.add_node(0)
+    graph.add_node(1)
+    first = graph.copy()
+    second = first.copy()
+
+    # Run
+    second.add_edge(0, 1, RequirementSet.trivial())
+    first.add_edge(1, 0, RequirementSet.trivial())
+
+    # Assert
+    assert not graph.has_edge(0, 1) and not graph.has_edge(1, 0)
+    assert first.has_edge(1, 0) and not first.has_edge(0, 1)
+    assert second.has_edge(0, 1) and not second.has_edge(1, 0)
+
+
+def _random_graphs(cls, seed: int, size: int = 30):
+    rng = random.Random(seed)
+    graph = cls.new()
+    for node in range(size):
+        graph.add_node(node)
+    for _ in range(size * 2):
+        graph.add_edge(rng.randrange(size), rng.randrange(size), RequirementSet.trivial())
+    return graph
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compact_graph_matches_graph(seed):
+    graph = _random_graphs(RandovaniaGraph, seed)
+    compact = _random_graphs(CompactGraph, seed)
+    for source, target, _ in list(graph.edges_data())[::5]:
+        graph.remove_edge(source, target)
+        compact.remove_edge(source, target)
+
+    def weight(source, target, requirement):
+        if target % 7 == 0:
+            return None
+        return target % 2
+
+    # Run
+    expected_costs, expected_predecessors = graph.multi_source_dijkstra({0, 1}, weight)
+    costs, predecessors = compact.multi_source_zero_one_bfs({0, 1}, weight)
+
+    # Assert
+    assert costs == expected_costs
+    assert predecessors.keys() == expected_predecessors.keys()
+    for target in predecessors.keys():
+        path = path_from_predecessors(predecessors, target)
+        assert path[0] in {0, 1}
+        assert path[-1] == target
+        assert sum(weight(a, b, None) for a, b in zip(path, path[1:])) == costs[target]
+    assert (sorted(sorted(component) for component in compact.strongly_connected_components())
+            == sorted(sorted(component) for component in graph.strongly_connected_components()))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compact_graph_component_after_changes(seed):
+    rng = random.Random(seed)
+    graph = CompactGraph.new()
+    for node in range(20):
+        graph.add_node(node)
+    graph.strongly_connected_component(0)
+    original = graph
+
+    for step in range(60):
+        # Run
+        if step == 30:
+            graph = graph.copy()
+        if step % 20 == 19:
+            graph.remove_edge(*next(iter(graph.edges_data()))[:2])
+        else:
+            graph.add_edge(rng.randrange(20), rng.randrange(20), RequirementSet.trivial())
+
+        # Assert
+        expected = RandovaniaGraph(graph.edges)
+        for node in range(20):
+            assert graph.strongly_connected_component(node) == expected.strongly_connected_component(node)
+
+    expected = RandovaniaGraph(original.edges)
+    for node in range(20):
+        assert original.strongly_connected_component(node) == expected.strongly_connected_component(node)
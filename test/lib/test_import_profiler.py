@@ -0,0 +1,42 @@
+import json
+import sys
+
+from randovania.lib import import_profiler
+
+
+def test_profile_nested_imports(tmp_path, monkeypatch):
+    tmp_path.joinpath("profiled_outer.py").write_text("import profiled_inner\nVALUE = profiled_inner.VALUE + 1\n")
+    tmp_path.joinpath("profiled_inner.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("profiled_outer", "profiled_inner"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    profiler = import_profiler.ImportProfiler()
+    profiler.install()
+    try:
+        import profiled_outer
+    finally:
+        profiler.uninstall()
+
+    # Assert
+    assert profiled_outer.VALUE == 2
+    assert profiler not in sys.meta_path
+
+    outer = profiler.modules["profiled_outer"]
+    inner = profiler.modules["profiled_inner"]
+    assert outer.imported_by is None
+    assert inner.imported_by == "profiled_outer"
+    assert outer.cumulative >= inner.cumulative
+    assert outer.self_time == outer.cumulative - inner.cumulative
+    assert profiler.total_time == outer.cumulative
+
+    report_path = tmp_path.joinpath("report.json")
+    profiler.write_report(report_path)
+    report = json.loads(report_path.read_text())
+    assert {module["name"] for module in report["modules"]} == {"profiled_outer", "profiled_inner"}
+
+
+def test_report_path_from_argv(tmp_path):
+    assert import_profiler.report_path_from_argv(["rdv", "echoes"]) is None
+    assert import_profiler.report_path_from_argv(["rdv", "--profile-imports", "a.json", "echoes"]).name == "a.json"
+    assert import_profiler.report_path_from_argv(["rdv", "--profile-imports=b.json"]).name == "b.json"
@@ -0,0 +1,53 @@
+import json
+
+from randovania.lib import metrics
+
+
+def test_default_backend_ignores_everything():
+    assert type(metrics.backend) is metrics.MetricsBackend
+
+    metrics.increment("something")
+    with metrics.timer("something"):
+        pass
+
+    assert metrics.backend.as_json == {}
+
+
+def test_collecting():
+    previous = metrics.backend
+
+    @metrics.timed("function")
+    def function(value):
+        metrics.increment("calls")
+        return value * 2
+
+    # Run
+    with metrics.collecting() as collected:
+        assert metrics.backend is collected
+        assert function(2) == 4
+        assert function(3) == 6
+        metrics.increment("items", 5)
+
+    function(4)
+
+    # Assert
+    assert metrics.backend is previous
+    assert collected.counters == {"calls": 2, "items": 5}
+    assert collected.timers["function"].count == 2
+    data = collected.as_json
+    assert data["counters"] == {"calls": 2, "items": 5}
+    assert data["timers"]["function"]["count"] == 2
+    assert data["timers"]["function"]["total"] >= data["timers"]["function"]["max"]
+
+
+def test_export(tmp_path):
+    output = tmp_path.joinpath("metrics.json")
+    backend = metrics.CollectingMetrics(export_path=output)
+    previous = metrics.set_backend(backend)
+    try:
+        metrics.increment("calls")
+        metrics.export()
+    finally:
+        metrics.set_backend(previous)
+
+    assert json.loads(output.read_text()) == {"counters": {"calls": 1}, "timers": {}}
@@ -1,7 +1,15 @@
+import asyncio
+import concurrent.futures
+import time
+from unittest.mock import MagicMock
+
 import pytest
 
 from randovania.layout.layout_description import LayoutDescription
+from randovania.lib import metrics
 from randovania.resolver import resolver, debug
+from randovania.resolver.exceptions import ResolverCancelled, ResolverTimeout
+from randovania.resolver.state import State, StateGameData
 
 
 @pytest.mark.skip_resolver_tests
@@ -21,3 +29,175 @@ async def test_resolver_with_log_file(test_files_dir, seed_name: str):
 
     # Assert
     assert final_state_by_resolve is not None
+
+
+@pytest.mark.skip_resolver_tests
+@pytest.mark.asyncio
+async def test_resolver_records_metrics(test_files_dir):
+    # Setup
+    description = LayoutDescription.from_file(test_files_dir.joinpath("log_files", "corruption_seed_a.rdvgame"))
+    configuration = description.permalink.presets[0].configuration
+    patches = description.all_patches[0]
+
+    # Run
+    with metrics.collecting() as collected:
+        final_state_by_resolve = await resolver.resolve(configuration=configuration,
+                                                        patches=patches)
+
+    # Assert
+    assert final_state_by_resolve is not None
+    assert collected.counters["resolver.nodes_expanded"] > 0
+    assert collected.counters["requirements.compiled_evaluations"] > 0
+    assert collected.timers["resolver_reach.calculate_reach"].count >= collected.counters["resolver.nodes_expanded"]
+
+
+@pytest.mark.skip_resolver_tests
+@pytest.mark.skipif(not resolver._can_explore_in_parallel(), reason="requires fork")
+@pytest.mark.asyncio
+async def test_resolver_with_log_file_in_parallel(test_files_dir):
+    # Setup
+    description = LayoutDescription.from_file(test_files_dir.joinpath("log_files", "corruption_seed_a.rdvgame"))
+    configuration = description.permalink.presets[0].configuration
+    patches = description.all_patches[0]
+
+    # Run
+    final_state_by_resolve = await resolver.resolve(configuration=configuration,
+                                                    patches=patches,
+                                                    process_count=2)
+
+    # Assert
+    assert final_state_by_resolve is not None
+    assert len(final_state_by_resolve.collected_resource_nodes) > 1
+
+
+@pytest.mark.skip_resolver_tests
+@pytest.mark.asyncio
+async def test_resolver_reports_progress(test_files_dir):
+    # Setup
+    description = LayoutDescription.from_file(test_files_dir.joinpath("log_files", "corruption_seed_a.rdvgame"))
+    progress = []
+
+    # Run
+    final_state_by_resolve = await resolver.resolve(configuration=description.permalink.presets[0].configuration,
+                                                    patches=description.all_patches[0],
+                                                    progress_update=progress.append)
+
+    # Assert
+    assert final_state_by_resolve is not None
+    assert [p.states_explored for p in progress] == list(range(1, len(progress) + 1))
+    assert progress[0].depth == 1
+    assert max(p.depth for p in progress) > 1
+    assert progress[-1].best_resource_count == max(p.best_resource_count for p in progress)
+
+
+@pytest.mark.parametrize(["token", "exception"], [
+    (resolver.CancellationToken(deadline=0.0), ResolverTimeout),
+    (resolver.CancellationToken(), ResolverCancelled),
+])
+@pytest.mark.asyncio
+async def test_resolver_cancelled(test_files_dir, token, exception):
+    # Setup
+    description = LayoutDescription.from_file(test_files_dir.joinpath("log_files", "corruption_seed_a.rdvgame"))
+    if token.deadline is None:
+        token.cancel()
+
+    # Run
+    with pytest.raises(exception):
+        await resolver.resolve(configuration=description.permalink.presets[0].configuration,
+                               patches=description.all_patches[0],
+                               cancellation=token)
+
+
+@pytest.mark.skip_resolver_tests
+def test_resolver_cancelled_from_another_thread(test_files_dir):
+    # Setup
+    description = LayoutDescription.from_file(test_files_dir.joinpath("log_files", "seed_a.rdvgame"))
+    token = resolver.CancellationToken()
+    started = concurrent.futures.Future()
+
+    def progress_update(progress):
+        if not started.done():
+            started.set_result(progress)
+        time.sleep(0.01)
+
+    # Run
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(asyncio.run, resolver.resolve(
+            configuration=description.permalink.presets[0].configuration,
+            patches=description.all_patches[0],
+            progress_update=progress_update,
+            cancellation=token,
+        ))
+        started.result(timeout=60)
+        token.cancel()
+
+        # Assert
+        with pytest.raises(ResolverCancelled):
+            future.result(timeout=60)
+
+
+def test_cancellation_token_with_timeout():
+    assert resolver.CancellationToken.with_timeout(None).deadline is None
+    assert resolver.CancellationToken.with_timeout(10).deadline > time.monotonic()
+    resolver.CancellationToken.with_timeout(10).check()
+
+
+def _state_at(node, resources, energy):
+    state = MagicMock()
+    state.node = node
+    state.resources = resources
+    state.energy = energy
+    return state
+
+
+def test_dead_end_table_subsumed():
+    # Setup
+    node_a, node_b = MagicMock(), MagicMock()
+    table = resolver.DeadEndTable(frozenset(["danger"]), "tank")
+    table.add(_state_at(node_a, {"a": 2, "b": 1, "danger": 1}, 50), True)
+
+    # Assert
+    assert table.find(_state_at(node_a, {"a": 2, "b": 1, "danger": 1}, 50)).has_action
+    assert table.find(_state_at(node_a, {"a": 1, "danger": 1}, 20)) is not None
+    assert table.find(_state_at(node_a, {"a": 3, "danger": 1}, 20)) is None
+    assert table.find(_state_at(node_a, {"a": 1}, 20)) is None
+    assert table.find(_state_at(node_a, {"a": 1, "danger": 1}, 60)) is None
+    assert table.find(_state_at(node_b, {}, 0)) is None
+
+
+def test_dead_end_table_with_pending_energy_tank():
+    # Setup
+    node, tank_node = MagicMock(), MagicMock()
+    tank_node.resource_gain_on_collect.return_value = [("tank", 1)]
+    game_data = StateGameData(MagicMock(energy_tank="tank"), MagicMock(), 100)
+    table = resolver.DeadEndTable(frozenset(), "tank")
+
+    # The dead end had the tank already, but not enough energy for a damage edge that needs more than 150
+    table.add(State({"tank": 1}, (), 150, node, None, None, game_data), False)
+    pending = State({}, (), 99, node, None, None, game_data)
+
+    # Run
+    after_tank = pending.collect_resource_node(tank_node, pending.energy)
+
+    # Assert
+    assert after_tank.energy == 199
+    assert table.find(pending) is None
+    assert table.find(State({"tank": 1}, (), 150, node, None, None, game_data)) is not None
+
+
+def test_dead_end_table_evicts_least_recently_used():
+    # Setup
+    node_a, node_b, node_c = MagicMock(), MagicMock(), MagicMock()
+    table = resolver.DeadEndTable(frozenset(), "tank", max_size=2)
+
+    # Run
+    table.add(_state_at(node_a, {}, 10), False)
+    table.add(_state_at(node_b, {}, 10), False)
+    table.find(_state_at(node_a, {}, 10))
+    table.add(_state_at(node_c, {}, 10), False)
+
+    # Assert
+    assert len(table) == 2
+    assert table.find(_state_at(node_a, {}, 10)) is not None
+    assert table.find(_state_at(node_b, {}, 10)) is None
+    assert table.find(_state_at(node_c, {}, 10)) is not None
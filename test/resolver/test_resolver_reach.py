@@ -1,13 +1,17 @@
 from unittest.mock import MagicMock, PropertyMock
 
+from randovania.game_description import default_database
 from randovania.game_description.world.node import EventNode
+from randovania.layout.layout_description import LayoutDescription
+from randovania.resolver import bootstrap, event_pickup
+from randovania.resolver.logic import Logic
 from randovania.resolver.resolver_reach import ResolverReach
 
 
 def test_possible_actions_empty():
     state = MagicMock()
 
-    reach = ResolverReach({}, {}, frozenset(), MagicMock())
+    reach = ResolverReach({}, [], frozenset(), MagicMock())
     options = list(reach.possible_actions(state))
 
     assert options == []
@@ -23,7 +27,7 @@ def test_possible_actions_no_resources():
     type(node_b).is_resource_node = prop_b = PropertyMock(return_value=True)
 
     # Run
-    reach = ResolverReach({node_a: 1, node_b: 1}, {}, frozenset(), MagicMock())
+    reach = ResolverReach({node_a: 1, node_b: 1}, [], frozenset(), MagicMock())
     options = list(action for action, damage in reach.possible_actions(state))
 
     # Assert
@@ -44,7 +48,7 @@ def test_possible_actions_with_event():
     event.can_collect.return_value = True
 
     # Run
-    reach = ResolverReach({event: 1}, {}, frozenset(), logic)
+    reach = ResolverReach({event: 1}, [], frozenset(), logic)
     options = list(action for action, damage in reach.possible_actions(state))
 
     # Assert
@@ -55,3 +59,47 @@ def test_possible_actions_with_event():
     logic.get_additional_requirements.assert_called_once_with(event)
     logic.get_additional_requirements.return_value.satisfied.assert_called_once_with(state.resources, 1,
                                                                                      state.resource_database)
+
+
+def test_calculate_reach_with_parent(test_files_dir):
+    # Setup
+    description = LayoutDescription.from_file(test_files_dir.joinpath("log_files", "seed_a.rdvgame"))
+    configuration = description.permalink.presets[0].configuration
+    game = default_database.game_description_for(configuration.game).make_mutable_copy()
+    game.resource_database = bootstrap.patch_resource_database(game.resource_database, configuration)
+    event_pickup.replace_with_event_pickups(game)
+    new_game, state = bootstrap.logic_bootstrap(configuration, game, description.all_patches[0])
+    logic = Logic(new_game, configuration)
+    state.resources["add_self_as_requirement_to_resources"] = 1
+
+    reach = ResolverReach.calculate_reach(logic, state)
+    for _ in range(10):
+        action, energy = next(reach.satisfiable_actions(state, new_game.victory_condition))
+        state = state.act_on_node(action, path=reach.path_to_node(action), new_energy=energy)
+
+        # Run
+        full = ResolverReach.calculate_reach(logic, state)
+        reach = ResolverReach.calculate_reach(logic, state, parent=reach)
+
+        # Assert
+        assert list(reach.nodes) == list(full.nodes)
+        assert [reach.path_to_node(node) for node in reach.nodes] == [full.path_to_node(node) for node in full.nodes]
+        assert reach.satisfiable_requirements == full.satisfiable_requirements
+
+
+def test_path_to_node(echoes_game_description):
+    # Setup
+    world_list = echoes_game_description.world_list
+    node_a, node_b, node_c, outside = world_list.all_nodes[:4]
+    links = [None] * (world_list.max_node_index + 1)
+    links[node_a.index] = ()
+    links[node_b.index] = ((), node_a)
+    links[node_c.index] = (links[node_b.index], node_b)
+
+    reach = ResolverReach({node_b: 1, node_c: 1}, links, frozenset(), MagicMock())
+
+    # Assert
+    assert reach.path_to_node(node_a) == ()
+    assert reach.path_to_node(node_b) == (node_a,)
+    assert reach.path_to_node(node_c) == (node_a, node_b)
+    assert reach.path_to_node(outside) == ()
@@ -0,0 +1,62 @@
+import argparse
+import io
+import time
+from typing import Callable, List
+
+from randovania.game_description import data_reader
+from randovania.games import binary_data
+from randovania.games.game import RandovaniaGame
+from randovania.lib.enum_lib import iterate_enum
+
+
+def _best_time(function: Callable[[], object], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def benchmark_game(game: RandovaniaGame, repeat: int):
+    data_dir = game.data_path.joinpath("json_data")
+    if not data_dir.is_dir():
+        print(f"{game.long_name}: missing json data, skipping")
+        return
+
+    data = data_reader.read_split_file(data_dir)
+
+    for format_version in (binary_data.construct_format_version, binary_data.current_format_version):
+        def encode() -> bytes:
+            b = io.BytesIO()
+            binary_data.encode(data, b, format_version=format_version)
+            return b.getvalue()
+
+        encoded = encode()
+        decoded = binary_data.decode(io.BytesIO(encoded))
+        assert decoded == data, f"Format {format_version} does not round-trip {game.long_name}"
+
+        encode_time = _best_time(encode, repeat)
+        decode_time = _best_time(lambda: binary_data.decode(io.BytesIO(encoded)), repeat)
+        print(f"{game.long_name:>25} | format {format_version:>2} | {len(encoded):>8} bytes | "
+              f"encode {encode_time * 1000:8.1f}ms | decode {decode_time * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares the time to encode and decode each game's data with the binary formats.")
+    parser.add_argument("--game", choices=[game.value for game in iterate_enum(RandovaniaGame)],
+                        action="append", help="Which games to use. Defaults to all.")
+    parser.add_argument("--repeat", type=int, default=3, help="How many times to run each step. The best is used.")
+    args = parser.parse_args()
+
+    games: List[RandovaniaGame] = [RandovaniaGame(game) for game in args.game] if args.game else list(
+        iterate_enum(RandovaniaGame))
+    for game in games:
+        benchmark_game(game, args.repeat)
+
+
+if __name__ == "__main__":
+    main()